@@ -0,0 +1,149 @@
+"""Benchmark bracket start and result registration at scale.
+
+Usage:
+    python -m benchmarks [--database-url URL] [--sizes N ...] [--repeat N]
+                         [--baseline PATH] [--save-baseline]
+
+Tables are created and dropped by the run itself,
+so it refuses to use a database that already has matamata tables.
+Without a database URL, an in-memory SQLite database is used as a stand-in.
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+DEFAULT_SIZES = [2**exponent for exponent in range(1, 17)]
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+
+
+def parse_arguments(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument(
+        "--database-url",
+        default=os.environ.get("BENCHMARK_DATABASE_URL", "sqlite://"),
+        help="dedicated database (default: BENCHMARK_DATABASE_URL or in-memory SQLite)",
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=int,
+        default=DEFAULT_SIZES,
+        help="numbers of competitors (default: powers of two from 2 to 65536)",
+    )
+    parser.add_argument(
+        "--scenario",
+        dest="scenarios",
+        action="append",
+        choices=["start_tournament", "register_every_match"],
+        help="scenario to run, can be repeated (default: all)",
+    )
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="store this run as the baseline instead of comparing against it",
+    )
+    parser.add_argument(
+        "--skip-memory",
+        action="store_true",
+        help="skip the additional run traced by tracemalloc for peak memory",
+    )
+    parser.add_argument("--time-tolerance", type=float, default=0.25)
+    parser.add_argument("--memory-tolerance", type=float, default=0.10)
+    parser.add_argument(
+        "--min-time-delta",
+        type=float,
+        default=0.01,
+        help="ignore wall time increases up to this many seconds",
+    )
+
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    arguments = parse_arguments(argv)
+
+    # matamata settings require a DATABASE_URL on import
+    os.environ.setdefault("DATABASE_URL", arguments.database_url)
+
+    from sqlalchemy import create_engine, inspect, make_url
+    from sqlalchemy.pool import StaticPool
+
+    from matamata.models import Base
+
+    from .bracket import SCENARIOS, find_regressions, run_benchmarks
+
+    url = make_url(arguments.database_url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # Every session must share the single in-memory database connection
+        engine = create_engine(url, poolclass=StaticPool)
+    else:
+        engine = create_engine(url)
+
+    existing_tables = set(inspect(engine).get_table_names()) & set(Base.metadata.tables)
+    if existing_tables:
+        print(
+            "Refusing to run against a database with matamata tables:"
+            f" {', '.join(sorted(existing_tables))}",
+            file=sys.stderr,
+        )
+        return 2
+
+    def report(scenario, size, measurement):
+        peak_memory = (
+            "-"
+            if measurement.peak_memory is None
+            else f"{measurement.peak_memory / 2**20:.2f}MiB"
+        )
+        print(
+            f"{scenario:<22} {size:>6} competitors"
+            f" {measurement.wall_time:>10.4f}s"
+            f" {measurement.queries:>8} queries"
+            f" {peak_memory:>12}",
+            flush=True,
+        )
+
+    Base.metadata.create_all(engine)
+    try:
+        results = run_benchmarks(
+            engine=engine,
+            sizes=arguments.sizes,
+            scenarios=arguments.scenarios or list(SCENARIOS),
+            repeat=arguments.repeat,
+            seed=arguments.seed,
+            trace_memory=not arguments.skip_memory,
+            report=report,
+        )
+    finally:
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+
+    if arguments.save_baseline:
+        arguments.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Baseline saved to {arguments.baseline}")
+        return 0
+
+    if not arguments.baseline.exists():
+        print(f"No baseline at {arguments.baseline}, nothing to compare")
+        return 0
+
+    regressions = find_regressions(
+        results=results,
+        baseline=json.loads(arguments.baseline.read_text()),
+        time_tolerance=arguments.time_tolerance,
+        memory_tolerance=arguments.memory_tolerance,
+        min_time_delta=arguments.min_time_delta,
+    )
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,289 @@
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from time import perf_counter
+
+from sqlalchemy import Engine, event, insert, select
+from sqlalchemy.orm import Session, joinedload
+
+from matamata.models import Competitor, Match, Tournament, TournamentCompetitor
+from matamata.services import register_match_result, start_tournament
+
+
+@dataclass
+class Measurement:
+    wall_time: float
+    queries: int
+    peak_memory: int | None
+
+
+@contextmanager
+def measure(engine: Engine, *, trace_memory: bool) -> Iterator[dict]:
+    result = {}
+    queries = 0
+
+    def before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        nonlocal queries
+        queries += 1
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    if trace_memory:
+        tracemalloc.start()
+    started = perf_counter()
+    try:
+        yield result
+    finally:
+        wall_time = perf_counter() - started
+        peak_memory = None
+        if trace_memory:
+            _, peak_memory = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+        result["measurement"] = Measurement(
+            wall_time=wall_time,
+            queries=queries,
+            peak_memory=peak_memory,
+        )
+
+
+def create_tournament_with_competitors(
+    *,
+    number_of_competitors: int,
+    session: Session,
+) -> int:
+    tournament = Tournament(label=f"Benchmark {number_of_competitors}")
+    session.add(tournament)
+    session.flush()
+
+    competitor_ids = session.scalars(
+        insert(Competitor).returning(Competitor.id),
+        [{"label": f"Competitor {index}"} for index in range(number_of_competitors)],
+    ).all()
+    session.execute(
+        insert(TournamentCompetitor),
+        [
+            {"tournament_id": tournament.id, "competitor_id": competitor_id}
+            for competitor_id in competitor_ids
+        ],
+    )
+    session.commit()
+
+    return tournament.id
+
+
+def run_start_tournament(
+    *, tournament_id: int, seed: int, session: Session
+) -> list[Match]:
+    # Same loading as POST /tournament/{tournament_uuid}/start
+    tournament = session.scalar(
+        select(Tournament)
+        .where(Tournament.id == tournament_id)
+        .options(
+            joinedload(Tournament.competitor_associations).subqueryload(
+                TournamentCompetitor.competitor
+            )
+        )
+    )
+
+    return start_tournament(
+        tournament=tournament,
+        competitor_associations=tournament.competitor_associations,
+        seed=seed,
+        session=session,
+    )
+
+
+def run_register_every_match(*, tournament_id: int, session: Session):
+    match_ids = session.scalars(
+        select(Match.id)
+        .where(Match.tournament_id == tournament_id)
+        .order_by(Match.round.desc(), Match.position)
+    ).all()
+
+    for match_id in match_ids:
+        # Same loading as POST /match/{match_uuid}
+        match = session.scalar(
+            select(Match)
+            .where(Match.id == match_id)
+            .options(
+                joinedload(Match.tournament),
+                joinedload(Match.competitor_a),
+                joinedload(Match.competitor_b),
+            )
+        )
+        if match.result_registration:
+            # Automatic winning
+            continue
+
+        register_match_result(
+            match_with_tournament_and_competitors=match,
+            winner_uuid=match.competitor_a.uuid,
+            session=session,
+        )
+
+
+def benchmark_start_tournament(
+    *,
+    number_of_competitors: int,
+    engine: Engine,
+    seed: int,
+    trace_memory: bool,
+) -> Measurement:
+    with Session(engine) as session:
+        tournament_id = create_tournament_with_competitors(
+            number_of_competitors=number_of_competitors,
+            session=session,
+        )
+
+    with Session(engine) as session, measure(
+        engine, trace_memory=trace_memory
+    ) as result:
+        run_start_tournament(tournament_id=tournament_id, seed=seed, session=session)
+
+    return result["measurement"]
+
+
+def benchmark_lifecycle(
+    *,
+    number_of_competitors: int,
+    engine: Engine,
+    seed: int,
+    trace_memory: bool,
+) -> Measurement:
+    with Session(engine) as session:
+        tournament_id = create_tournament_with_competitors(
+            number_of_competitors=number_of_competitors,
+            session=session,
+        )
+        run_start_tournament(tournament_id=tournament_id, seed=seed, session=session)
+
+    with Session(engine) as session, measure(
+        engine, trace_memory=trace_memory
+    ) as result:
+        run_register_every_match(tournament_id=tournament_id, session=session)
+
+    return result["measurement"]
+
+
+SCENARIOS: dict[str, Callable[..., Measurement]] = {
+    "start_tournament": benchmark_start_tournament,
+    "register_every_match": benchmark_lifecycle,
+}
+
+
+def run_scenario(
+    *,
+    scenario: str,
+    number_of_competitors: int,
+    engine: Engine,
+    seed: int,
+    trace_memory: bool,
+) -> Measurement:
+    # The same draw on every run keeps query counts reproducible
+    return SCENARIOS[scenario](
+        number_of_competitors=number_of_competitors,
+        engine=engine,
+        seed=seed,
+        trace_memory=trace_memory,
+    )
+
+
+def run_benchmarks(
+    *,
+    engine: Engine,
+    sizes: list[int],
+    scenarios: list[str],
+    repeat: int,
+    seed: int,
+    trace_memory: bool,
+    report: Callable[[str, int, Measurement], None],
+) -> dict[str, dict[str, dict]]:
+    """Measure each scenario for each number of competitors.
+
+    The best wall time of the repeated runs is kept.
+    tracemalloc slows Python code down by several times,
+    so the peak memory comes from an additional traced run.
+    """
+
+    results = {}
+    for scenario in scenarios:
+        # Discarded run so that statement compilation caches are warm
+        run_scenario(
+            scenario=scenario,
+            number_of_competitors=min(sizes),
+            engine=engine,
+            seed=seed,
+            trace_memory=False,
+        )
+
+        results[scenario] = {}
+        for size in sizes:
+            measurements = [
+                run_scenario(
+                    scenario=scenario,
+                    number_of_competitors=size,
+                    engine=engine,
+                    seed=seed,
+                    trace_memory=False,
+                )
+                for _ in range(repeat)
+            ]
+            best = min(measurements, key=lambda measurement: measurement.wall_time)
+            if trace_memory:
+                best.peak_memory = run_scenario(
+                    scenario=scenario,
+                    number_of_competitors=size,
+                    engine=engine,
+                    seed=seed,
+                    trace_memory=True,
+                ).peak_memory
+            report(scenario, size, best)
+            results[scenario][str(size)] = asdict(best)
+
+    return results
+
+
+def find_regressions(
+    *,
+    results: dict[str, dict[str, dict]],
+    baseline: dict[str, dict[str, dict]],
+    time_tolerance: float,
+    memory_tolerance: float,
+    min_time_delta: float,
+) -> list[str]:
+    regressions = []
+
+    for scenario, sizes in results.items():
+        for size, current in sizes.items():
+            previous = baseline.get(scenario, {}).get(size)
+            if previous is None:
+                continue
+
+            if current["queries"] > previous["queries"]:
+                regressions.append(
+                    f"{scenario}[{size}]: queries {previous['queries']}"
+                    f" -> {current['queries']}"
+                )
+            if (
+                current["wall_time"] > previous["wall_time"] * (1 + time_tolerance)
+                and current["wall_time"] - previous["wall_time"] > min_time_delta
+            ):
+                regressions.append(
+                    f"{scenario}[{size}]: wall time {previous['wall_time']:.4f}s"
+                    f" -> {current['wall_time']:.4f}s"
+                )
+            if (
+                current["peak_memory"] is not None
+                and previous["peak_memory"] is not None
+                and current["peak_memory"]
+                > previous["peak_memory"] * (1 + memory_tolerance)
+            ):
+                regressions.append(
+                    f"{scenario}[{size}]: peak memory {previous['peak_memory']}B"
+                    f" -> {current['peak_memory']}B"
+                )
+
+    return regressions
@@ -0,0 +1,33 @@
+"""tournament and competitor versions
+
+Revision ID: 3b7f5d2c8e14
+Revises: 9e2d4b6a1f03
+Create Date: 2024-01-24 10:17:32.184520
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3b7f5d2c8e14"
+down_revision: Union[str, None] = "9e2d4b6a1f03"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "competitor",
+        sa.Column("version", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.add_column(
+        "tournament",
+        sa.Column("version", sa.Integer(), server_default="0", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("tournament", "version")
+    op.drop_column("competitor", "version")
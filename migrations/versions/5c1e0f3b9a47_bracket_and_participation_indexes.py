@@ -0,0 +1,60 @@
+"""bracket and participation indexes
+
+Revision ID: 5c1e0f3b9a47
+Revises: ad6bf02d324d
+Create Date: 2024-01-22 10:41:07.318245
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5c1e0f3b9a47"
+down_revision: Union[str, None] = "ad6bf02d324d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "match_competitor_a_tournament_index",
+        "match",
+        ["competitor_a_id", "tournament_id"],
+        unique=False,
+    )
+    op.create_index(
+        "match_competitor_b_tournament_index",
+        "match",
+        ["competitor_b_id", "tournament_id"],
+        unique=False,
+    )
+    op.create_index(
+        "match_pending_tournament_round_position_index",
+        "match",
+        ["tournament_id", sa.text("round DESC"), "position"],
+        unique=False,
+        postgresql_where=sa.text("result_registration IS NULL"),
+    )
+    op.create_index(
+        "tournament_competitor_competitor_tournament_index",
+        "tournament_competitor",
+        ["competitor_id", "tournament_id"],
+        unique=False,
+        postgresql_include=["next_match_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "tournament_competitor_competitor_tournament_index",
+        table_name="tournament_competitor",
+    )
+    op.drop_index(
+        "match_pending_tournament_round_position_index",
+        table_name="match",
+        postgresql_where=sa.text("result_registration IS NULL"),
+    )
+    op.drop_index("match_competitor_b_tournament_index", table_name="match")
+    op.drop_index("match_competitor_a_tournament_index", table_name="match")
@@ -0,0 +1,81 @@
+"""tournament standings
+
+Revision ID: 7a4c9e1d2b58
+Revises: 3b7f5d2c8e14
+Create Date: 2024-01-26 15:02:48.609173
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7a4c9e1d2b58"
+down_revision: Union[str, None] = "3b7f5d2c8e14"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Standings columns of the winner and the loser of each round 0 position
+STANDINGS_COLUMNS = {
+    0: ("first_place_id", "second_place_id"),
+    1: ("third_place_id", "fourth_place_id"),
+}
+
+
+def upgrade() -> None:
+    for columns in STANDINGS_COLUMNS.values():
+        for column in columns:
+            op.add_column("tournament", sa.Column(column, sa.Integer(), nullable=True))
+            op.create_foreign_key(
+                f"tournament_{column}_fkey",
+                "tournament",
+                "competitor",
+                [column],
+                ["id"],
+            )
+
+    # Standings of already decided round 0 matches
+    tournament = sa.table(
+        "tournament",
+        sa.column("id", sa.Integer),
+        *(
+            sa.column(column, sa.Integer)
+            for columns in STANDINGS_COLUMNS.values()
+            for column in columns
+        ),
+    )
+    match = sa.table(
+        "match",
+        sa.column("tournament_id", sa.Integer),
+        sa.column("round", sa.Integer),
+        sa.column("position", sa.Integer),
+        sa.column("winner_id", sa.Integer),
+        sa.column("loser_id", sa.Integer),
+        sa.column("result_registration", sa.DateTime),
+    )
+    for position, (winner_column, loser_column) in STANDINGS_COLUMNS.items():
+        op.execute(
+            sa.update(tournament)
+            .values(
+                {
+                    winner_column: match.c.winner_id,
+                    loser_column: match.c.loser_id,
+                }
+            )
+            .where(
+                match.c.tournament_id == tournament.c.id,
+                match.c.round == 0,
+                match.c.position == position,
+                match.c.result_registration.is_not(None),
+            )
+        )
+
+
+def downgrade() -> None:
+    for columns in reversed(STANDINGS_COLUMNS.values()):
+        for column in reversed(columns):
+            op.drop_constraint(
+                f"tournament_{column}_fkey", "tournament", type_="foreignkey"
+            )
+            op.drop_column("tournament", column)
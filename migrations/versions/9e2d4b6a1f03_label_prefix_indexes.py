@@ -0,0 +1,38 @@
+"""label prefix indexes
+
+Revision ID: 9e2d4b6a1f03
+Revises: 5c1e0f3b9a47
+Create Date: 2024-01-23 14:02:51.472913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9e2d4b6a1f03"
+down_revision: Union[str, None] = "5c1e0f3b9a47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "competitor_label_prefix_index",
+        "competitor",
+        ["label"],
+        unique=False,
+        postgresql_ops={"label": "varchar_pattern_ops"},
+    )
+    op.create_index(
+        "tournament_label_prefix_index",
+        "tournament",
+        ["label"],
+        unique=False,
+        postgresql_ops={"label": "varchar_pattern_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("tournament_label_prefix_index", table_name="tournament")
+    op.drop_index("competitor_label_prefix_index", table_name="competitor")
@@ -0,0 +1,175 @@
+import json
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from matamata.settings import settings
+
+# Every cached response of a Tournament, so all of them are invalidated together
+CACHED_TOURNAMENT_RESPONSES = ("match",)
+
+INVALIDATED_TOURNAMENTS_KEY = "invalidated_tournament_uuids"
+
+
+class LRUCacheBackend:
+    """In-process cache that drops the least recently used entry when full.
+
+    Entries also expire after ttl seconds, as a safety net
+    for changes made by other processes sharing the same database.
+    """
+
+    def __init__(self, *, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = Lock()
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expiration, value = entry
+            if expiration <= monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: dict):
+        with self._lock:
+            self._entries[key] = (monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisCacheBackend:
+    """Cache shared by every process, stored as JSON in Redis."""
+
+    def __init__(self, *, url: str, ttl: float):
+        from redis import Redis
+
+        self.client = Redis.from_url(url)
+        self.ttl = ttl
+
+    def get(self, key: str) -> dict | None:
+        value = self.client.get(key)
+        if value is None:
+            return None
+        return json.loads(value)
+
+    def set(self, key: str, value: dict):
+        self.client.set(key, json.dumps(value), px=int(self.ttl * 1000))
+
+    def delete(self, *keys: str):
+        self.client.delete(*keys)
+
+    def clear(self):
+        # Only matamata entries are removed from a shared Redis database
+        for key in self.client.scan_iter(match="matamata:*"):
+            self.client.delete(key)
+
+
+class TournamentResponseCache:
+    """Read-through cache of JSON-ready responses keyed by Tournament UUID.
+
+    Each response is stored along with the Tournament version it was read with,
+    and only served for that version. A reader that queried before a commit
+    might store its response after the invalidation, but it is never served,
+    as the commit bumped the Tournament version.
+    """
+
+    def __init__(self, backend: LRUCacheBackend | RedisCacheBackend | None):
+        self.backend = backend
+
+    @staticmethod
+    def key(tournament_uuid: UUID, name: str) -> str:
+        return f"matamata:tournament:{tournament_uuid}:{name}"
+
+    def get(self, *, tournament_uuid: UUID, name: str, version: int) -> dict | None:
+        if self.backend is None:
+            return None
+        entry = self.backend.get(self.key(tournament_uuid, name))
+        if entry is None or entry["version"] != version:
+            return None
+        return entry["content"]
+
+    def set(self, *, tournament_uuid: UUID, name: str, version: int, content: dict):
+        if self.backend is None:
+            return
+        self.backend.set(
+            self.key(tournament_uuid, name),
+            {"version": version, "content": content},
+        )
+
+    def invalidate(self, tournament_uuid: UUID):
+        if self.backend is None:
+            return
+        self.backend.delete(
+            *(self.key(tournament_uuid, name) for name in CACHED_TOURNAMENT_RESPONSES)
+        )
+
+    def clear(self):
+        if self.backend is None:
+            return
+        self.backend.clear()
+
+
+def create_response_cache() -> TournamentResponseCache:
+    if settings.RESPONSE_CACHE_URL:
+        return TournamentResponseCache(
+            RedisCacheBackend(
+                url=settings.RESPONSE_CACHE_URL,
+                ttl=settings.RESPONSE_CACHE_TTL,
+            )
+        )
+
+    if settings.RESPONSE_CACHE_MAXSIZE > 0:
+        return TournamentResponseCache(
+            LRUCacheBackend(
+                maxsize=settings.RESPONSE_CACHE_MAXSIZE,
+                ttl=settings.RESPONSE_CACHE_TTL,
+            )
+        )
+
+    return TournamentResponseCache(None)
+
+
+response_cache = create_response_cache()
+
+
+def invalidate_tournament_on_commit(*, tournament_uuid: UUID, session: Session):
+    """Invalidate the cached responses of a Tournament once the session commits.
+
+    Invalidating before the commit would let a concurrent read
+    cache the previous state again, and a rollback keeps the cache valid.
+    """
+
+    session.info.setdefault(INVALIDATED_TOURNAMENTS_KEY, set()).add(tournament_uuid)
+
+
+@event.listens_for(Session, "after_commit")
+def invalidate_committed_tournaments(session: Session):
+    for tournament_uuid in session.info.pop(INVALIDATED_TOURNAMENTS_KEY, ()):
+        response_cache.invalidate(tournament_uuid)
+
+
+@event.listens_for(Session, "after_rollback")
+def discard_tournament_invalidations(session: Session):
+    session.info.pop(INVALIDATED_TOURNAMENTS_KEY, None)
@@ -1,11 +1,175 @@
-from sqlalchemy import create_engine
+import logging
+from threading import Lock
+from time import perf_counter
+
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 
 from matamata.settings import settings
 
-engine = create_engine(settings.DATABASE_URL)
+logger = logging.getLogger(__name__)
+
+
+class PoolCheckoutStatistics:
+    def __init__(self):
+        self._lock = Lock()
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+        if wait >= settings.DATABASE_POOL_CHECKOUT_WARNING:
+            logger.warning("Database connection checkout waited %.3f seconds", wait)
+
+    def snapshot(self) -> dict[str, int | float]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "total_wait": self.total_wait,
+                "max_wait": self.max_wait,
+            }
+
+
+pool_checkout_statistics = PoolCheckoutStatistics()
+
+
+class CheckoutTimingMixin:
+    def connect(self):
+        started = perf_counter()
+        try:
+            return super().connect()
+        finally:
+            pool_checkout_statistics.record(perf_counter() - started)
+
+
+class TimedQueuePool(CheckoutTimingMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+class PsycopgNativePool(CheckoutTimingMixin, NullPool):
+    """Lend connections from a psycopg_pool.ConnectionPool to SQLAlchemy.
+
+    SQLAlchemy doesn't hold connections by itself:
+    they are borrowed from the native pool on checkout
+    and given back to it instead of being closed.
+    """
+
+    def __init__(self, native_pool, **kwargs):
+        self.native_pool = native_pool
+        super().__init__(self._borrow_connection, **kwargs)
+
+    def _borrow_connection(self):
+        # Opening an already open pool is a no-op
+        self.native_pool.open()
+        return self.native_pool.getconn()
+
+    def _close_connection(self, connection, *, terminate: bool = False):
+        self.native_pool.putconn(connection)
+
+    def recreate(self):
+        # Engine.dispose() closes the native pool before recreating,
+        # and a closed psycopg_pool can't be opened again
+        return self.__class__(
+            create_native_pool(),
+            echo=self.echo,
+            logging_name=self._orig_logging_name,
+            reset_on_return=self._reset_on_return,
+            _dispatch=self.dispatch,
+            dialect=self._dialect,
+        )
+
+    def dispose(self):
+        self.native_pool.close()
+
+    def status(self) -> str:
+        return f"PsycopgNativePool {self.native_pool.get_stats()}"
+
+
+def connection_options() -> dict[str, str]:
+    if settings.DATABASE_STATEMENT_TIMEOUT is None:
+        return {}
+    return {"options": f"-c statement_timeout={settings.DATABASE_STATEMENT_TIMEOUT}"}
+
+
+def psycopg_conninfo() -> str:
+    # psycopg itself doesn't know SQLAlchemy driver names
+    return (
+        make_url(settings.DATABASE_URL)
+        .set(drivername="postgresql")
+        .render_as_string(hide_password=False)
+    )
+
+
+def create_native_pool():
+    from psycopg_pool import ConnectionPool
+
+    native_pool_options = {}
+    if settings.DATABASE_POOL_RECYCLE > 0:
+        native_pool_options["max_lifetime"] = settings.DATABASE_POOL_RECYCLE
+    if settings.DATABASE_POOL_PRE_PING and hasattr(ConnectionPool, "check_connection"):
+        # Available since psycopg_pool 3.2
+        native_pool_options["check"] = ConnectionPool.check_connection
+
+    return ConnectionPool(
+        psycopg_conninfo(),
+        kwargs=connection_options(),
+        min_size=settings.DATABASE_POOL_SIZE,
+        max_size=settings.DATABASE_POOL_SIZE + settings.DATABASE_MAX_OVERFLOW,
+        timeout=settings.DATABASE_POOL_TIMEOUT,
+        open=False,
+        **native_pool_options,
+    )
+
+
+def engine_options(*, poolclass) -> dict:
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+        "pool_recycle": settings.DATABASE_POOL_RECYCLE,
+        "pool_pre_ping": settings.DATABASE_POOL_PRE_PING,
+        "connect_args": connection_options(),
+    }
+
+
+if settings.DATABASE_NATIVE_POOL:
+    engine = create_engine(
+        settings.DATABASE_URL,
+        pool=PsycopgNativePool(create_native_pool()),
+    )
+else:
+    engine = create_engine(
+        settings.DATABASE_URL,
+        **engine_options(poolclass=TimedQueuePool),
+    )
+
+async_engine = (
+    create_async_engine(
+        settings.DATABASE_URL,
+        **engine_options(poolclass=TimedAsyncAdaptedQueuePool),
+    )
+    if settings.DATABASE_ASYNC_MODE
+    else None
+)
 
 
 def get_session():
     with Session(engine) as session:
         yield session
+
+
+async def get_async_session():
+    async with AsyncSession(async_engine) as session:
+        yield session
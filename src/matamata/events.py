@@ -0,0 +1,236 @@
+import asyncio
+import json
+import logging
+from collections.abc import AsyncIterator, Iterator
+from contextlib import contextmanager
+from threading import Event as ThreadEvent
+from threading import Lock, Thread
+from time import sleep
+from uuid import UUID
+
+from sqlalchemy import ARRAY, Text, bindparam, event, func, select
+from sqlalchemy.orm import Session
+
+from matamata.settings import settings
+
+logger = logging.getLogger(__name__)
+
+EVENTS_CHANNEL = "matamata_tournament_events"
+PENDING_EVENTS_KEY = "pending_tournament_events"
+SUBSCRIPTION_QUEUE_SIZE = 1000
+KEEPALIVE_INTERVAL = 15.0
+LISTENER_RECONNECT_DELAY = 1.0
+LISTENER_READY_TIMEOUT = 5.0
+
+
+class Subscription:
+    """Events of a single watcher, delivered within its event loop."""
+
+    def __init__(self, *, loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.loop = loop
+        self.queue: asyncio.Queue[dict | None] = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def deliver(self, tournament_event: dict):
+        if self.overflowed:
+            return
+
+        try:
+            self.queue.put_nowait(tournament_event)
+        except asyncio.QueueFull:
+            # A watcher that can't keep up is disconnected,
+            # so it reconnects and reads the whole bracket again
+            self.overflowed = True
+            self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+    async def get(self) -> dict | None:
+        return await self.queue.get()
+
+
+class TournamentEventBroadcaster:
+    """In-process fan-out of Tournament events to every watcher."""
+
+    def __init__(self, *, maxsize: int = SUBSCRIPTION_QUEUE_SIZE):
+        self.maxsize = maxsize
+        self._lock = Lock()
+        self._subscriptions: dict[UUID, set[Subscription]] = {}
+
+    @contextmanager
+    def subscribe(self, tournament_uuid: UUID) -> Iterator[Subscription]:
+        subscription = Subscription(
+            loop=asyncio.get_running_loop(),
+            maxsize=self.maxsize,
+        )
+        with self._lock:
+            self._subscriptions.setdefault(tournament_uuid, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                subscriptions = self._subscriptions[tournament_uuid]
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[tournament_uuid]
+
+    def publish(self, tournament_uuid: UUID, tournament_event: dict):
+        # Thread-safe: events usually come from threadpool workers or the listener thread
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(tournament_uuid, ()))
+
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(
+                    subscription.deliver, tournament_event
+                )
+            except RuntimeError:
+                # The watcher event loop is already closed
+                pass
+
+
+broadcaster = TournamentEventBroadcaster()
+
+
+class PostgresEventListener:
+    """A single LISTEN connection per process relaying NOTIFY payloads to watchers."""
+
+    def __init__(self, *, conninfo: str, broadcaster: TournamentEventBroadcaster):
+        self.conninfo = conninfo
+        self.broadcaster = broadcaster
+        self._lock = Lock()
+        self._thread: Thread | None = None
+        # Set while the LISTEN connection is up
+        self.ready = ThreadEvent()
+
+    def ensure_started(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = Thread(target=self.run, name="matamata-events", daemon=True)
+            self._thread.start()
+
+    def relay(self, payload: str):
+        notification = json.loads(payload)
+        self.broadcaster.publish(
+            UUID(notification["tournament"]),
+            notification["event"],
+        )
+
+    def run(self):
+        import psycopg
+
+        while True:
+            try:
+                with psycopg.connect(self.conninfo, autocommit=True) as connection:
+                    connection.execute(f"LISTEN {EVENTS_CHANNEL}")
+                    self.ready.set()
+                    for notify in connection.notifies():
+                        # A notification that can't be relayed must not stop the others
+                        try:
+                            self.relay(notify.payload)
+                        except Exception:
+                            logger.exception(
+                                "Tournament events listener could not relay %r",
+                                notify.payload,
+                            )
+            except psycopg.OperationalError:
+                self.ready.clear()
+                logger.warning(
+                    "Tournament events listener lost its connection, reconnecting"
+                )
+                sleep(LISTENER_RECONNECT_DELAY)
+            except Exception:
+                self.ready.clear()
+                logger.exception("Tournament events listener failed, reconnecting")
+                sleep(LISTENER_RECONNECT_DELAY)
+
+
+def create_event_listener() -> PostgresEventListener | None:
+    if settings.EVENTS_BACKEND != "postgresql":
+        return None
+
+    from matamata.database import psycopg_conninfo
+
+    return PostgresEventListener(conninfo=psycopg_conninfo(), broadcaster=broadcaster)
+
+
+event_listener = create_event_listener()
+
+
+def publish_tournament_events_on_commit(
+    *,
+    tournament_uuid: UUID,
+    tournament_events: list[dict],
+    session: Session,
+):
+    """Publish Tournament events once, and only if, the session commits."""
+
+    if not tournament_events:
+        return
+
+    if settings.EVENTS_BACKEND == "postgresql":
+        # NOTIFY is transactional: it is delivered on commit and discarded on rollback
+        payloads = func.unnest(
+            bindparam(
+                "payloads",
+                [
+                    json.dumps(
+                        {"tournament": str(tournament_uuid), "event": tournament_event}
+                    )
+                    for tournament_event in tournament_events
+                ],
+                type_=ARRAY(Text),
+            )
+        ).column_valued("payload")
+        session.execute(select(func.pg_notify(EVENTS_CHANNEL, payloads)))
+        return
+
+    session.info.setdefault(PENDING_EVENTS_KEY, []).append(
+        (tournament_uuid, tournament_events)
+    )
+
+
+@event.listens_for(Session, "after_commit")
+def publish_committed_tournament_events(session: Session):
+    for tournament_uuid, tournament_events in session.info.pop(PENDING_EVENTS_KEY, ()):
+        for tournament_event in tournament_events:
+            broadcaster.publish(tournament_uuid, tournament_event)
+
+
+@event.listens_for(Session, "after_rollback")
+def discard_tournament_events(session: Session):
+    session.info.pop(PENDING_EVENTS_KEY, None)
+
+
+def format_server_sent_event(tournament_event: dict) -> str:
+    data = json.dumps(tournament_event, separators=(",", ":"))
+    return f"event: {tournament_event['event']}\ndata: {data}\n\n"
+
+
+async def stream_tournament_events(
+    tournament_uuid: UUID,
+    *,
+    keepalive_interval: float = KEEPALIVE_INTERVAL,
+) -> AsyncIterator[str]:
+    if event_listener is not None:
+        event_listener.ensure_started()
+        await asyncio.to_thread(event_listener.ready.wait, LISTENER_READY_TIMEOUT)
+
+    with broadcaster.subscribe(tournament_uuid) as subscription:
+        # Sent right after subscribing, so no event committed afterwards is missed
+        yield ": connected\n\n"
+
+        while True:
+            try:
+                tournament_event = await asyncio.wait_for(
+                    subscription.get(), timeout=keepalive_interval
+                )
+            except TimeoutError:
+                # Comments keep proxies from closing idle connections
+                yield ": keepalive\n\n"
+                continue
+
+            if tournament_event is None:
+                return
+
+            yield format_server_sent_event(tournament_event)
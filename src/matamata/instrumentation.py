@@ -0,0 +1,268 @@
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import wraps
+from inspect import iscoroutinefunction
+from threading import Lock
+from time import perf_counter
+
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+from matamata import database
+
+
+@dataclass
+class RequestMetrics:
+    query_count: int = 0
+    db_time: float = 0.0
+    endpoint_time: float = 0.0
+    handler_time: float = 0.0
+
+    @property
+    def serialization_time(self) -> float:
+        # Route handler time not spent in the endpoint itself:
+        # response validation and serialization
+        return max(self.handler_time - self.endpoint_time, 0.0)
+
+    def server_timing(self, total_time: float) -> str:
+        return ", ".join(
+            [
+                f'db;dur={self.db_time * 1000:.3f};desc="{self.query_count} queries"',
+                f"app;dur={self.endpoint_time * 1000:.3f}",
+                f"serialization;dur={self.serialization_time * 1000:.3f}",
+                f"total;dur={total_time * 1000:.3f}",
+            ]
+        )
+
+
+request_metrics: ContextVar[RequestMetrics | None] = ContextVar(
+    "request_metrics", default=None
+)
+
+
+@dataclass
+class RouteMetrics:
+    requests: int = 0
+    total_time: float = 0.0
+    query_count: int = 0
+    db_time: float = 0.0
+    serialization_time: float = 0.0
+
+
+class RouteMetricsRegistry:
+    def __init__(self):
+        self._lock = Lock()
+        self._routes: dict[tuple[str, str, int], RouteMetrics] = defaultdict(
+            RouteMetrics
+        )
+
+    def observe(
+        self,
+        *,
+        method: str,
+        route: str,
+        status: int,
+        metrics: RequestMetrics,
+        total_time: float,
+    ):
+        with self._lock:
+            route_metrics = self._routes[(method, route, status)]
+            route_metrics.requests += 1
+            route_metrics.total_time += total_time
+            route_metrics.query_count += metrics.query_count
+            route_metrics.db_time += metrics.db_time
+            route_metrics.serialization_time += metrics.serialization_time
+
+    def snapshot(self) -> dict[tuple[str, str, int], RouteMetrics]:
+        with self._lock:
+            return {
+                key: RouteMetrics(**vars(route_metrics))
+                for key, route_metrics in self._routes.items()
+            }
+
+
+def escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_prometheus_metrics(registry: RouteMetricsRegistry) -> str:
+    routes = sorted(registry.snapshot().items())
+
+    def route_samples(name: str, attribute: str) -> list[str]:
+        return [
+            f'{name}{{method="{method}",route="{escape_label_value(route)}",status="{status}"}}'
+            f" {getattr(route_metrics, attribute)}"
+            for (method, route, status), route_metrics in routes
+        ]
+
+    lines = [
+        "# HELP matamata_http_requests_total Total of handled HTTP requests",
+        "# TYPE matamata_http_requests_total counter",
+        *route_samples("matamata_http_requests_total", "requests"),
+        "# HELP matamata_http_request_duration_seconds_total Total time handling HTTP requests",
+        "# TYPE matamata_http_request_duration_seconds_total counter",
+        *route_samples("matamata_http_request_duration_seconds_total", "total_time"),
+        "# HELP matamata_db_queries_total Total of SQL statements issued by HTTP requests",
+        "# TYPE matamata_db_queries_total counter",
+        *route_samples("matamata_db_queries_total", "query_count"),
+        "# HELP matamata_db_duration_seconds_total Total time executing SQL statements",
+        "# TYPE matamata_db_duration_seconds_total counter",
+        *route_samples("matamata_db_duration_seconds_total", "db_time"),
+        "# HELP matamata_serialization_duration_seconds_total Total time validating and serializing responses",
+        "# TYPE matamata_serialization_duration_seconds_total counter",
+        *route_samples(
+            "matamata_serialization_duration_seconds_total", "serialization_time"
+        ),
+    ]
+
+    pool_statistics = database.pool_checkout_statistics.snapshot()
+    lines.extend(
+        [
+            "# HELP matamata_db_pool_checkouts_total Total of connection pool checkouts",
+            "# TYPE matamata_db_pool_checkouts_total counter",
+            f"matamata_db_pool_checkouts_total {pool_statistics['checkouts']}",
+            "# HELP matamata_db_pool_checkout_wait_seconds_total Total time waiting for connection pool checkouts",
+            "# TYPE matamata_db_pool_checkout_wait_seconds_total counter",
+            f"matamata_db_pool_checkout_wait_seconds_total {pool_statistics['total_wait']}",
+            "# HELP matamata_db_pool_checkout_wait_seconds_max Longest wait for a connection pool checkout",
+            "# TYPE matamata_db_pool_checkout_wait_seconds_max gauge",
+            f"matamata_db_pool_checkout_wait_seconds_max {pool_statistics['max_wait']}",
+        ]
+    )
+
+    return "\n".join(lines) + "\n"
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if request_metrics.get() is None:
+        return
+    conn.info.setdefault("query_start_time", []).append(perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    metrics = request_metrics.get()
+    if metrics is None or not conn.info.get("query_start_time"):
+        return
+    metrics.query_count += 1
+    metrics.db_time += perf_counter() - conn.info["query_start_time"].pop()
+
+
+def timed_endpoint(endpoint):
+    # functools.wraps copies the marker, so endpoints wrapping
+    # an already timed endpoint (e.g. asynchronous_endpoint) are not timed twice
+    if getattr(endpoint, "is_timed_endpoint", False):
+        return endpoint
+
+    if iscoroutinefunction(endpoint):
+
+        @wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            metrics = request_metrics.get()
+            started = perf_counter()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                if metrics is not None:
+                    metrics.endpoint_time += perf_counter() - started
+
+        async_wrapper.is_timed_endpoint = True
+        return async_wrapper
+
+    @wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        metrics = request_metrics.get()
+        started = perf_counter()
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            if metrics is not None:
+                metrics.endpoint_time += perf_counter() - started
+
+    wrapper.is_timed_endpoint = True
+    return wrapper
+
+
+class InstrumentedAPIRoute(APIRoute):
+    """APIRoute that times its endpoint apart from the whole route handler.
+
+    Timing only happens while the instrumentation middleware
+    is collecting metrics for the current request.
+    """
+
+    def __init__(self, path, endpoint, **kwargs):
+        super().__init__(path, timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self):
+        route_handler = super().get_route_handler()
+
+        async def timed_route_handler(request: Request):
+            metrics = request_metrics.get()
+            started = perf_counter()
+            try:
+                return await route_handler(request)
+            finally:
+                if metrics is not None:
+                    metrics.handler_time += perf_counter() - started
+
+        return timed_route_handler
+
+
+class InstrumentationMiddleware:
+    def __init__(self, app, *, registry: RouteMetricsRegistry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestMetrics()
+        token = request_metrics.set(metrics)
+        started = perf_counter()
+        status = 500
+
+        async def send_with_server_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing", metrics.server_timing(perf_counter() - started)
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_server_timing)
+        finally:
+            request_metrics.reset(token)
+            route = scope.get("route")
+            self.registry.observe(
+                method=scope["method"],
+                route=route.path if route else "unmatched",
+                status=status,
+                metrics=metrics,
+                total_time=perf_counter() - started,
+            )
+
+
+async def metrics_endpoint(request: Request):
+    return PlainTextResponse(
+        render_prometheus_metrics(request.app.state.route_metrics),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
+def install_instrumentation(app: FastAPI):
+    if not event.contains(Engine, "before_cursor_execute", before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", after_cursor_execute)
+
+    app.state.route_metrics = RouteMetricsRegistry()
+    app.add_middleware(InstrumentationMiddleware, registry=app.state.route_metrics)
+    app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
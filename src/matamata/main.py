@@ -1,15 +1,34 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 
 from . import __version__ as VERSION
+from .instrumentation import install_instrumentation
 from .routers import competitor, match, tournament
+from .routers.asynchronous import asynchronous_router
+from .settings import settings
 
-app = FastAPI(
-    title="matamata",
-    summary=("REST API for single-elimination tournament management"),
-    version=VERSION,
-)
 
+def create_app(
+    *,
+    async_mode: bool = settings.DATABASE_ASYNC_MODE,
+    instrumentation: bool = settings.INSTRUMENTATION_ENABLED,
+) -> FastAPI:
+    app = FastAPI(
+        title="matamata",
+        summary=("REST API for single-elimination tournament management"),
+        version=VERSION,
+        default_response_class=ORJSONResponse,
+    )
 
-app.include_router(competitor.router)
-app.include_router(match.router)
-app.include_router(tournament.router)
+    for router in (competitor.router, match.router, tournament.router):
+        if async_mode:
+            router = asynchronous_router(router)
+        app.include_router(router)
+
+    if instrumentation:
+        install_instrumentation(app)
+
+    return app
+
+
+app = create_app()
@@ -1,12 +1,12 @@
 from __future__ import annotations
 
-from sqlalchemy import CheckConstraint, String
+from sqlalchemy import CheckConstraint, Index, String
 from sqlalchemy.ext.associationproxy import AssociationProxy, association_proxy
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy_utils import generic_repr
 
 from .base import IdUuidTimestampedBase
-from .constants import COMPETITOR_LABEL_CONSTRAINT
+from .constants import COMPETITOR_LABEL_CONSTRAINT, COMPETITOR_LABEL_PREFIX_INDEX
 from .tournament_competitor import TournamentCompetitor
 
 
@@ -18,9 +18,18 @@ class Competitor(IdUuidTimestampedBase):
             "NOT(TRIM(label) LIKE '')",
             name=COMPETITOR_LABEL_CONSTRAINT,
         ),
+        # Pattern operator class allows prefix searches (LIKE 'prefix%')
+        # to use the index regardless of the database collation
+        Index(
+            COMPETITOR_LABEL_PREFIX_INDEX,
+            "label",
+            postgresql_ops={"label": "varchar_pattern_ops"},
+        ),
     )
 
     label: Mapped[str] = mapped_column(String(255))
+    # Bumped whenever one of the Competitor Tournament participations changes
+    version: Mapped[int] = mapped_column(default=0, server_default="0")
 
     tournament_associations: Mapped[list[TournamentCompetitor]] = relationship(
         cascade="all, delete-orphan",
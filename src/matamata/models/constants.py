@@ -1,4 +1,5 @@
 COMPETITOR_LABEL_CONSTRAINT = "competitor_label_not_empty_nor_whitespace_only"
+COMPETITOR_LABEL_PREFIX_INDEX = "competitor_label_prefix_index"
 MATCH_ROUND_CONSTRAINT = "match_round_non_negative"
 MATCH_ROUND_POSITION_CONSTRAINT = "match_round_position_values"
 MATCH_POSITION_CONSTRAINT = "match_position_non_negative"
@@ -8,7 +9,16 @@ MATCH_TOURNAMENT_ROUND_POSITION_UNIQUE_CONSTRAINT = (
 MATCH_NON_NULL_COMPETITORS_CANNOT_BE_THE_SAME = (
     "match_non_null_competitors_cannot_be_the_same"
 )
+MATCH_COMPETITOR_A_TOURNAMENT_INDEX = "match_competitor_a_tournament_index"
+MATCH_COMPETITOR_B_TOURNAMENT_INDEX = "match_competitor_b_tournament_index"
+MATCH_PENDING_TOURNAMENT_ROUND_POSITION_INDEX = (
+    "match_pending_tournament_round_position_index"
+)
 MATCH_RESULT_REGISTRATION_MUST_REGISTER_A_WINNER = "match_result_registration_winner"
 MATCH_RESULT_REGISTRATION_MIGHT_REGISTER_A_LOSER = "match_result_registration_loser"
 TOURNAMENT_LABEL_CONSTRAINT = "tournament_label_not_empty_nor_whitespace_only"
+TOURNAMENT_LABEL_PREFIX_INDEX = "tournament_label_prefix_index"
 TOURNAMENT_START_ATTRS_CONSTRAINT = "tournament_all_null_or_all_set_under_conditions"
+TOURNAMENT_COMPETITOR_COMPETITOR_TOURNAMENT_INDEX = (
+    "tournament_competitor_competitor_tournament_index"
+)
@@ -1,13 +1,16 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import CheckConstraint, ForeignKey, UniqueConstraint
+from sqlalchemy import CheckConstraint, ForeignKey, Index, UniqueConstraint, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy_utils import generic_repr
 
 from .base import IdUuidTimestampedBase
 from .constants import (
+    MATCH_COMPETITOR_A_TOURNAMENT_INDEX,
+    MATCH_COMPETITOR_B_TOURNAMENT_INDEX,
     MATCH_NON_NULL_COMPETITORS_CANNOT_BE_THE_SAME,
+    MATCH_PENDING_TOURNAMENT_ROUND_POSITION_INDEX,
     MATCH_POSITION_CONSTRAINT,
     MATCH_RESULT_REGISTRATION_MIGHT_REGISTER_A_LOSER,
     MATCH_RESULT_REGISTRATION_MUST_REGISTER_A_WINNER,
@@ -78,6 +81,26 @@ class Match(IdUuidTimestampedBase):
             ")",
             name=MATCH_RESULT_REGISTRATION_MIGHT_REGISTER_A_LOSER,
         ),
+        # Matches of a competitor are looked up by either side of the match,
+        # so each side has its own index to be combined in a bitmap OR
+        Index(
+            MATCH_COMPETITOR_A_TOURNAMENT_INDEX,
+            "competitor_a_id",
+            "tournament_id",
+        ),
+        Index(
+            MATCH_COMPETITOR_B_TOURNAMENT_INDEX,
+            "competitor_b_id",
+            "tournament_id",
+        ),
+        # Pending matches are a shrinking subset of a tournament matches
+        Index(
+            MATCH_PENDING_TOURNAMENT_ROUND_POSITION_INDEX,
+            "tournament_id",
+            text("round DESC"),
+            "position",
+            postgresql_where=text("result_registration IS NULL"),
+        ),
     )
 
     tournament_id: Mapped[int] = mapped_column(ForeignKey("tournament.id"))
@@ -1,13 +1,17 @@
 from datetime import datetime
 
-from sqlalchemy import CheckConstraint, String, inspect
+from sqlalchemy import CheckConstraint, ForeignKey, Index, String, inspect
 from sqlalchemy.event import listens_for
 from sqlalchemy.ext.associationproxy import AssociationProxy, association_proxy
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy_utils import generic_repr
 
 from .base import IdUuidTimestampedBase
-from .constants import TOURNAMENT_LABEL_CONSTRAINT, TOURNAMENT_START_ATTRS_CONSTRAINT
+from .constants import (
+    TOURNAMENT_LABEL_CONSTRAINT,
+    TOURNAMENT_LABEL_PREFIX_INDEX,
+    TOURNAMENT_START_ATTRS_CONSTRAINT,
+)
 from .exceptions import CannotUpdateTournamentDataAfterStartError
 from .tournament_competitor import TournamentCompetitor
 
@@ -36,12 +40,26 @@ class Tournament(IdUuidTimestampedBase):
             ")",
             name=TOURNAMENT_START_ATTRS_CONSTRAINT,
         ),
+        # Pattern operator class allows prefix searches (LIKE 'prefix%')
+        # to use the index regardless of the database collation
+        Index(
+            TOURNAMENT_LABEL_PREFIX_INDEX,
+            "label",
+            postgresql_ops={"label": "varchar_pattern_ops"},
+        ),
     )
 
     label: Mapped[str] = mapped_column(String(255))
     matches_creation: Mapped[datetime | None] = mapped_column()
     number_competitors: Mapped[int | None] = mapped_column()
     starting_round: Mapped[int | None] = mapped_column()
+    # Bumped whenever the Tournament, its Competitors or its Matches change
+    version: Mapped[int] = mapped_column(default=0, server_default="0")
+    # Standings are written along with the result of each round 0 Match
+    first_place_id: Mapped[int | None] = mapped_column(ForeignKey("competitor.id"))
+    second_place_id: Mapped[int | None] = mapped_column(ForeignKey("competitor.id"))
+    third_place_id: Mapped[int | None] = mapped_column(ForeignKey("competitor.id"))
+    fourth_place_id: Mapped[int | None] = mapped_column(ForeignKey("competitor.id"))
 
     matches: Mapped[list["Match"]] = relationship(  # noqa: F821
         back_populates="tournament"
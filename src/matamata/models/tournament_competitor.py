@@ -2,16 +2,27 @@ from __future__ import annotations
 
 from typing import Optional
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy_utils import generic_repr
 
 from .base import TimestampedBase
+from .constants import TOURNAMENT_COMPETITOR_COMPETITOR_TOURNAMENT_INDEX
 
 
 @generic_repr
 class TournamentCompetitor(TimestampedBase):
     __tablename__ = "tournament_competitor"
+    __table_args__ = (
+        # The primary key covers lookups by tournament,
+        # this one covers lookups by competitor
+        Index(
+            TOURNAMENT_COMPETITOR_COMPETITOR_TOURNAMENT_INDEX,
+            "competitor_id",
+            "tournament_id",
+            postgresql_include=["next_match_id"],
+        ),
+    )
 
     tournament_id: Mapped[int] = mapped_column(
         ForeignKey("tournament.id"), primary_key=True
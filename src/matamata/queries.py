@@ -0,0 +1,330 @@
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import ColumnElement, Row, Select, case, func, or_, select
+from sqlalchemy.orm import aliased
+
+from matamata.models import Competitor, Match, Tournament, TournamentCompetitor
+
+CompetitorA = aliased(Competitor, name="competitor_a")
+CompetitorB = aliased(Competitor, name="competitor_b")
+Winner = aliased(Competitor, name="winner")
+Loser = aliased(Competitor, name="loser")
+OtherCompetitor = aliased(Competitor, name="other_competitor")
+# Competitor of each Tournament standings column, from the first place down
+PLACES = ("first_place", "second_place", "third_place", "fourth_place")
+PlaceCompetitors = tuple(aliased(Competitor, name=place) for place in PLACES)
+
+
+def select_match_listing_rows() -> Select:
+    """Select a row per Match with the data required by its listing schema.
+
+    Competitors are joined as (uuid, label) pairs,
+    so no ORM entity is loaded to serialize a Match.
+    """
+
+    return (
+        select(
+            Match.uuid,
+            Match.round,
+            Match.position,
+            CompetitorA.uuid.label("competitor_a_uuid"),
+            CompetitorA.label.label("competitor_a_label"),
+            CompetitorB.uuid.label("competitor_b_uuid"),
+            CompetitorB.label.label("competitor_b_label"),
+            Winner.uuid.label("winner_uuid"),
+            Winner.label.label("winner_label"),
+            Loser.uuid.label("loser_uuid"),
+            Loser.label.label("loser_label"),
+        )
+        .outerjoin(CompetitorA, Match.competitor_a_id == CompetitorA.id)
+        .outerjoin(CompetitorB, Match.competitor_b_id == CompetitorB.id)
+        .outerjoin(Winner, Match.winner_id == Winner.id)
+        .outerjoin(Loser, Match.loser_id == Loser.id)
+    )
+
+
+def select_match_detail_rows() -> Select:
+    """Select a row per Match with the data required by its detail schema."""
+
+    return (
+        select_match_listing_rows()
+        .add_columns(
+            Tournament.uuid.label("tournament_uuid"),
+            Tournament.label.label("tournament_label"),
+            Tournament.starting_round.label("tournament_starting_round"),
+            Tournament.number_competitors.label("tournament_number_competitors"),
+            Tournament.version.label("tournament_version"),
+        )
+        .join(Tournament, Match.tournament_id == Tournament.id)
+    )
+
+
+def tournament_has_standings_column() -> ColumnElement[bool]:
+    # Standings are complete once the final and the third place Match, if any, are decided
+    return Tournament.first_place_id.is_not(None) & or_(
+        Tournament.number_competitors <= 2,
+        Tournament.third_place_id.is_not(None),
+    )
+
+
+def select_tournament_standings_rows() -> Select:
+    """Select a row per Tournament with the data required by its result schema.
+
+    Standings are stored in the Tournament itself,
+    so each place Competitor is joined as a (uuid, label) pair by primary key.
+    """
+
+    query = select(
+        Tournament.uuid,
+        Tournament.label,
+        Tournament.matches_creation,
+        Tournament.starting_round,
+        Tournament.number_competitors,
+        Tournament.version,
+        tournament_has_standings_column().label("has_standings"),
+    )
+    for place, PlaceCompetitor in zip(PLACES, PlaceCompetitors):
+        query = query.add_columns(
+            PlaceCompetitor.uuid.label(f"{place}_uuid"),
+            PlaceCompetitor.label.label(f"{place}_label"),
+        ).outerjoin(
+            PlaceCompetitor,
+            getattr(Tournament, f"{place}_id") == PlaceCompetitor.id,
+        )
+
+    return query
+
+
+def select_finished_tournament_rows() -> Select:
+    """Select a row per Tournament with complete standings, with its champion."""
+
+    Champion = PlaceCompetitors[0]
+    return (
+        select(
+            Tournament.id,
+            Tournament.uuid,
+            Tournament.label,
+            Champion.uuid.label("champion_uuid"),
+            Champion.label.label("champion_label"),
+        )
+        .join(Champion, Tournament.first_place_id == Champion.id)
+        .where(tournament_has_standings_column())
+    )
+
+
+def match_listing_status(
+    *, result_registration: datetime | None, winner_id: int | None
+) -> str | None:
+    # Matches are listed as past only when decided and as upcoming only when undecided
+    if result_registration is not None and winner_id is not None:
+        return "past"
+    if result_registration is None and winner_id is None:
+        return "upcoming"
+    return None
+
+
+def select_competitor_match_rows(*, tournament_id: int, competitor_id: int) -> Select:
+    """Select a row per Match of a Competitor in a Tournament, with its opponent."""
+
+    return (
+        select(
+            Match.uuid,
+            Match.round,
+            Match.position,
+            Match.result_registration,
+            Match.winner_id,
+            OtherCompetitor.uuid.label("other_competitor_uuid"),
+            OtherCompetitor.label.label("other_competitor_label"),
+        )
+        .outerjoin(
+            OtherCompetitor,
+            OtherCompetitor.id
+            == case(
+                (Match.competitor_a_id == competitor_id, Match.competitor_b_id),
+                else_=Match.competitor_a_id,
+            ),
+        )
+        .where(
+            Match.tournament_id == tournament_id,
+            (Match.competitor_a_id == competitor_id)
+            | (Match.competitor_b_id == competitor_id),
+        )
+        .order_by(
+            Match.round.desc(),
+            Match.position.asc(),
+        )
+    )
+
+
+TOURNAMENT_STATUSES = ("past", "ongoing", "upcoming")
+
+
+def tournament_status_column() -> ColumnElement[str]:
+    # Status of a Tournament according to a Competitor participation
+    return case(
+        (Tournament.starting_round.is_(None), "upcoming"),
+        (TournamentCompetitor.next_match_id.is_(None), "past"),
+        else_="ongoing",
+    )
+
+
+def select_competitor_tournament_pages(
+    *,
+    competitor_id: int,
+    limit: int,
+    map_status_to_cursor_id: dict[str, int],
+) -> Select:
+    """Select a page of Tournaments of each status of a Competitor at once.
+
+    Each status partition is numbered by Tournament id after its own cursor,
+    and up to limit + 1 rows of each one are kept to tell whether there is a next page.
+    """
+
+    status = tournament_status_column()
+    cursor_filters = [
+        or_(status != status_name, Tournament.id > cursor_id)
+        for status_name, cursor_id in map_status_to_cursor_id.items()
+    ]
+
+    participations = (
+        select(
+            Tournament.id,
+            Tournament.uuid,
+            Tournament.label,
+            status.label("status"),
+            func.row_number()
+            .over(partition_by=status, order_by=Tournament.id)
+            .label("row_number"),
+        )
+        .select_from(TournamentCompetitor)
+        .join(TournamentCompetitor.tournament)
+        .where(TournamentCompetitor.competitor_id == competitor_id, *cursor_filters)
+        .subquery("participations")
+    )
+
+    return (
+        select(
+            participations.c.id,
+            participations.c.uuid,
+            participations.c.label,
+            participations.c.status,
+        )
+        .where(participations.c.row_number <= limit + 1)
+        .order_by(participations.c.status, participations.c.id)
+    )
+
+
+def competitor_as_dict(uuid: UUID | None, label: str | None) -> dict[str, str] | None:
+    if uuid is None:
+        return None
+
+    return {
+        "uuid": str(uuid),
+        "label": label,
+    }
+
+
+def competitor_instance_as_dict(competitor: Competitor | None) -> dict[str, str] | None:
+    if competitor is None:
+        return None
+    return competitor_as_dict(competitor.uuid, competitor.label)
+
+
+def tournament_as_dict(tournament: Tournament | Row) -> dict[str, Any]:
+    # Same keys and order as TournamentSchema
+    return {
+        "uuid": str(tournament.uuid),
+        "label": tournament.label,
+    }
+
+
+def tournament_after_start_as_dict(tournament: Tournament | Row) -> dict[str, Any]:
+    # Same keys and order as TournamentAfterStartSchema
+    return {
+        "uuid": str(tournament.uuid),
+        "label": tournament.label,
+        "startingRound": tournament.starting_round,
+        "numberCompetitors": tournament.number_competitors,
+    }
+
+
+def tournament_standings_row_as_dict(row: Row) -> dict[str, Any]:
+    # Same keys and order as TournamentResultSchema
+    return {
+        "tournament": tournament_after_start_as_dict(row),
+        "top4": [
+            competitor_as_dict(
+                getattr(row, f"{place}_uuid"), getattr(row, f"{place}_label")
+            )
+            for place in PLACES
+        ],
+    }
+
+
+def finished_tournament_row_as_dict(row: Row) -> dict[str, Any]:
+    # Same keys and order as FinishedTournamentSchema
+    return {
+        **tournament_as_dict(row),
+        "champion": competitor_as_dict(row.champion_uuid, row.champion_label),
+    }
+
+
+def match_instance_as_dict(match: Match) -> dict[str, Any]:
+    # Same keys and order as MatchSchemaForTournamentListing
+    return {
+        "uuid": str(match.uuid),
+        "round": match.round,
+        "position": match.position,
+        "competitorA": competitor_instance_as_dict(match.competitor_a),
+        "competitorB": competitor_instance_as_dict(match.competitor_b),
+        "winner": competitor_instance_as_dict(match.winner),
+        "loser": competitor_instance_as_dict(match.loser),
+    }
+
+
+def match_listing_row_as_dict(row: Row) -> dict[str, Any]:
+    # Same keys and order as MatchSchemaForTournamentListing
+    return {
+        "uuid": str(row.uuid),
+        "round": row.round,
+        "position": row.position,
+        "competitorA": competitor_as_dict(
+            row.competitor_a_uuid, row.competitor_a_label
+        ),
+        "competitorB": competitor_as_dict(
+            row.competitor_b_uuid, row.competitor_b_label
+        ),
+        "winner": competitor_as_dict(row.winner_uuid, row.winner_label),
+        "loser": competitor_as_dict(row.loser_uuid, row.loser_label),
+    }
+
+
+def match_detail_row_as_dict(row: Row) -> dict[str, Any]:
+    # Same keys and order as MatchSchema
+    return {
+        **match_listing_row_as_dict(row),
+        "tournament": {
+            "uuid": str(row.tournament_uuid),
+            "label": row.tournament_label,
+            "startingRound": row.tournament_starting_round,
+            "numberCompetitors": row.tournament_number_competitors,
+        },
+    }
+
+
+def competitor_match_row_as_dict(row: Row) -> dict[str, Any]:
+    # Same keys and order as MatchForTournamentListingWithOtherCompetitor
+    return {
+        "uuid": str(row.uuid),
+        "round": row.round,
+        "position": row.position,
+        "otherCompetitor": competitor_as_dict(
+            row.other_competitor_uuid, row.other_competitor_label
+        ),
+    }
+
+
+def competitor_row_as_dict(row: Row) -> dict[str, str]:
+    return competitor_as_dict(row.uuid, row.label)
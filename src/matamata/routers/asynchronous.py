@@ -0,0 +1,117 @@
+from functools import wraps
+from inspect import signature
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import ORJSONResponse, Response
+from fastapi.routing import APIRoute
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from matamata.database import get_async_session
+
+
+def asynchronous_endpoint(route: APIRoute):
+    endpoint = route.endpoint
+    endpoint_signature = signature(endpoint)
+    if "session" not in endpoint_signature.parameters:
+        # Endpoints managing their own database access are kept as they are
+        return endpoint
+
+    response_adapter = TypeAdapter(route.response_model)
+
+    def run_endpoint(sync_session: Session, **kwargs):
+        return endpoint(session=sync_session, **kwargs)
+
+    def render_response(content, sub_response: Response | None) -> Response:
+        validated_content = response_adapter.validate_python(
+            content,
+            from_attributes=True,
+        )
+        response = ORJSONResponse(
+            content=response_adapter.dump_python(validated_content, mode="json"),
+            status_code=route.status_code,
+        )
+        # Headers set by the endpoint, such as ETag, on its injected Response
+        if sub_response is not None:
+            response.headers.raw.extend(sub_response.headers.raw)
+        return response
+
+    def render_response_in_session(
+        sync_session: Session,
+        content,
+        sub_response: Response | None,
+    ) -> Response:
+        return render_response(content, sub_response)
+
+    @wraps(endpoint)
+    async def wrapper(*, session: AsyncSession, **kwargs) -> Response:
+        content = await session.run_sync(run_endpoint, **kwargs)
+        if isinstance(content, Response):
+            return content
+
+        sub_response = kwargs.get("response")
+        if not isinstance(sub_response, Response):
+            sub_response = None
+
+        # Validation and serialization are CPU-bound,
+        # so they run in the threadpool instead of blocking the event loop
+        try:
+            return await run_in_threadpool(render_response, content, sub_response)
+        except ValidationError as error:
+            if not any(
+                detail["type"] == "get_attribute_error" for detail in error.errors()
+            ):
+                raise
+
+        # Attributes not loaded yet, such as relationships, can only be lazy loaded
+        # within the greenlet that wraps the session
+        return await session.run_sync(render_response_in_session, content, sub_response)
+
+    wrapper.__signature__ = endpoint_signature.replace(
+        parameters=[
+            (
+                parameter.replace(
+                    annotation=AsyncSession,
+                    default=Depends(get_async_session),
+                )
+                if parameter.name == "session"
+                else parameter
+            )
+            for parameter in endpoint_signature.parameters.values()
+        ]
+    )
+
+    return wrapper
+
+
+def asynchronous_router(router: APIRouter) -> APIRouter:
+    """Build a router whose endpoints use an AsyncSession.
+
+    Each synchronous endpoint runs through AsyncSession.run_sync,
+    so its database round trips are awaited in the event loop
+    instead of blocking a threadpool worker.
+    The endpoint code itself still runs in the event loop thread,
+    while the validation and serialization of its response run in the threadpool.
+    """
+
+    async_router = APIRouter(route_class=router.route_class)
+
+    for route in router.routes:
+        async_router.add_api_route(
+            route.path,
+            asynchronous_endpoint(route),
+            response_model=route.response_model,
+            status_code=route.status_code,
+            tags=route.tags,
+            summary=route.summary,
+            description=route.description,
+            response_description=route.response_description,
+            responses=route.responses,
+            methods=route.methods,
+            name=route.name,
+            openapi_extra=route.openapi_extra,
+        )
+
+    return async_router
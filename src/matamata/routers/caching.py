@@ -0,0 +1,69 @@
+from typing import Any
+from uuid import UUID
+
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+from matamata.cache import response_cache
+
+from .conditional import entity_tag
+
+
+def cached_json_response(
+    *,
+    tournament_uuid: UUID,
+    name: str,
+    version: int,
+) -> ORJSONResponse | None:
+    content = response_cache.get(
+        tournament_uuid=tournament_uuid, name=name, version=version
+    )
+    if content is None:
+        return None
+
+    return ORJSONResponse(
+        content=content,
+        status_code=200,
+        headers={"ETag": entity_tag(tournament_uuid, version)},
+    )
+
+
+def cache_json_content(
+    *,
+    tournament_uuid: UUID,
+    name: str,
+    version: int,
+    content: dict,
+) -> ORJSONResponse:
+    # version must be read along with the content, so both are of the same state
+    response_cache.set(
+        tournament_uuid=tournament_uuid,
+        name=name,
+        version=version,
+        content=content,
+    )
+    return ORJSONResponse(
+        content=content,
+        status_code=200,
+        headers={"ETag": entity_tag(tournament_uuid, version)},
+    )
+
+
+def cache_json_response(
+    *,
+    tournament_uuid: UUID,
+    name: str,
+    version: int,
+    response_model: type[BaseModel],
+    data: Any,
+) -> ORJSONResponse:
+    # Validated and serialized once, so cache hits skip both the queries and Pydantic
+    content = response_model.model_validate(data, from_attributes=True).model_dump(
+        mode="json"
+    )
+    return cache_json_content(
+        tournament_uuid=tournament_uuid,
+        name=name,
+        version=version,
+        content=content,
+    )
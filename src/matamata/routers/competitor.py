@@ -1,19 +1,45 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import TypeAdapter, ValidationError
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from matamata.database import get_session
-from matamata.models import Competitor, Tournament, TournamentCompetitor
+from matamata.instrumentation import InstrumentedAPIRoute
+from matamata.models import Competitor
+from matamata.queries import (
+    TOURNAMENT_STATUSES,
+    competitor_as_dict,
+    select_competitor_tournament_pages,
+)
 from matamata.schemas import (
     CompetitorDetailSchema,
+    CompetitorLabelsPayloadSchema,
     CompetitorListSchema,
+    CompetitorPageSchema,
     CompetitorPayloadSchema,
     CompetitorSchema,
 )
+from matamata.services import create_competitors as create_competitors_service
+from matamata.settings import settings
+
+from .conditional import IfNoneMatch, check_not_modified, entity_tag
+from .pagination import (
+    DEFAULT_PAGE_LIMIT,
+    PageLimit,
+    decode_cursor,
+    paginate_by_id,
+    split_page,
+)
+from .streaming import NDJSON_MEDIA_TYPE, stream_ndjson
 
-router = APIRouter(prefix="/competitor", tags=["competitor"])
+router = APIRouter(
+    prefix="/competitor", tags=["competitor"], route_class=InstrumentedAPIRoute
+)
 
 
 @router.post("/", response_model=CompetitorSchema, status_code=201)
@@ -31,14 +57,136 @@ def create_competitor(
     return competitor
 
 
-@router.get("/", response_model=CompetitorListSchema, status_code=200)
+competitor_labels_adapter = TypeAdapter(CompetitorLabelsPayloadSchema)
+
+
+def is_ndjson_request(request: Request) -> bool:
+    media_type, _, _ = request.headers.get("content-type", "").partition(";")
+    return media_type.strip() == NDJSON_MEDIA_TYPE
+
+
+def raise_payload_too_large(max_bytes: int):
+    raise HTTPException(
+        status_code=413,
+        detail=f"Payload must not exceed {max_bytes} bytes",
+    )
+
+
+async def read_capped_body(request: Request, *, max_bytes: int) -> bytes:
+    # Rejected as soon as the cap is exceeded, so a body is never buffered past it
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > max_bytes:
+        raise_payload_too_large(max_bytes)
+
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > max_bytes:
+            raise_payload_too_large(max_bytes)
+    return bytes(body)
+
+
+async def competitor_labels_payload(request: Request) -> list[str]:
+    # Either a JSON array of labels or NDJSON with a JSON label per line
+    body = await read_capped_body(
+        request, max_bytes=settings.BULK_COMPETITORS_MAX_BYTES
+    )
+    try:
+        if is_ndjson_request(request):
+            items = [orjson.loads(line) for line in body.splitlines() if line.strip()]
+        else:
+            items = orjson.loads(body)
+    except orjson.JSONDecodeError as error:
+        # Same error as FastAPI raises for invalid JSON bodies
+        raise RequestValidationError(
+            [
+                {
+                    "type": "json_invalid",
+                    "loc": ("body", error.pos),
+                    "msg": "JSON decode error",
+                    "input": {},
+                    "ctx": {"error": error.msg},
+                }
+            ]
+        )
+
+    try:
+        return competitor_labels_adapter.validate_python(items)
+    except ValidationError as error:
+        raise RequestValidationError(
+            [
+                {**detail, "loc": ("body", *detail["loc"])}
+                for detail in error.errors(include_url=False)
+            ]
+        )
+
+
+@router.post(
+    "/bulk",
+    response_model=CompetitorListSchema,
+    status_code=201,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": competitor_labels_adapter.json_schema(),
+                },
+                NDJSON_MEDIA_TYPE: {
+                    "schema": {
+                        "type": "string",
+                        "description": "A JSON label per line",
+                    },
+                },
+            },
+        },
+    },
+)
+def create_competitors_in_bulk(
+    request: Request,
+    labels: list[str] = Depends(competitor_labels_payload),
+    session: Session = Depends(get_session),
+):
+    created_competitors = create_competitors_service(labels=labels, session=session)
+    competitors = (
+        competitor_as_dict(uuid, label) for uuid, label in created_competitors
+    )
+
+    # Responses follow the request format, and NDJSON is written as it goes
+    if is_ndjson_request(request):
+        return StreamingResponse(
+            stream_ndjson(competitors),
+            status_code=201,
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+
+    return ORJSONResponse(content={"competitors": list(competitors)}, status_code=201)
+
+
+@router.get("/", response_model=CompetitorPageSchema, status_code=200)
 def list_competitors(
+    limit: PageLimit = DEFAULT_PAGE_LIMIT,
+    cursor: str | None = None,
+    label_prefix: str | None = None,
     session: Session = Depends(get_session),
 ):
-    competitors = session.scalars(select(Competitor)).all()
+    competitors_query = select(Competitor.id, Competitor.uuid, Competitor.label)
+    if label_prefix:
+        competitors_query = competitors_query.where(
+            Competitor.label.startswith(label_prefix, autoescape=True)
+        )
+
+    competitors, next_cursor = paginate_by_id(
+        query=competitors_query,
+        id_column=Competitor.id,
+        limit=limit,
+        cursor=cursor,
+        session=session,
+    )
 
     data = {
         "competitors": competitors,
+        "nextCursor": next_cursor,
     }
 
     return data
@@ -49,6 +197,12 @@ def list_competitors(
 )
 def get_competitor_data(
     competitor_uuid: UUID,
+    response: Response,
+    limit: PageLimit = DEFAULT_PAGE_LIMIT,
+    past_cursor: str | None = None,
+    ongoing_cursor: str | None = None,
+    upcoming_cursor: str | None = None,
+    if_none_match: IfNoneMatch = None,
     session: Session = Depends(get_session),
 ):
     competitor = session.scalar(
@@ -58,36 +212,43 @@ def get_competitor_data(
     if not competitor:
         raise HTTPException(status_code=404, detail="Target Competitor does not exist")
 
-    base_tournament_query = (
-        select(Tournament)
-        .select_from(TournamentCompetitor)
-        .join(TournamentCompetitor.tournament)
-        .where(TournamentCompetitor.competitor_id == competitor.id)
+    check_not_modified(
+        if_none_match=if_none_match,
+        resource_uuid=competitor.uuid,
+        version=competitor.version,
     )
 
-    past_tournaments_query = base_tournament_query.where(
-        Tournament.starting_round.is_not(None),
-        TournamentCompetitor.next_match_id.is_(None),
-    )
-    ongoing_tournaments_query = base_tournament_query.where(
-        Tournament.starting_round.is_not(None),
-        TournamentCompetitor.next_match_id.is_not(None),
-    )
-    upcoming_tournaments_query = base_tournament_query.where(
-        Tournament.starting_round.is_(None),
-    )
+    map_status_to_cursor_id = {
+        status: decode_cursor(cursor)
+        for status, cursor in [
+            ("past", past_cursor),
+            ("ongoing", ongoing_cursor),
+            ("upcoming", upcoming_cursor),
+        ]
+        if cursor is not None
+    }
 
-    past_tournaments = session.scalars(past_tournaments_query).all()
-    ongoing_tournaments = session.scalars(ongoing_tournaments_query).all()
-    upcoming_tournaments = session.scalars(upcoming_tournaments_query).all()
+    # Every status in a single query, partitioned afterwards
+    map_status_to_tournaments = {status: [] for status in TOURNAMENT_STATUSES}
+    for row in session.execute(
+        select_competitor_tournament_pages(
+            competitor_id=competitor.id,
+            limit=limit,
+            map_status_to_cursor_id=map_status_to_cursor_id,
+        )
+    ):
+        map_status_to_tournaments[row.status].append(row)
+
+    tournaments = {}
+    next_cursors = {}
+    for status, rows in map_status_to_tournaments.items():
+        tournaments[status], next_cursors[status] = split_page(rows, limit=limit)
 
     data = {
         "competitor": competitor,
-        "tournaments": {
-            "past": past_tournaments,
-            "ongoing": ongoing_tournaments,
-            "upcoming": upcoming_tournaments,
-        },
+        "tournaments": tournaments,
+        "nextCursors": next_cursors,
     }
 
+    response.headers["ETag"] = entity_tag(competitor.uuid, competitor.version)
     return data
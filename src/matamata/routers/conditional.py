@@ -0,0 +1,45 @@
+from typing import Annotated
+from uuid import UUID
+
+from fastapi import Header, HTTPException
+
+IfNoneMatch = Annotated[str | None, Header()]
+
+
+def entity_tag(resource_uuid: UUID, version: int) -> str:
+    # Strong validator: a version is bumped on every change of the response content
+    return f'"{resource_uuid}.{version}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        # If-None-Match uses the weak comparison
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+
+    return False
+
+
+def raise_not_modified(etag: str):
+    raise HTTPException(status_code=304, headers={"ETag": etag})
+
+
+def check_not_modified(
+    *,
+    if_none_match: str | None,
+    resource_uuid: UUID,
+    version: int,
+):
+    """Answer 304 when If-None-Match matches the resource version.
+
+    Endpoints load the resource and its version once, with the data they respond,
+    so checking the entity tag costs no query of its own.
+    """
+
+    etag = entity_tag(resource_uuid, version)
+    if etag_matches(if_none_match, etag):
+        raise_not_modified(etag)
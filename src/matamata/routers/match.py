@@ -1,42 +1,74 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy import select
 from sqlalchemy.orm import Session, joinedload
 
 from matamata.database import get_session
+from matamata.instrumentation import InstrumentedAPIRoute
 from matamata.models import Match
+from matamata.queries import match_detail_row_as_dict, select_match_detail_rows
 from matamata.schemas import MatchSchema, WinnerPayloadSchema
 from matamata.services import register_match_result as register_match_result_service
 from matamata.services.exceptions import (
+    MatamataServiceException,
     MatchAlreadyRegisteredResult,
+    MatchIsNotTournamentMatch,
     MatchMissingCompetitorFromPreviousMatch,
     MatchShouldHaveAutomaticWinner,
     MatchTargetCompetitorIsNotMatchCompetitor,
 )
 
-router = APIRouter(prefix="/match", tags=["match"])
+from .conditional import IfNoneMatch, check_not_modified, entity_tag
+
+router = APIRouter(prefix="/match", tags=["match"], route_class=InstrumentedAPIRoute)
+
+# HTTP status code and detail for each reason to reject a Match result
+MATCH_RESULT_ERRORS: dict[type[MatamataServiceException], tuple[int, str]] = {
+    MatchIsNotTournamentMatch: (404, "Target Match does not exist"),
+    MatchAlreadyRegisteredResult: (
+        409,
+        "Target Match has already registered its result",
+    ),
+    MatchShouldHaveAutomaticWinner: (
+        409,
+        "Target Match should have elected an automatic winner",
+    ),
+    MatchMissingCompetitorFromPreviousMatch: (
+        422,
+        "Target Match is not ready to register a result due to"
+        " registered previous Matches but missing Competitor",
+    ),
+    MatchTargetCompetitorIsNotMatchCompetitor: (
+        409,
+        "Target Competitor is not a target Match competitor",
+    ),
+}
 
 
 @router.get("/{match_uuid}", response_model=MatchSchema, status_code=200)
 def get_match_detail(
     match_uuid: UUID,
+    response: Response,
+    if_none_match: IfNoneMatch = None,
     session: Session = Depends(get_session),
 ):
-    match = session.scalar(
-        select(Match)
-        .where(Match.uuid == match_uuid)
-        .options(
-            joinedload(Match.tournament),
-            joinedload(Match.competitor_a),
-            joinedload(Match.competitor_b),
-        )
-    )
+    row = session.execute(
+        select_match_detail_rows().where(Match.uuid == match_uuid)
+    ).one_or_none()
 
-    if not match:
+    if not row:
         raise HTTPException(status_code=404, detail="Target Match does not exist")
 
-    return match
+    # Every change of a Match bumps its Tournament version
+    check_not_modified(
+        if_none_match=if_none_match,
+        resource_uuid=row.uuid,
+        version=row.tournament_version,
+    )
+
+    response.headers["ETag"] = entity_tag(row.uuid, row.tournament_version)
+    return match_detail_row_as_dict(row)
 
 
 @router.post("/{match_uuid}", response_model=MatchSchema, status_code=200)
@@ -64,28 +96,8 @@ def register_match_result(
             winner_uuid=winner_payload.winner_uuid,
             session=session,
         )
-    except MatchAlreadyRegisteredResult:
-        raise HTTPException(
-            status_code=409,
-            detail="Target Match has already registered its result",
-        )
-    except MatchShouldHaveAutomaticWinner:
-        raise HTTPException(
-            status_code=409,
-            detail=("Target Match should have elected an automatic winner"),
-        )
-    except MatchMissingCompetitorFromPreviousMatch:
-        raise HTTPException(
-            status_code=422,
-            detail=(
-                "Target Match is not ready to register a result due to"
-                " registered previous Matches but missing Competitor"
-            ),
-        )
-    except MatchTargetCompetitorIsNotMatchCompetitor:
-        raise HTTPException(
-            status_code=409,
-            detail="Target Competitor is not a target Match competitor",
-        )
+    except MatamataServiceException as exc:
+        status_code, detail = MATCH_RESULT_ERRORS[type(exc)]
+        raise HTTPException(status_code=status_code, detail=detail)
 
     return match
@@ -0,0 +1,58 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from typing import Annotated
+
+from fastapi import HTTPException, Query
+from sqlalchemy import Select
+from sqlalchemy.orm import InstrumentedAttribute, Session
+
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 1000
+# Ids are INTEGER columns, so larger cursors can't be compared against them
+MAX_CURSOR_ID = 2**31 - 1
+
+PageLimit = Annotated[int, Query(ge=1, le=MAX_PAGE_LIMIT)]
+
+
+def encode_cursor(last_id: int) -> str:
+    return urlsafe_b64encode(str(last_id).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        last_id = int(urlsafe_b64decode(cursor.encode()))
+    except (BinasciiError, UnicodeEncodeError, ValueError):
+        last_id = None
+
+    if last_id is None or not 0 <= last_id <= MAX_CURSOR_ID:
+        raise HTTPException(status_code=422, detail="Invalid pagination cursor")
+
+    return last_id
+
+
+def paginate_by_id(
+    *,
+    query: Select,
+    id_column: InstrumentedAttribute[int],
+    limit: int,
+    cursor: str | None,
+    session: Session,
+) -> tuple[list, str | None]:
+    # Keyset pagination: the cursor holds the last id of the previous page.
+    # query selects columns, including id_column, instead of ORM entities
+    if cursor is not None:
+        query = query.where(id_column > decode_cursor(cursor))
+
+    # Fetching an extra row tells whether there is a next page
+    rows = session.execute(query.order_by(id_column.asc()).limit(limit + 1)).all()
+
+    return split_page(rows, limit=limit)
+
+
+def split_page(rows: list, *, limit: int) -> tuple[list, str | None]:
+    # rows has up to limit + 1 items ordered by id
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].id)
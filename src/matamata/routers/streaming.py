@@ -0,0 +1,95 @@
+from collections.abc import Callable, Iterable, Iterator
+from typing import Any, NamedTuple
+
+import orjson
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Row, Select
+from sqlalchemy.orm import Session
+
+from matamata import database
+
+STREAM_PARTITION_SIZE = 1000
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+class StreamedArray(NamedTuple):
+    query: Select
+    row_as_dict: Callable[[Row], dict[str, Any]]
+
+
+def dump_json(content: Any) -> bytes:
+    # Same rendering as ORJSONResponse, to keep streamed bodies byte-compatible
+    return orjson.dumps(
+        content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    )
+
+
+def stream_json_object(
+    *,
+    fields: list[tuple[str, Any]],
+    session: Session,
+) -> Iterator[bytes]:
+    # The request session is closed as soon as the endpoint returns,
+    # so the stream uses its own session bound to the same engine.
+    # Its rows are read after the response headers are sent,
+    # hence streamed responses carry no ETag
+    bind = session.get_bind()
+    if bind.dialect.is_async:
+        # The stream is consumed in the threadpool, outside of any greenlet
+        bind = database.engine
+
+    with Session(bind) as stream_session:
+        if bind.dialect.name == "postgresql":
+            # Every streamed array is read from the same snapshot
+            stream_session.connection(
+                execution_options={"isolation_level": "REPEATABLE READ"}
+            )
+        yield b"{"
+        for field_index, (name, value) in enumerate(fields):
+            if field_index:
+                yield b","
+            yield dump_json(name) + b":"
+
+            if not isinstance(value, StreamedArray):
+                yield dump_json(value)
+                continue
+
+            # Server-side cursor: only a partition of rows is held in memory
+            result = stream_session.execute(
+                value.query.execution_options(yield_per=STREAM_PARTITION_SIZE)
+            )
+            separator = b"["
+            for partition in result.partitions():
+                yield separator + b",".join(
+                    dump_json(value.row_as_dict(row)) for row in partition
+                )
+                separator = b","
+            yield b"[]" if separator == b"[" else b"]"
+        yield b"}"
+
+
+def json_streaming_response(
+    *,
+    fields: list[tuple[str, Any]],
+    status_code: int,
+    session: Session,
+    headers: dict[str, str] | None = None,
+) -> StreamingResponse:
+    return StreamingResponse(
+        stream_json_object(fields=fields, session=session),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
+
+
+def stream_ndjson(items: Iterable[Any]) -> Iterator[bytes]:
+    # A JSON document per line, written a partition of items at a time
+    partition = []
+    for item in items:
+        partition.append(dump_json(item) + b"\n")
+        if len(partition) == STREAM_PARTITION_SIZE:
+            yield b"".join(partition)
+            partition = []
+    if partition:
+        yield b"".join(partition)
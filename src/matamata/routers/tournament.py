@@ -1,27 +1,72 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, joinedload
 
+from matamata import database
 from matamata.database import get_session
+from matamata.events import stream_tournament_events
+from matamata.instrumentation import InstrumentedAPIRoute
 from matamata.models import Competitor, Match, Tournament, TournamentCompetitor
+from matamata.queries import (
+    competitor_as_dict,
+    competitor_instance_as_dict,
+    competitor_match_row_as_dict,
+    competitor_row_as_dict,
+    finished_tournament_row_as_dict,
+    match_instance_as_dict,
+    match_listing_row_as_dict,
+    match_listing_status,
+    select_competitor_match_rows,
+    select_finished_tournament_rows,
+    select_match_listing_rows,
+    select_tournament_standings_rows,
+    tournament_after_start_as_dict,
+    tournament_as_dict,
+    tournament_standings_row_as_dict,
+)
 from matamata.schemas import (
+    FinishedTournamentPageSchema,
+    MatchResultsPayloadSchema,
     TournamentCompetitorListSchema,
     TournamentCompetitorMatchesSchema,
     TournamentCompetitorPayloadSchema,
     TournamentCompetitorSchema,
-    TournamentListSchema,
+    TournamentCompetitorsPayloadSchema,
+    TournamentCompetitorsRegistrationSchema,
     TournamentMatchesSchema,
+    TournamentMatchResultsSchema,
+    TournamentPageSchema,
     TournamentPayloadSchema,
     TournamentResultSchema,
     TournamentSchema,
+    TournamentStartPayloadSchema,
     TournamentStartSchema,
 )
+from matamata.services import (
+    register_competitors_in_tournament as register_competitors_in_tournament_service,
+)
+from matamata.services import register_match_results as register_match_results_service
 from matamata.services import start_tournament as start_tournament_service
+from matamata.services.bulk_updates import (
+    bump_competitor_versions,
+    bump_tournament_version,
+)
+from matamata.services.exceptions import TournamentSeedingIsNotTournamentCompetitors
+from matamata.settings import settings
 
-router = APIRouter(prefix="/tournament", tags=["tournament"])
+from .caching import cache_json_content, cache_json_response, cached_json_response
+from .conditional import IfNoneMatch, check_not_modified, entity_tag
+from .match import MATCH_RESULT_ERRORS
+from .pagination import DEFAULT_PAGE_LIMIT, PageLimit, paginate_by_id
+from .streaming import StreamedArray, json_streaming_response
+
+router = APIRouter(
+    prefix="/tournament", tags=["tournament"], route_class=InstrumentedAPIRoute
+)
 
 
 @router.post("/", response_model=TournamentSchema, status_code=201)
@@ -39,14 +84,52 @@ def create_tournament(
     return tournament
 
 
-@router.get("/", response_model=TournamentListSchema, status_code=200)
+@router.get("/", response_model=TournamentPageSchema, status_code=200)
 def list_tournaments(
+    limit: PageLimit = DEFAULT_PAGE_LIMIT,
+    cursor: str | None = None,
+    label_prefix: str | None = None,
     session: Session = Depends(get_session),
 ):
-    tournaments = session.scalars(select(Tournament)).all()
+    tournaments_query = select(Tournament.id, Tournament.uuid, Tournament.label)
+    if label_prefix:
+        tournaments_query = tournaments_query.where(
+            Tournament.label.startswith(label_prefix, autoescape=True)
+        )
+
+    tournaments, next_cursor = paginate_by_id(
+        query=tournaments_query,
+        id_column=Tournament.id,
+        limit=limit,
+        cursor=cursor,
+        session=session,
+    )
 
     data = {
         "tournaments": tournaments,
+        "nextCursor": next_cursor,
+    }
+
+    return data
+
+
+@router.get("/finished", response_model=FinishedTournamentPageSchema, status_code=200)
+def list_finished_tournaments(
+    limit: PageLimit = DEFAULT_PAGE_LIMIT,
+    cursor: str | None = None,
+    session: Session = Depends(get_session),
+):
+    tournaments, next_cursor = paginate_by_id(
+        query=select_finished_tournament_rows(),
+        id_column=Tournament.id,
+        limit=limit,
+        cursor=cursor,
+        session=session,
+    )
+
+    data = {
+        "tournaments": [finished_tournament_row_as_dict(row) for row in tournaments],
+        "nextCursor": next_cursor,
     }
 
     return data
@@ -88,6 +171,13 @@ def register_competitor_in_tournament(
     )
     session.add(tournament_competitor)
     try:
+        # The bumps autoflush the new association, which might be a duplicate
+        bump_tournament_version(tournament_id=tournament.id, session=session)
+        bump_competitor_versions(
+            tournament_id=tournament.id,
+            competitor_ids=[competitor.id],
+            session=session,
+        )
         session.commit()
     except IntegrityError:
         session.rollback()
@@ -101,6 +191,47 @@ def register_competitor_in_tournament(
     return tournament_competitor
 
 
+@router.post(
+    "/{tournament_uuid}/competitors",
+    response_model=TournamentCompetitorsRegistrationSchema,
+    status_code=200,
+)
+def register_competitors_in_tournament(
+    tournament_uuid: UUID,
+    competitors_payload: TournamentCompetitorsPayloadSchema,
+    session: Session = Depends(get_session),
+):
+    tournament = session.scalar(
+        select(Tournament).where(Tournament.uuid == tournament_uuid)
+    )
+
+    if not tournament:
+        raise HTTPException(status_code=404, detail="Target Tournament does not exist")
+
+    if tournament.matches_creation:
+        raise HTTPException(
+            status_code=409,
+            detail="Target Tournament has already created its matches and does not allow new Competitors registration",
+        )
+
+    registration = register_competitors_in_tournament_service(
+        tournament=tournament,
+        competitor_uuids=competitors_payload.competitor_uuids,
+        session=session,
+    )
+
+    data = {
+        "tournament": tournament,
+        "registered": [
+            competitor_as_dict(uuid, label) for uuid, label in registration.registered
+        ],
+        "alreadyRegistered": registration.already_registered,
+        "missing": registration.missing,
+    }
+
+    return data
+
+
 @router.get(
     "/{tournament_uuid}/competitor",
     response_model=TournamentCompetitorListSchema,
@@ -108,6 +239,9 @@ def register_competitor_in_tournament(
 )
 def list_competitors_in_tournament(
     tournament_uuid: UUID,
+    response: Response,
+    stream: bool = False,
+    if_none_match: IfNoneMatch = None,
     session: Session = Depends(get_session),
 ):
     tournament = session.scalar(
@@ -117,20 +251,54 @@ def list_competitors_in_tournament(
     if not tournament:
         raise HTTPException(status_code=404, detail="Target Tournament does not exist")
 
-    competitors = session.scalars(
-        select(Competitor)
+    check_not_modified(
+        if_none_match=if_none_match,
+        resource_uuid=tournament.uuid,
+        version=tournament.version,
+    )
+
+    competitors_query = (
+        select(Competitor.uuid, Competitor.label)
         .select_from(TournamentCompetitor)
         .join(TournamentCompetitor.competitor)
         .where(
             TournamentCompetitor.tournament_id == tournament.id,
         )
-    ).all()
+    )
+
+    if stream:
+        return json_streaming_response(
+            fields=[
+                (
+                    "competitors",
+                    StreamedArray(competitors_query, competitor_row_as_dict),
+                ),
+                ("tournament", tournament_as_dict(tournament)),
+            ],
+            status_code=200,
+            session=session,
+        )
+
+    etag = entity_tag(tournament.uuid, tournament.version)
+
+    if settings.FAST_JSON_RESPONSES:
+        content = {
+            "competitors": [
+                competitor_row_as_dict(row)
+                for row in session.execute(competitors_query)
+            ],
+            "tournament": tournament_as_dict(tournament),
+        }
+        return ORJSONResponse(content=content, status_code=200, headers={"ETag": etag})
+
+    competitors = session.execute(competitors_query).all()
 
     data = {
         "tournament": tournament,
         "competitors": competitors,
     }
 
+    response.headers["ETag"] = etag
     return data
 
 
@@ -142,6 +310,8 @@ def list_competitors_in_tournament(
 def list_matches_for_competitor_in_tournament(
     tournament_uuid: UUID,
     competitor_uuid: UUID,
+    response: Response,
+    if_none_match: IfNoneMatch = None,
     session: Session = Depends(get_session),
 ):
     tournament = session.scalar(
@@ -183,53 +353,45 @@ def list_matches_for_competitor_in_tournament(
             detail="Target Tournament has not created its matches yet",
         )
 
-    base_match_query = (
-        select(Match)
-        .where(
-            Match.tournament_id == tournament.id,
-            (
-                (Match.competitor_a_id == competitor.id)
-                | (Match.competitor_b_id == competitor.id)
-            ),
-        )
-        .order_by(
-            Match.round.desc(),
-            Match.position.asc(),
-        )
+    # Matches of the Competitor only change along with the Tournament version
+    check_not_modified(
+        if_none_match=if_none_match,
+        resource_uuid=tournament.uuid,
+        version=tournament.version,
     )
 
-    bare_past_matches = session.scalars(
-        base_match_query.where(
-            Match.result_registration.is_not(None),
-            Match.winner_id.is_not(None),
+    # A single ordered scan classifies both past and upcoming Matches
+    matches = {"past": [], "upcoming": []}
+    for row in session.execute(
+        select_competitor_match_rows(
+            tournament_id=tournament.id,
+            competitor_id=competitor.id,
         )
-    ).all()
-    bare_upcoming_matches = session.scalars(
-        base_match_query.where(
-            Match.result_registration.is_(None),
-            Match.winner_id.is_(None),
+    ):
+        status = match_listing_status(
+            result_registration=row.result_registration,
+            winner_id=row.winner_id,
         )
-    ).all()
+        if status is not None:
+            matches[status].append(competitor_match_row_as_dict(row))
 
-    past_matches = []
-    for current_match in bare_past_matches:
-        current_match.currentCompetitor = competitor
-        past_matches.append(current_match)
+    etag = entity_tag(tournament.uuid, tournament.version)
 
-    upcoming_matches = []
-    for current_match in bare_upcoming_matches:
-        current_match.currentCompetitor = competitor
-        upcoming_matches.append(current_match)
+    if settings.FAST_JSON_RESPONSES:
+        content = {
+            "tournament": tournament_as_dict(tournament),
+            "competitor": competitor_instance_as_dict(competitor),
+            "matches": matches,
+        }
+        return ORJSONResponse(content=content, status_code=200, headers={"ETag": etag})
 
     data = {
         "tournament": tournament,
         "competitor": competitor,
-        "matches": {
-            "past": past_matches,
-            "upcoming": upcoming_matches,
-        },
+        "matches": matches,
     }
 
+    response.headers["ETag"] = etag
     return data
 
 
@@ -238,6 +400,7 @@ def list_matches_for_competitor_in_tournament(
 )
 def start_tournament(
     tournament_uuid: UUID,
+    start_payload: TournamentStartPayloadSchema | None = None,
     session: Session = Depends(get_session),
 ):
     tournament = session.scalar(
@@ -270,11 +433,34 @@ def start_tournament(
             detail="Target Tournament does not have one Competitor registered yet",
         )
 
-    matches = start_tournament_service(
-        tournament=tournament,
-        competitor_associations=tournament.competitor_associations,
-        session=session,
-    )
+    if start_payload is None:
+        start_payload = TournamentStartPayloadSchema()
+
+    try:
+        matches = start_tournament_service(
+            tournament=tournament,
+            competitor_associations=tournament.competitor_associations,
+            seed=start_payload.seed,
+            seeding=start_payload.seeding,
+            session=session,
+        )
+    except TournamentSeedingIsNotTournamentCompetitors:
+        raise HTTPException(
+            status_code=422,
+            detail="Target seeding must only list distinct Competitors registered in target Tournament",
+        )
+
+    if settings.FAST_JSON_RESPONSES:
+        # Competitors of the Matches are the ones already in the identity map
+        content = {
+            "tournament": tournament_after_start_as_dict(tournament),
+            "competitors": [
+                competitor_instance_as_dict(competitor)
+                for competitor in tournament.competitors
+            ],
+            "matches": [match_instance_as_dict(match) for match in matches],
+        }
+        return ORJSONResponse(content=content, status_code=201)
 
     data = {
         "tournament": tournament,
@@ -285,11 +471,14 @@ def start_tournament(
     return data
 
 
-@router.get(
-    "/{tournament_uuid}/match", response_model=TournamentMatchesSchema, status_code=200
+@router.post(
+    "/{tournament_uuid}/results",
+    response_model=TournamentMatchResultsSchema,
+    status_code=200,
 )
-def list_tournament_matches(
+def register_match_results(
     tournament_uuid: UUID,
+    results_payload: MatchResultsPayloadSchema,
     session: Session = Depends(get_session),
 ):
     tournament = session.scalar(
@@ -305,41 +494,46 @@ def list_tournament_matches(
             detail="Target Tournament has not created its matches yet",
         )
 
-    base_match_query = (
-        select(Match)
-        .where(Match.tournament_id == tournament.id)
-        .order_by(
-            Match.round.desc(),
-            Match.position.asc(),
-        )
-    )
-
-    past_matches_query = base_match_query.where(
-        Match.result_registration.is_not(None),
-        Match.winner_id.is_not(None),
-    )
-    upcoming_matches_query = base_match_query.where(
-        Match.result_registration.is_(None),
-        Match.winner_id.is_(None),
+    outcomes = register_match_results_service(
+        tournament=tournament,
+        results=[
+            (result.match_uuid, result.winner_uuid)
+            for result in results_payload.results
+        ],
+        session=session,
     )
 
-    past_matches = session.scalars(past_matches_query).all()
-    upcoming_matches = session.scalars(upcoming_matches_query).all()
+    results = []
+    for outcome in outcomes:
+        if outcome.error is None:
+            status_code, detail = 200, None
+        else:
+            status_code, detail = MATCH_RESULT_ERRORS[type(outcome.error)]
+        results.append(
+            {
+                "match_uuid": outcome.match_uuid,
+                "winner_uuid": outcome.winner_uuid,
+                "status_code": status_code,
+                "detail": detail,
+                "match": outcome.match,
+            }
+        )
 
     data = {
         "tournament": tournament,
-        "past": past_matches,
-        "upcoming": upcoming_matches,
+        "results": results,
     }
 
     return data
 
 
 @router.get(
-    "/{tournament_uuid}/result", response_model=TournamentResultSchema, status_code=200
+    "/{tournament_uuid}/match", response_model=TournamentMatchesSchema, status_code=200
 )
-def get_tournament_top4(
+def list_tournament_matches(
     tournament_uuid: UUID,
+    stream: bool = False,
+    if_none_match: IfNoneMatch = None,
     session: Session = Depends(get_session),
 ):
     tournament = session.scalar(
@@ -355,44 +549,171 @@ def get_tournament_top4(
             detail="Target Tournament has not created its matches yet",
         )
 
-    round0_matches = session.scalars(
-        select(Match)
-        .where(
-            Match.tournament_id == tournament.id,
-            Match.round == 0,
-            Match.result_registration.is_not(None),
-        )
-        .options(
-            joinedload(Match.winner),
-            joinedload(Match.loser),
+    check_not_modified(
+        if_none_match=if_none_match,
+        resource_uuid=tournament.uuid,
+        version=tournament.version,
+    )
+
+    if not stream:
+        cached_response = cached_json_response(
+            tournament_uuid=tournament.uuid,
+            name="match",
+            version=tournament.version,
         )
+        if cached_response is not None:
+            return cached_response
+
+    base_match_rows_query = (
+        select_match_listing_rows()
+        .where(Match.tournament_id == tournament.id)
         .order_by(
+            Match.round.desc(),
             Match.position.asc(),
         )
-    ).all()
+    )
 
-    top4 = [None, None, None, None]
-    if tournament.number_competitors <= 2:
-        if len(round0_matches) != 1:
-            raise HTTPException(
-                status_code=422,
-                detail="Target Tournament is not ready to display the top 4 competitors",
-            )
-    else:
-        if len(round0_matches) != 2:
-            raise HTTPException(
-                status_code=422,
-                detail="Target Tournament is not ready to display the top 4 competitors",
-            )
-        top4[2] = round0_matches[1].winner
-        top4[3] = round0_matches[1].loser
+    if stream:
+        return json_streaming_response(
+            fields=[
+                ("tournament", tournament_after_start_as_dict(tournament)),
+                (
+                    "past",
+                    StreamedArray(
+                        base_match_rows_query.where(
+                            Match.result_registration.is_not(None),
+                            Match.winner_id.is_not(None),
+                        ),
+                        match_listing_row_as_dict,
+                    ),
+                ),
+                (
+                    "upcoming",
+                    StreamedArray(
+                        base_match_rows_query.where(
+                            Match.result_registration.is_(None),
+                            Match.winner_id.is_(None),
+                        ),
+                        match_listing_row_as_dict,
+                    ),
+                ),
+            ],
+            status_code=200,
+            session=session,
+        )
 
-    top4[0] = round0_matches[0].winner
-    top4[1] = round0_matches[0].loser
+    # A single ordered scan classifies both past and upcoming Matches.
+    # The Tournament version is read by the same statement,
+    # so the cached content is never newer nor older than its version
+    version = tournament.version
+    matches = {"past": [], "upcoming": []}
+    for row in session.execute(
+        base_match_rows_query.add_columns(
+            Match.result_registration,
+            Match.winner_id,
+            Tournament.version.label("tournament_version"),
+        ).join(Tournament, Match.tournament_id == Tournament.id)
+    ):
+        version = row.tournament_version
+        status = match_listing_status(
+            result_registration=row.result_registration,
+            winner_id=row.winner_id,
+        )
+        if status is not None:
+            matches[status].append(match_listing_row_as_dict(row))
+
+    if settings.FAST_JSON_RESPONSES:
+        return cache_json_content(
+            tournament_uuid=tournament.uuid,
+            name="match",
+            version=version,
+            content={
+                "tournament": tournament_after_start_as_dict(tournament),
+                "past": matches["past"],
+                "upcoming": matches["upcoming"],
+            },
+        )
 
     data = {
         "tournament": tournament,
-        "top4": top4,
+        "past": matches["past"],
+        "upcoming": matches["upcoming"],
     }
 
-    return data
+    return cache_json_response(
+        tournament_uuid=tournament.uuid,
+        name="match",
+        version=version,
+        response_model=TournamentMatchesSchema,
+        data=data,
+    )
+
+
+@router.get(
+    "/{tournament_uuid}/events",
+    status_code=200,
+    responses={
+        200: {
+            "content": {"text/event-stream": {}},
+            "description": "Server-Sent Events for each Match result of the Tournament",
+        }
+    },
+)
+def watch_tournament_events(tournament_uuid: UUID):
+    # A short-lived session instead of the request one,
+    # so it is closed before streaming and watchers don't hold database connections
+    with Session(database.engine) as session:
+        tournament_id = session.scalar(
+            select(Tournament.id).where(Tournament.uuid == tournament_uuid)
+        )
+
+    if not tournament_id:
+        raise HTTPException(status_code=404, detail="Target Tournament does not exist")
+
+    return StreamingResponse(
+        stream_tournament_events(tournament_uuid),
+        status_code=200,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get(
+    "/{tournament_uuid}/result", response_model=TournamentResultSchema, status_code=200
+)
+def get_tournament_top4(
+    tournament_uuid: UUID,
+    if_none_match: IfNoneMatch = None,
+    session: Session = Depends(get_session),
+):
+    row = session.execute(
+        select_tournament_standings_rows().where(Tournament.uuid == tournament_uuid)
+    ).one_or_none()
+
+    if not row:
+        raise HTTPException(status_code=404, detail="Target Tournament does not exist")
+
+    if not row.matches_creation:
+        raise HTTPException(
+            status_code=422,
+            detail="Target Tournament has not created its matches yet",
+        )
+
+    if not row.has_standings:
+        raise HTTPException(
+            status_code=422,
+            detail="Target Tournament is not ready to display the top 4 competitors",
+        )
+
+    check_not_modified(
+        if_none_match=if_none_match,
+        resource_uuid=row.uuid,
+        version=row.version,
+    )
+
+    # Standings are a single row read, so the response is not cached
+    return ORJSONResponse(
+        content=tournament_standings_row_as_dict(row),
+        status_code=200,
+        headers={"ETag": entity_tag(row.uuid, row.version)},
+    )
@@ -1,7 +1,7 @@
 from typing import Annotated
 from uuid import UUID
 
-from pydantic import BaseModel, Field, computed_field
+from pydantic import AliasChoices, BaseModel, Field
 from pydantic.functional_validators import AfterValidator
 
 
@@ -44,16 +44,37 @@ class LabelSchema(BaseModel):
 
 TournamentPayloadSchema = LabelSchema
 CompetitorPayloadSchema = LabelSchema
+CompetitorLabelsPayloadSchema = Annotated[
+    list[NonEmptyTrimmedString], Field(min_length=1)
+]
 
 
 class TournamentCompetitorPayloadSchema(BaseModel):
     competitor_uuid: UUID
 
 
+class TournamentCompetitorsPayloadSchema(BaseModel):
+    competitor_uuids: list[UUID] = Field(min_length=1)
+
+
+class TournamentStartPayloadSchema(BaseModel):
+    seed: int | None = None
+    # Competitor UUIDs from the top seed
+    seeding: list[UUID] | None = None
+
+
 class WinnerPayloadSchema(BaseModel):
     winner_uuid: UUID
 
 
+class MatchResultPayloadSchema(WinnerPayloadSchema):
+    match_uuid: UUID
+
+
+class MatchResultsPayloadSchema(BaseModel):
+    results: list[MatchResultPayloadSchema] = Field(min_length=1)
+
+
 class UuidLabelSchema(BaseModel):
     uuid: UUID
     label: NonEmptyTrimmedString
@@ -71,15 +92,39 @@ class CompetitorListSchema(BaseModel):
     competitors: list[CompetitorSchema]
 
 
+class TournamentPageSchema(TournamentListSchema):
+    nextCursor: str | None
+
+
+class CompetitorPageSchema(CompetitorListSchema):
+    nextCursor: str | None
+
+
+class FinishedTournamentSchema(UuidLabelSchema):
+    champion: CompetitorSchema
+
+
+class FinishedTournamentPageSchema(BaseModel):
+    tournaments: list[FinishedTournamentSchema]
+    nextCursor: str | None
+
+
 class TournamentsAccordingToCompetitorSchema(BaseModel):
     past: list[TournamentSchema]
     ongoing: list[TournamentSchema]
     upcoming: list[TournamentSchema]
 
 
+class CursorsAccordingToCompetitorSchema(BaseModel):
+    past: str | None
+    ongoing: str | None
+    upcoming: str | None
+
+
 class CompetitorDetailSchema(BaseModel):
     competitor: CompetitorSchema
     tournaments: TournamentsAccordingToCompetitorSchema
+    nextCursors: CursorsAccordingToCompetitorSchema
 
 
 class TournamentCompetitorSchema(BaseModel):
@@ -91,30 +136,27 @@ class TournamentCompetitorListSchema(CompetitorListSchema):
     tournament: TournamentSchema
 
 
+class TournamentCompetitorsRegistrationSchema(BaseModel):
+    tournament: TournamentSchema
+    registered: list[CompetitorSchema]
+    alreadyRegistered: list[UUID]
+    missing: list[UUID]
+
+
 class TournamentAfterStartSchema(UuidLabelSchema):
-    startingRound: NonNegativeInt = Field(validation_alias="starting_round")
-    numberCompetitors: PositiveInt = Field(validation_alias="number_competitors")
+    startingRound: NonNegativeInt = Field(
+        validation_alias=AliasChoices("starting_round", "startingRound")
+    )
+    numberCompetitors: PositiveInt = Field(
+        validation_alias=AliasChoices("number_competitors", "numberCompetitors")
+    )
 
 
 class MatchForTournamentListingWithOtherCompetitor(BaseModel):
     uuid: UUID
     round: NonNegativeInt
     position: NonNegativeInt
-    competitorA: CompetitorSchema | None = Field(
-        exclude=True, validation_alias="competitor_a"
-    )
-    competitorB: CompetitorSchema | None = Field(
-        exclude=True, validation_alias="competitor_b"
-    )
-    currentCompetitor: CompetitorSchema | None = Field(exclude=True)
-
-    @computed_field
-    @property
-    def otherCompetitor(self) -> CompetitorSchema | None:
-        competitors = [self.competitorA, self.competitorB]
-        competitors.remove(self.currentCompetitor)
-        other_competitor = competitors.pop()
-        return other_competitor
+    otherCompetitor: CompetitorSchema | None
 
 
 class TournamentCompetitorMatchesWithOtherCompetitorSchema(BaseModel):
@@ -130,8 +172,13 @@ class MatchSchemaForTournamentListing(BaseModel):
     uuid: UUID
     round: NonNegativeInt
     position: NonNegativeInt
-    competitorA: CompetitorSchema | None = Field(validation_alias="competitor_a")
-    competitorB: CompetitorSchema | None = Field(validation_alias="competitor_b")
+    # Validated from ORM instances as well as from row projection dictionaries
+    competitorA: CompetitorSchema | None = Field(
+        validation_alias=AliasChoices("competitor_a", "competitorA")
+    )
+    competitorB: CompetitorSchema | None = Field(
+        validation_alias=AliasChoices("competitor_b", "competitorB")
+    )
     winner: CompetitorSchema | None
     loser: CompetitorSchema | None
 
@@ -155,3 +202,16 @@ class MatchSchema(MatchSchemaForTournamentListing):
 class TournamentResultSchema(BaseModel):
     tournament: TournamentAfterStartSchema
     top4: list[CompetitorSchema | None]
+
+
+class MatchResultStatusSchema(BaseModel):
+    matchUuid: UUID = Field(validation_alias="match_uuid")
+    winnerUuid: UUID = Field(validation_alias="winner_uuid")
+    statusCode: int = Field(validation_alias="status_code")
+    detail: str | None
+    match: MatchSchemaForTournamentListing | None
+
+
+class TournamentMatchResultsSchema(BaseModel):
+    tournament: TournamentAfterStartSchema
+    results: list[MatchResultStatusSchema]
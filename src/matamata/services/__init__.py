@@ -1,7 +1,13 @@
+from .create_competitors import create_competitors
+from .register_competitors import register_competitors_in_tournament
 from .register_match_result import register_match_result
+from .register_match_results import register_match_results
 from .start_tournament import start_tournament
 
 __all__ = [
+    "create_competitors",
+    "register_competitors_in_tournament",
     "register_match_result",
+    "register_match_results",
     "start_tournament",
 ]
@@ -0,0 +1,462 @@
+from array import array
+from collections.abc import Iterable, Sized
+from datetime import datetime
+from functools import cached_property
+from math import floor, log2
+from typing import NamedTuple
+
+from .exceptions import (
+    MatchAlreadyRegisteredResult,
+    MatchMissingCompetitorFromPreviousMatch,
+    MatchShouldHaveAutomaticWinner,
+    MatchTargetCompetitorIsNotMatchCompetitor,
+)
+
+MATCH_STATE_COLUMNS = (
+    "competitor_a_id",
+    "competitor_b_id",
+    "winner_id",
+    "loser_id",
+    "result_registration",
+)
+
+# Tournament standings columns of the winner and the loser of each round 0 position
+STANDINGS_COLUMNS = {
+    0: ("first_place_id", "second_place_id"),
+    1: ("third_place_id", "fourth_place_id"),
+}
+
+
+def calculate_tournament_parameters(competitors: Sized) -> tuple[int, int, int]:
+    # We calculate again to avoid wrong parametrization
+    number_of_competitors = len(competitors)
+    if number_of_competitors == 1:
+        starting_round = 0
+        number_of_entry_matches = 1
+    else:
+        starting_round = int(floor(log2(number_of_competitors - 1)))
+        number_of_entry_matches = 2**starting_round
+
+    return number_of_competitors, starting_round, number_of_entry_matches
+
+
+def calculate_round_offset(*, starting_round: int, match_round: int) -> int:
+    # Closed form of the geometric sum of 2 ** r for r from match_round + 1 to starting_round
+    return (1 << (starting_round + 1)) - (1 << (match_round + 1))
+
+
+def calculate_match_index(*, starting_round, match_round, match_position):
+    if match_round > starting_round:
+        raise ValueError("invalid round values combination")
+
+    if match_position >= 2**match_round:
+        raise ValueError("invalid round/position values combination")
+
+    return (
+        calculate_round_offset(starting_round=starting_round, match_round=match_round)
+        + match_position
+    )
+
+
+class BracketLayout(NamedTuple):
+    # Compact arrays indexed by calculate_match_index,
+    # where -1 stands for no next match or no feeder matches
+    rounds: array
+    positions: array
+    next_indices: array
+    # The second feeder match always follows the first one
+    first_feeder_indices: array
+
+
+def generate_bracket_layout(
+    *, starting_round: int, has_third_place: bool
+) -> BracketLayout:
+    """Generate the whole bracket layout, round by round, with array operations only."""
+
+    rounds = array("i")
+    positions = array("i")
+    next_indices = array("i")
+    first_feeder_indices = array("i")
+
+    for round_ in range(starting_round, -1, -1):
+        number_of_matches = 1 << round_
+        rounds.extend(array("i", [round_]) * number_of_matches)
+        positions.extend(array("i", range(number_of_matches)))
+
+        round_next_indices = array("i", [-1]) * number_of_matches
+        if round_ > 0:
+            next_round_offset = calculate_round_offset(
+                starting_round=starting_round, match_round=round_ - 1
+            )
+            next_round_indices = array(
+                "i",
+                range(next_round_offset, next_round_offset + number_of_matches // 2),
+            )
+            # Positions 2p and 2p + 1 advance to position p
+            round_next_indices[0::2] = next_round_indices
+            round_next_indices[1::2] = next_round_indices
+        next_indices.extend(round_next_indices)
+
+        if round_ == starting_round:
+            first_feeder_indices.extend(array("i", [-1]) * number_of_matches)
+        else:
+            previous_round_offset = calculate_round_offset(
+                starting_round=starting_round, match_round=round_ + 1
+            )
+            first_feeder_indices.extend(
+                array(
+                    "i",
+                    range(
+                        previous_round_offset,
+                        previous_round_offset + 2 * number_of_matches,
+                        2,
+                    ),
+                )
+            )
+
+    if has_third_place:
+        # The semifinal losers compete in the third place match
+        rounds.append(0)
+        positions.append(1)
+        next_indices.append(-1)
+        first_feeder_indices.append(
+            calculate_round_offset(starting_round=starting_round, match_round=1)
+        )
+
+    return BracketLayout(rounds, positions, next_indices, first_feeder_indices)
+
+
+def standard_seeding_order(number_of_slots: int) -> array:
+    """Zero-based seed of each entry slot, where slots 2p and 2p + 1 are the entry match p sides.
+
+    Each doubling pairs every seed with its complement,
+    so the top 2 seeds can only meet in the final, the top 4 in the semifinals and so on.
+    The doublings add up to O(number_of_slots) operations.
+    """
+
+    if number_of_slots < 1 or number_of_slots & (number_of_slots - 1):
+        raise ValueError("number of slots must be a power of 2")
+
+    order = array("i", [0])
+    while len(order) < number_of_slots:
+        complement = 2 * len(order) - 1
+        doubled = array("i", order) * 2
+        doubled[0::2] = order
+        doubled[1::2] = array("i", (complement - seed for seed in order))
+        order = doubled
+
+    return order
+
+
+class Propagation(NamedTuple):
+    # Values to be set for each following Match index
+    match_changes: list[tuple[int, dict]]
+    # Next Match index of each Competitor id, None when there is no next Match
+    next_match_indices: dict[int, int | None]
+
+
+class BracketEngine:
+    """The whole bracket of a Tournament, held in arrays indexed by calculate_match_index.
+
+    Entry matches come first, then each following round, and the final.
+    The third place match, when there is one, is the last index.
+    Every topology question (next match, feeder matches, third place routing)
+    is answered with arithmetic over (round, position) without any lookup.
+    """
+
+    def __init__(self, *, number_competitors: int):
+        (
+            self.number_competitors,
+            self.starting_round,
+            self.number_of_entry_matches,
+        ) = calculate_tournament_parameters(range(number_competitors))
+
+        self.final_index = calculate_match_index(
+            starting_round=self.starting_round,
+            match_round=0,
+            match_position=0,
+        )
+        self.third_place_index = (
+            self.final_index + 1 if self.number_competitors > 2 else None
+        )
+        self.size = self.final_index + 1 + (self.third_place_index is not None)
+
+        self.match_ids: list[int | None] = [None] * self.size
+        # One array per column of MATCH_STATE_COLUMNS
+        self.columns: dict[str, list] = {
+            column: [None] * self.size for column in MATCH_STATE_COLUMNS
+        }
+
+        # Indices of Matches changed since the bracket was built or loaded,
+        # each with the columns changed on it
+        self.changed_indices: dict[int, set[str]] = {}
+        # Next Match index of each Competitor whose next Match changed
+        self.next_match_indices: dict[int, int | None] = {}
+
+    @cached_property
+    def layout(self) -> BracketLayout:
+        # Only needed for whole bracket operations, such as the bulk insert
+        return generate_bracket_layout(
+            starting_round=self.starting_round,
+            has_third_place=self.third_place_index is not None,
+        )
+
+    @classmethod
+    def from_match_rows(cls, *, number_competitors: int, match_rows) -> "BracketEngine":
+        """Load the state of started Tournament Matches.
+
+        Each row has the Match id, round, position and MATCH_STATE_COLUMNS.
+        """
+
+        engine = cls(number_competitors=number_competitors)
+        for row in match_rows:
+            index = engine.index(row["round"], row["position"])
+            engine.match_ids[index] = row["id"]
+            for column, values in engine.columns.items():
+                values[index] = row[column]
+
+        return engine
+
+    def index(self, round_: int, position: int) -> int:
+        if round_ == 0 and position == 1:
+            if self.third_place_index is None:
+                raise ValueError("invalid round/position values combination")
+            return self.third_place_index
+
+        return calculate_match_index(
+            starting_round=self.starting_round,
+            match_round=round_,
+            match_position=position,
+        )
+
+    def round_position(self, index: int) -> tuple[int, int]:
+        if index == self.third_place_index:
+            return 0, 1
+        if not 0 <= index < self.size:
+            raise ValueError("invalid match index")
+
+        # Indices of round r start at calculate_round_offset(r)
+        remaining = (1 << (self.starting_round + 1)) - index
+        round_ = (remaining - 1).bit_length() - 1
+        position = index - calculate_round_offset(
+            starting_round=self.starting_round, match_round=round_
+        )
+
+        return round_, position
+
+    def next_match_index(self, index: int) -> int | None:
+        round_, position = self.round_position(index)
+        if round_ == 0:
+            return None
+        return self.index(round_ - 1, position // 2)
+
+    def loser_next_match_index(self, index: int) -> int | None:
+        # The semifinal losers are the only ones to compete in a next match
+        round_, _ = self.round_position(index)
+        if round_ != 1:
+            return None
+        return self.third_place_index
+
+    def feeder_indices(self, index: int) -> tuple[int, int] | None:
+        if index == self.third_place_index:
+            return self.index(1, 0), self.index(1, 1)
+
+        round_, position = self.round_position(index)
+        if round_ == self.starting_round:
+            return None
+        return self.index(round_ + 1, 2 * position), self.index(
+            round_ + 1, 2 * position + 1
+        )
+
+    @staticmethod
+    def next_match_key(position: int) -> str:
+        # Even positions feed the first side of the next match
+        if position % 2 == 0:
+            return "competitor_a_id"
+        return "competitor_b_id"
+
+    def match_values(self, index: int) -> dict:
+        return {column: values[index] for column, values in self.columns.items()}
+
+    def changed_match_values(self, index: int) -> dict:
+        return {
+            column: self.columns[column][index]
+            for column in self.changed_indices.get(index, ())
+        }
+
+    def set_match_values(self, index: int, values: dict):
+        for column, value in values.items():
+            self.columns[column][index] = value
+        self.changed_indices.setdefault(index, set()).update(values)
+
+    def propagation(
+        self,
+        index: int,
+        *,
+        winner_id: int,
+        loser_id: int,
+        result_registration: datetime,
+    ) -> Propagation:
+        """Plan where the winner and the loser of a Match go next."""
+
+        _, position = self.round_position(index)
+        competitor_key = self.next_match_key(position)
+
+        match_changes = []
+        # On most cases, there won't be a next match for a loser
+        next_match_indices = {loser_id: None}
+
+        next_match_index = self.next_match_index(index)
+        if next_match_index is not None:
+            match_changes.append((next_match_index, {competitor_key: winner_id}))
+        next_match_indices[winner_id] = next_match_index
+
+        loser_next_match_index = self.loser_next_match_index(index)
+        if loser_next_match_index is not None:
+            if self.number_competitors == 3:
+                # There is a very specific corner case
+                # when the loser of the only semifinal of a three competitor tournament
+                # is the third place: it is an automatic winner of the next match
+                match_changes.append(
+                    (
+                        loser_next_match_index,
+                        {
+                            competitor_key: loser_id,
+                            "winner_id": loser_id,
+                            "result_registration": result_registration,
+                        },
+                    )
+                )
+            else:
+                match_changes.append(
+                    (loser_next_match_index, {competitor_key: loser_id})
+                )
+                next_match_indices[loser_id] = loser_next_match_index
+
+        return Propagation(match_changes, next_match_indices)
+
+    def apply(self, propagation: Propagation):
+        for index, values in propagation.match_changes:
+            self.set_match_values(index, values)
+        self.next_match_indices.update(propagation.next_match_indices)
+
+    def standings_values(self, indices: Iterable[int]) -> dict[str, int | None]:
+        """Tournament standings columns set by the decided round 0 Matches among indices."""
+
+        values = {}
+        for position, (winner_column, loser_column) in STANDINGS_COLUMNS.items():
+            if position == 1 and self.third_place_index is None:
+                continue
+            index = self.index(0, position)
+            if index in indices and self.columns["result_registration"][index]:
+                values[winner_column] = self.columns["winner_id"][index]
+                values[loser_column] = self.columns["loser_id"][index]
+
+        return values
+
+    def seat_entry_competitors(self, competitor_ids: list[int], *, seeded=False):
+        """Pair Competitors in entry matches and register automatic winnings.
+
+        By default, the sequence fills the first side of every entry match,
+        then the second sides, so automatic winnings are in the last entry matches.
+        A seeded sequence goes from the top seed down and follows standard_seeding_order,
+        so top seeds get the automatic winnings and meet each other as late as possible.
+        """
+
+        if seeded:
+            sides = [
+                competitor_ids[seed] if seed < len(competitor_ids) else None
+                for seed in standard_seeding_order(2 * self.number_of_entry_matches)
+            ]
+            entry_pairs = zip(sides[0::2], sides[1::2])
+        else:
+            entry_pairs = (
+                (
+                    competitor_ids[match_index],
+                    (
+                        competitor_ids[match_index + self.number_of_entry_matches]
+                        if match_index + self.number_of_entry_matches
+                        < len(competitor_ids)
+                        else None
+                    ),
+                )
+                for match_index in range(self.number_of_entry_matches)
+            )
+
+        for match_index, (competitor_a_id, competitor_b_id) in enumerate(entry_pairs):
+            self.set_match_values(
+                match_index,
+                {
+                    "competitor_a_id": competitor_a_id,
+                    "competitor_b_id": competitor_b_id,
+                },
+            )
+            self.next_match_indices[competitor_a_id] = match_index
+            if competitor_b_id is not None:
+                self.next_match_indices[competitor_b_id] = match_index
+
+        result_registration = datetime.utcnow()
+        for match_index in range(self.number_of_entry_matches):
+            if self.columns["competitor_b_id"][match_index] is not None:
+                continue
+            # automatic winning found
+            competitor_id = self.columns["competitor_a_id"][match_index]
+            self.set_match_values(
+                match_index,
+                {
+                    "winner_id": competitor_id,
+                    "result_registration": result_registration,
+                },
+            )
+
+            next_match_index = self.next_match_index(match_index)
+            if next_match_index is not None:
+                self.set_match_values(
+                    next_match_index,
+                    {self.next_match_key(match_index): competitor_id},
+                )
+            # corner case: single competitor in the tournament has no next match
+            self.next_match_indices[competitor_id] = next_match_index
+
+    def register_result(self, index: int, *, winner_id: int | None) -> int:
+        """Register a Match result and propagate it, returning the loser id."""
+
+        if self.columns["result_registration"][index]:
+            raise MatchAlreadyRegisteredResult()
+
+        competitor_ids = {
+            self.columns["competitor_a_id"][index],
+            self.columns["competitor_b_id"][index],
+        }
+        if None in competitor_ids:
+            round_, _ = self.round_position(index)
+            if round_ == self.starting_round:
+                raise MatchShouldHaveAutomaticWinner()
+            else:
+                raise MatchMissingCompetitorFromPreviousMatch()
+
+        if winner_id not in competitor_ids:
+            raise MatchTargetCompetitorIsNotMatchCompetitor()
+
+        competitor_ids.remove(winner_id)
+        loser_id = competitor_ids.pop()
+
+        result_registration = datetime.utcnow()
+        self.set_match_values(
+            index,
+            {
+                "winner_id": winner_id,
+                "loser_id": loser_id,
+                "result_registration": result_registration,
+            },
+        )
+        self.apply(
+            self.propagation(
+                index,
+                winner_id=winner_id,
+                loser_id=loser_id,
+                result_registration=result_registration,
+            )
+        )
+
+        return loser_id
@@ -0,0 +1,217 @@
+from collections.abc import Iterable
+
+from sqlalchemy import (
+    ARRAY,
+    ColumnElement,
+    DateTime,
+    Integer,
+    any_,
+    bindparam,
+    func,
+    select,
+    update,
+)
+from sqlalchemy.orm import Session
+
+from matamata.models import Competitor, Match, Tournament, TournamentCompetitor
+
+MATCH_UPDATE_COLUMNS = {
+    "competitor_a_id": Integer,
+    "competitor_b_id": Integer,
+    "winner_id": Integer,
+    "loser_id": Integer,
+    "result_registration": DateTime,
+    "updated": DateTime,
+}
+
+
+def is_postgresql(session: Session) -> bool:
+    return session.get_bind().dialect.name == "postgresql"
+
+
+def update_tournament_competitor_next_matches(
+    *,
+    tournament_id: int,
+    map_competitor_id_to_next_match_id: dict[int, int | None],
+    session: Session,
+):
+    if not map_competitor_id_to_next_match_id:
+        return
+
+    competitor_ids = list(map_competitor_id_to_next_match_id)
+    next_match_ids = list(map_competitor_id_to_next_match_id.values())
+
+    if is_postgresql(session):
+        # Set-based UPDATE ... FROM unnest(...) using only two array parameters
+        next_match_values = (
+            func.unnest(
+                bindparam("competitor_ids", competitor_ids, type_=ARRAY(Integer)),
+                bindparam("next_match_ids", next_match_ids, type_=ARRAY(Integer)),
+            )
+            .table_valued("competitor_id", "next_match_id")
+            .render_derived(name="next_match_values")
+        )
+
+        session.execute(
+            update(TournamentCompetitor)
+            .where(
+                TournamentCompetitor.tournament_id == tournament_id,
+                TournamentCompetitor.competitor_id == next_match_values.c.competitor_id,
+            )
+            .values(next_match_id=next_match_values.c.next_match_id)
+            .execution_options(synchronize_session=False)
+        )
+    else:
+        # Fallback to an executemany UPDATE by primary key
+        session.execute(
+            update(TournamentCompetitor),
+            [
+                {
+                    "tournament_id": tournament_id,
+                    "competitor_id": competitor_id,
+                    "next_match_id": next_match_id,
+                }
+                for competitor_id, next_match_id in zip(competitor_ids, next_match_ids)
+            ],
+        )
+
+
+def fill_match_column(column: str, value) -> ColumnElement:
+    # Competitors and results are only ever filled once, so a value set
+    # by a concurrent transaction is kept instead of being overwritten
+    if column == "updated":
+        return value
+    return func.coalesce(getattr(Match, column), value)
+
+
+def update_match_rows(
+    *,
+    match_rows: list[dict],
+    session: Session,
+) -> int:
+    """Fill the competitors and result columns of many undecided Matches at once.
+
+    Every row has the Match "id", "updated" and the other MATCH_UPDATE_COLUMNS it changes.
+    Columns are only written where they are still NULL, and Matches
+    decided in the meantime are skipped, so the number of written rows is returned.
+    """
+
+    if not match_rows:
+        return 0
+
+    if is_postgresql(session):
+        match_ids = [row["id"] for row in match_rows]
+        match_values = (
+            func.unnest(
+                bindparam("ids", match_ids, type_=ARRAY(Integer)),
+                *(
+                    bindparam(
+                        f"{column}_values",
+                        [row.get(column) for row in match_rows],
+                        type_=ARRAY(column_type),
+                    )
+                    for column, column_type in MATCH_UPDATE_COLUMNS.items()
+                ),
+            )
+            .table_valued("id", *MATCH_UPDATE_COLUMNS)
+            .render_derived(name="match_values")
+        )
+        # Rows are locked in id order, the same order as single registrations,
+        # so concurrent writers wait for each other instead of deadlocking
+        locked_matches = (
+            select(Match.id)
+            .where(
+                Match.id
+                == any_(bindparam("locked_ids", match_ids, type_=ARRAY(Integer)))
+            )
+            .order_by(Match.id)
+            .with_for_update()
+            .cte("locked_matches")
+        )
+
+        return len(
+            session.execute(
+                update(Match)
+                .where(
+                    Match.id == match_values.c.id,
+                    Match.id == locked_matches.c.id,
+                    Match.result_registration.is_(None),
+                )
+                .values(
+                    {
+                        column: fill_match_column(column, match_values.c[column])
+                        for column in MATCH_UPDATE_COLUMNS
+                    }
+                )
+                .returning(Match.id)
+                .execution_options(synchronize_session=False)
+            ).all()
+        )
+
+    # Fallback to an UPDATE by primary key per row, as executemany row counts
+    # are not reliable across drivers
+    written_rows = 0
+    for row in match_rows:
+        written_rows += session.execute(
+            update(Match)
+            .where(Match.id == row["id"], Match.result_registration.is_(None))
+            .values(
+                {
+                    column: fill_match_column(column, value)
+                    for column, value in row.items()
+                    if column != "id"
+                }
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+    return written_rows
+
+
+def bump_tournament_version(
+    *,
+    tournament_id: int,
+    values: dict | None = None,
+    session: Session,
+):
+    """Bump the version of a Tournament, writing other column values along with it."""
+
+    session.execute(
+        update(Tournament)
+        .where(Tournament.id == tournament_id)
+        .values(version=Tournament.version + 1, **(values or {}))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def bump_competitor_versions(
+    *,
+    tournament_id: int,
+    competitor_ids: Iterable[int] | None = None,
+    session: Session,
+):
+    """Bump the version of some Competitors of a Tournament, or of all of them."""
+
+    if competitor_ids is None:
+        competitor_filter = Competitor.id.in_(
+            select(TournamentCompetitor.competitor_id).where(
+                TournamentCompetitor.tournament_id == tournament_id
+            )
+        )
+    else:
+        competitor_ids = list(competitor_ids)
+        if not competitor_ids:
+            return
+        if is_postgresql(session):
+            # A single array parameter regardless of the number of Competitors
+            competitor_filter = Competitor.id == any_(
+                bindparam("competitor_ids", competitor_ids, type_=ARRAY(Integer))
+            )
+        else:
+            competitor_filter = Competitor.id.in_(competitor_ids)
+
+    session.execute(
+        update(Competitor)
+        .where(competitor_filter)
+        .values(version=Competitor.version + 1)
+        .execution_options(synchronize_session=False)
+    )
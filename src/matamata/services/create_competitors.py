@@ -0,0 +1,69 @@
+from collections.abc import Sequence
+from datetime import datetime
+from uuid import UUID, uuid4
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from matamata.models import Competitor
+
+from .bulk_updates import is_postgresql
+
+BULK_INSERT_CHUNK_SIZE = 1000
+COPY_COMPETITOR_COLUMNS = ("uuid", "label", "created", "updated")
+
+
+def copy_competitor_rows(
+    *,
+    rows: list[tuple[UUID, str, datetime, datetime]],
+    session: Session,
+):
+    # COPY runs within the session transaction, through its psycopg connection
+    driver_connection = session.connection().connection.driver_connection
+    with driver_connection.cursor() as cursor:
+        with cursor.copy(
+            f"COPY {Competitor.__tablename__} ({', '.join(COPY_COMPETITOR_COLUMNS)}) FROM STDIN"
+        ) as copy:
+            for row in rows:
+                copy.write_row(row)
+
+
+def insert_competitor_rows(
+    *,
+    rows: list[tuple[UUID, str, datetime, datetime]],
+    session: Session,
+):
+    # Multi-row INSERT statements, a chunk of rows at a time
+    for start in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+        session.execute(
+            insert(Competitor),
+            [
+                dict(zip(COPY_COMPETITOR_COLUMNS, row))
+                for row in rows[start : start + BULK_INSERT_CHUNK_SIZE]
+            ],
+        )
+
+
+def create_competitors(
+    *,
+    labels: Sequence[str],
+    session: Session,
+) -> list[tuple[UUID, str]]:
+    """Create a Competitor for each label in a single transaction.
+
+    UUIDs are generated beforehand, so no row is returned by the database.
+    PostgreSQL loads every row through a single COPY,
+    unless the connection is asynchronous, which falls back to multi-row INSERTs.
+    """
+
+    now = datetime.utcnow()
+    rows = [(uuid4(), label, now, now) for label in labels]
+
+    if is_postgresql(session) and not session.get_bind().dialect.is_async:
+        copy_competitor_rows(rows=rows, session=session)
+    else:
+        insert_competitor_rows(rows=rows, session=session)
+
+    session.commit()
+
+    return [(uuid, label) for uuid, label, _, _ in rows]
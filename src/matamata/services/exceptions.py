@@ -16,3 +16,11 @@ class MatchMissingCompetitorFromPreviousMatch(MatamataServiceException):
 
 class MatchTargetCompetitorIsNotMatchCompetitor(MatamataServiceException):
     pass
+
+
+class MatchIsNotTournamentMatch(MatamataServiceException):
+    pass
+
+
+class TournamentSeedingIsNotTournamentCompetitors(MatamataServiceException):
+    pass
@@ -0,0 +1,159 @@
+from collections.abc import Iterable
+from datetime import datetime
+from typing import NamedTuple
+from uuid import UUID
+
+from sqlalchemy import ARRAY, Integer, Uuid, any_, bindparam, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.orm import Session
+
+from matamata.models import Competitor, Tournament, TournamentCompetitor
+
+from .bulk_updates import (
+    bump_competitor_versions,
+    bump_tournament_version,
+    is_postgresql,
+)
+
+
+class CompetitorsRegistration(NamedTuple):
+    # (uuid, label) of each newly registered Competitor
+    registered: list[tuple[UUID, str]]
+    already_registered: list[UUID]
+    missing: list[UUID]
+
+
+def insert_tournament_competitors(
+    *,
+    tournament_id: int,
+    competitor_ids: list[int],
+    session: Session,
+) -> set[int]:
+    """Insert the missing associations, returning the newly registered Competitor ids."""
+
+    if not competitor_ids:
+        return set()
+
+    now = datetime.utcnow()
+
+    if is_postgresql(session):
+        # INSERT ... SELECT FROM unnest(...) ON CONFLICT DO NOTHING RETURNING,
+        # so duplicates are skipped without aborting the transaction
+        competitor_values = (
+            func.unnest(
+                bindparam("competitor_ids", competitor_ids, type_=ARRAY(Integer))
+            )
+            .table_valued("competitor_id")
+            .render_derived(name="competitor_values")
+        )
+        statement = (
+            postgresql_insert(TournamentCompetitor)
+            .from_select(
+                ["tournament_id", "competitor_id", "created", "updated"],
+                select(
+                    bindparam("tournament_id", tournament_id, type_=Integer),
+                    competitor_values.c.competitor_id,
+                    bindparam("created", now),
+                    bindparam("updated", now),
+                ),
+            )
+            .on_conflict_do_nothing()
+            .returning(TournamentCompetitor.competitor_id)
+        )
+        return set(session.scalars(statement))
+
+    # Fallback to a lookup of the existing associations and an executemany INSERT
+    existing_competitor_ids = set(
+        session.scalars(
+            select(TournamentCompetitor.competitor_id).where(
+                TournamentCompetitor.tournament_id == tournament_id,
+                TournamentCompetitor.competitor_id.in_(competitor_ids),
+            )
+        )
+    )
+    new_competitor_ids = [
+        competitor_id
+        for competitor_id in competitor_ids
+        if competitor_id not in existing_competitor_ids
+    ]
+    if new_competitor_ids:
+        session.execute(
+            insert(TournamentCompetitor),
+            [
+                {
+                    "tournament_id": tournament_id,
+                    "competitor_id": competitor_id,
+                    "created": now,
+                    "updated": now,
+                }
+                for competitor_id in new_competitor_ids
+            ],
+        )
+    return set(new_competitor_ids)
+
+
+def register_competitors_in_tournament(
+    *,
+    tournament: Tournament,
+    competitor_uuids: Iterable[UUID],
+    session: Session,
+) -> CompetitorsRegistration:
+    """Register many Competitors in a Tournament that has not started yet.
+
+    Competitors are resolved with a single query, and the ones
+    which are missing or already registered are reported instead of aborting the batch.
+    """
+
+    # Repeated UUIDs are registered once, keeping their first position
+    competitor_uuids = list(dict.fromkeys(competitor_uuids))
+
+    if is_postgresql(session):
+        # A single array parameter regardless of the number of Competitors
+        uuid_filter = Competitor.uuid == any_(
+            bindparam("competitor_uuids", competitor_uuids, type_=ARRAY(Uuid))
+        )
+    else:
+        uuid_filter = Competitor.uuid.in_(competitor_uuids)
+
+    map_uuid_to_competitor = {
+        row.uuid: row
+        for row in session.execute(
+            select(Competitor.id, Competitor.uuid, Competitor.label).where(uuid_filter)
+        )
+    }
+
+    found_competitor_ids = [
+        map_uuid_to_competitor[competitor_uuid].id
+        for competitor_uuid in competitor_uuids
+        if competitor_uuid in map_uuid_to_competitor
+    ]
+    registered_competitor_ids = insert_tournament_competitors(
+        tournament_id=tournament.id,
+        competitor_ids=found_competitor_ids,
+        session=session,
+    )
+
+    if registered_competitor_ids:
+        bump_tournament_version(tournament_id=tournament.id, session=session)
+        bump_competitor_versions(
+            tournament_id=tournament.id,
+            competitor_ids=registered_competitor_ids,
+            session=session,
+        )
+    session.commit()
+
+    registration = CompetitorsRegistration(
+        registered=[],
+        already_registered=[],
+        missing=[],
+    )
+    for competitor_uuid in competitor_uuids:
+        competitor = map_uuid_to_competitor.get(competitor_uuid)
+        if competitor is None:
+            registration.missing.append(competitor_uuid)
+        elif competitor.id in registered_competitor_ids:
+            registration.registered.append((competitor.uuid, competitor.label))
+        else:
+            registration.already_registered.append(competitor_uuid)
+
+    return registration
@@ -1,17 +1,29 @@
 from datetime import datetime
 from uuid import UUID
 
-from sqlalchemy import Update, select, update
+from sqlalchemy import Integer, Row, Update, case, cast, inspect, null, select, update
 from sqlalchemy.orm import Session
-
-from matamata.models import Competitor, Match, TournamentCompetitor
-
+from sqlalchemy.orm.attributes import set_committed_value
+
+from matamata.cache import invalidate_tournament_on_commit
+from matamata.events import publish_tournament_events_on_commit
+from matamata.models import Competitor, Match, Tournament, TournamentCompetitor
+from matamata.settings import settings
+
+from .bracket_engine import BracketEngine, Propagation
+from .bulk_updates import (
+    bump_competitor_versions,
+    bump_tournament_version,
+    is_postgresql,
+    update_tournament_competitor_next_matches,
+)
 from .exceptions import (
     MatchAlreadyRegisteredResult,
     MatchMissingCompetitorFromPreviousMatch,
     MatchShouldHaveAutomaticWinner,
     MatchTargetCompetitorIsNotMatchCompetitor,
 )
+from .result_events import match_result_events
 
 
 def store_competitor_data(
@@ -34,7 +46,6 @@ def validate_match_to_register_result(
     *,
     match_with_tournament_and_competitors: Match,
     winner_uuid: UUID,
-    session: Session,
 ) -> tuple[Competitor, Competitor]:
     is_starting_round = (
         match_with_tournament_and_competitors.round
@@ -71,234 +82,310 @@ def validate_match_to_register_result(
     winner = map_uuid_to_competitor[winner_uuid]
     loser = map_uuid_to_competitor[loser_uuid]
 
-    match_with_tournament_and_competitors.winner = winner
-    match_with_tournament_and_competitors.loser = loser
-    match_with_tournament_and_competitors.result_registration = datetime.utcnow()
-    session.add(match_with_tournament_and_competitors)
-
     return winner, loser
 
 
-def get_tournament_id_and_competitor_key(
+def plan_match_result_propagation(
+    *,
     match_with_tournament_and_competitors: Match,
-) -> tuple[int, str]:
-    tournament_id = match_with_tournament_and_competitors.tournament_id
-
-    if match_with_tournament_and_competitors.position % 2 == 0:
-        competitor_key = "competitor_a_id"
-    else:
-        competitor_key = "competitor_b_id"
+    winner: Competitor,
+    loser: Competitor,
+    result_registration: datetime,
+) -> tuple[BracketEngine, int, Propagation]:
+    tournament = match_with_tournament_and_competitors.tournament
+    bracket = BracketEngine(number_competitors=tournament.number_competitors)
+    match_index = bracket.index(
+        match_with_tournament_and_competitors.round,
+        match_with_tournament_and_competitors.position,
+    )
+    bracket.set_match_values(
+        match_index,
+        {
+            "winner_id": winner.id,
+            "loser_id": loser.id,
+            "result_registration": result_registration,
+        },
+    )
+    propagation = bracket.propagation(
+        match_index,
+        winner_id=winner.id,
+        loser_id=loser.id,
+        result_registration=result_registration,
+    )
+    # Only the decided Match and its propagation are known by the bracket,
+    # which is enough to tell the standings they decide
+    bracket.apply(propagation)
 
-    return tournament_id, competitor_key
+    return bracket, match_index, propagation
 
 
-def update_winner_next_match_data(
+def publish_match_result_events(
     *,
     match_with_tournament_and_competitors: Match,
     winner: Competitor,
+    loser: Competitor,
+    bracket: BracketEngine,
+    match_index: int,
+    propagation: Propagation,
+    map_index_to_match_uuid: dict[int, UUID],
     session: Session,
 ):
-    tournament_id, competitor_key = get_tournament_id_and_competitor_key(
-        match_with_tournament_and_competitors,
+    map_competitor_id_to_uuid = {winner.id: winner.uuid, loser.id: loser.uuid}
+    publish_tournament_events_on_commit(
+        tournament_uuid=match_with_tournament_and_competitors.tournament.uuid,
+        tournament_events=match_result_events(
+            bracket=bracket,
+            index=match_index,
+            winner_id=winner.id,
+            loser_id=loser.id,
+            propagation=propagation,
+            match_uuid_of=map_index_to_match_uuid.__getitem__,
+            competitor_uuid_of=map_competitor_id_to_uuid.__getitem__,
+        ),
+        session=session,
     )
 
-    update_winner_next_match_competitor = None
-
-    if match_with_tournament_and_competitors.round > 0:
-        winner_next_match_parameters = {
-            "round": match_with_tournament_and_competitors.round - 1,
-            "position": match_with_tournament_and_competitors.position // 2,
-        }
 
-        winner_next_match_subquery = (
-            select(Match.id)
-            .where(
-                Match.tournament_id == tournament_id,
-                Match.round == winner_next_match_parameters["round"],
-                Match.position == winner_next_match_parameters["position"],
-            )
-            .scalar_subquery()
-        )
-
-        update_winner_tournamentcompetitor_next_match = (
-            update(TournamentCompetitor)
-            .where(
-                TournamentCompetitor.tournament_id == tournament_id,
-                TournamentCompetitor.competitor_id == winner.id,
-            )
-            .values(
-                next_match_id=winner_next_match_subquery,
-            )
-        )
-
-        update_winner_next_match_competitor = (
-            update(Match)
-            .where(
-                Match.id == winner_next_match_subquery,
-            )
-            .values(
-                **{
-                    competitor_key: winner.id,
-                }
-            )
+def decide_match_statement(
+    *,
+    match_with_tournament_and_competitors: Match,
+    winner: Competitor,
+    loser: Competitor,
+    result_registration: datetime,
+) -> Update:
+    # Only an undecided Match is decided, so when concurrent registrations
+    # of the same Match race, the database lets a single one of them through
+    return (
+        update(Match)
+        .where(
+            Match.id == match_with_tournament_and_competitors.id,
+            Match.result_registration.is_(None),
         )
-    else:
-        update_winner_tournamentcompetitor_next_match = (
-            update(TournamentCompetitor)
-            .where(
-                TournamentCompetitor.tournament_id == tournament_id,
-                TournamentCompetitor.competitor_id == winner.id,
-            )
-            .values(
-                next_match_id=None,
-            )
+        .values(
+            winner_id=winner.id,
+            loser_id=loser.id,
+            result_registration=result_registration,
+            updated=result_registration,
         )
+        .returning(*Match.__table__.columns)
+    )
 
-    session.execute(update_winner_tournamentcompetitor_next_match)
 
-    if update_winner_next_match_competitor is not None:
-        session.execute(update_winner_next_match_competitor)
+def populate_decided_match(
+    *,
+    match_with_tournament_and_competitors: Match,
+    decided_match_row: Row,
+):
+    # The decided Match row came back from its UPDATE, so no refresh is needed
+    for column_attribute in inspect(Match).column_attrs:
+        set_committed_value(
+            match_with_tournament_and_competitors,
+            column_attribute.key,
+            decided_match_row._mapping[column_attribute.columns[0].name],
+        )
 
 
-def adjust_third_place_match_for_loser(
+def adjust_next_matches(
     *,
     match_with_tournament_and_competitors: Match,
+    winner: Competitor,
     loser: Competitor,
-    tournament_id: int,
-    competitor_key: str,
-) -> tuple[Update, Update | None]:
-    # Adjustments for third place match:
-    # the only match when a loser competes in a next match
-    loser_next_match_parameters = {
-        "round": 0,
-        "position": 1,
-    }
-
-    # There is a very specific corner case
-    # when the loser of the current match is
-    # the third place of a three competitor tournament.
-    # This means the loser is an automatic winner of the next match
-    is_third_place_out_of_three_competitors = (
-        match_with_tournament_and_competitors.tournament.number_competitors == 3
+    result_registration: datetime,
+    session: Session,
+):
+    tournament = match_with_tournament_and_competitors.tournament
+    bracket, match_index, propagation = plan_match_result_propagation(
+        match_with_tournament_and_competitors=match_with_tournament_and_competitors,
+        winner=winner,
+        loser=loser,
+        result_registration=result_registration,
     )
 
-    loser_next_match_subquery = (
-        select(Match.id)
-        .where(
-            Match.tournament_id == tournament_id,
-            Match.round == loser_next_match_parameters["round"],
-            Match.position == loser_next_match_parameters["position"],
-        )
-        .scalar_subquery()
+    # Next matches are addressed by (round, position) computed by the bracket,
+    # and their ids and UUIDs come back from the UPDATE itself
+    map_index_to_match_id = {}
+    map_index_to_match_uuid = {match_index: match_with_tournament_and_competitors.uuid}
+    for index, values in propagation.match_changes:
+        round_, position = bracket.round_position(index)
+        (
+            map_index_to_match_id[index],
+            map_index_to_match_uuid[index],
+        ) = session.execute(
+            update(Match)
+            .where(
+                Match.tournament_id == tournament.id,
+                Match.round == round_,
+                Match.position == position,
+            )
+            .values(**values)
+            .returning(Match.id, Match.uuid)
+            .execution_options(synchronize_session=False)
+        ).one()
+
+    update_tournament_competitor_next_matches(
+        tournament_id=tournament.id,
+        map_competitor_id_to_next_match_id={
+            competitor_id: (
+                None
+                if next_match_index is None
+                else map_index_to_match_id[next_match_index]
+            )
+            for competitor_id, next_match_index in propagation.next_match_indices.items()
+        },
+        session=session,
     )
 
-    additional_parameters = {}
-    next_match_id_value = loser_next_match_subquery
-    if is_third_place_out_of_three_competitors:
-        # There is a very specific corner case
-        # when the loser of the current match is
-        # the third place of a three competitor tournament.
-        # This means the loser won't have a next match and
-        # it is an automatic winner of the next match
-        next_match_id_value = None
-        additional_parameters = {
-            "winner_id": loser.id,
-            "result_registration": datetime.utcnow(),
-        }
-
-    update_loser_tournamentcompetitor_next_match = (
-        update(TournamentCompetitor)
-        .where(
-            TournamentCompetitor.tournament_id == tournament_id,
-            TournamentCompetitor.competitor_id == loser.id,
-        )
-        .values(
-            next_match_id=next_match_id_value,
-        )
+    bump_tournament_version(
+        tournament_id=tournament.id,
+        values=bracket.standings_values(bracket.changed_indices),
+        session=session,
     )
-
-    update_loser_next_match_competitor = (
-        update(Match)
-        .where(
-            Match.id == loser_next_match_subquery,
-        )
-        .values(
-            **(
-                {
-                    competitor_key: loser.id,
-                }
-                | additional_parameters
-            )
-        )
+    bump_competitor_versions(
+        tournament_id=tournament.id,
+        competitor_ids=propagation.next_match_indices,
+        session=session,
     )
 
-    return (
-        update_loser_tournamentcompetitor_next_match,
-        update_loser_next_match_competitor,
+    publish_match_result_events(
+        match_with_tournament_and_competitors=match_with_tournament_and_competitors,
+        winner=winner,
+        loser=loser,
+        bracket=bracket,
+        match_index=match_index,
+        propagation=propagation,
+        map_index_to_match_uuid=map_index_to_match_uuid,
+        session=session,
     )
 
 
-def update_loser_next_match_data(
+def register_match_result_with_writable_cte(
     *,
     match_with_tournament_and_competitors: Match,
+    winner: Competitor,
     loser: Competitor,
+    result_registration: datetime,
     session: Session,
-):
-    tournament_id, competitor_key = get_tournament_id_and_competitor_key(
-        match_with_tournament_and_competitors,
+) -> Row | None:
+    """Register a Match result and propagate it with a single PostgreSQL statement.
+
+    Every UPDATE of adjust_next_matches is a data-modifying CTE of the same statement,
+    which returns the decided Match row along with the UUIDs of the next Matches.
+    Nothing is written and None is returned when the Match was already decided.
+    """
+
+    tournament = match_with_tournament_and_competitors.tournament
+    bracket, match_index, propagation = plan_match_result_propagation(
+        match_with_tournament_and_competitors=match_with_tournament_and_competitors,
+        winner=winner,
+        loser=loser,
+        result_registration=result_registration,
     )
 
-    # On most cases, there won't be a next match for a loser
-    update_loser_tournamentcompetitor_next_match = (
+    decided_match = decide_match_statement(
+        match_with_tournament_and_competitors=match_with_tournament_and_competitors,
+        winner=winner,
+        loser=loser,
+        result_registration=result_registration,
+    ).cte("decided_match")
+    # Every other UPDATE only applies along with the decided Match
+    is_decided = select(decided_match.c.id).exists()
+
+    map_index_to_next_match = {}
+    for change_number, (index, values) in enumerate(propagation.match_changes):
+        round_, position = bracket.round_position(index)
+        map_index_to_next_match[index] = (
+            update(Match)
+            .where(
+                Match.tournament_id == tournament.id,
+                Match.round == round_,
+                Match.position == position,
+                is_decided,
+            )
+            .values(**values)
+            .returning(Match.id, Match.uuid)
+            .cte(f"next_match_{change_number}")
+        )
+
+    # Next Match ids are only known within the statement itself
+    next_tournament_competitors = (
         update(TournamentCompetitor)
         .where(
-            TournamentCompetitor.tournament_id == tournament_id,
-            TournamentCompetitor.competitor_id == loser.id,
+            TournamentCompetitor.tournament_id == tournament.id,
+            TournamentCompetitor.competitor_id.in_(
+                list(propagation.next_match_indices)
+            ),
+            is_decided,
         )
         .values(
-            next_match_id=None,
+            next_match_id=case(
+                {
+                    competitor_id: (
+                        cast(null(), Integer)
+                        if next_match_index is None
+                        else select(
+                            map_index_to_next_match[next_match_index].c.id
+                        ).scalar_subquery()
+                    )
+                    for competitor_id, next_match_index in propagation.next_match_indices.items()
+                },
+                value=TournamentCompetitor.competitor_id,
+            )
         )
+        .returning(TournamentCompetitor.competitor_id)
+        .cte("next_tournament_competitors")
     )
-    update_loser_next_match_competitor = None
-
-    # There will be a next match if the current match was a semifinal one
-    will_compete_third_place_match = match_with_tournament_and_competitors.round == 1
-
-    if will_compete_third_place_match:
-        (
-            update_loser_tournamentcompetitor_next_match,
-            update_loser_next_match_competitor,
-        ) = adjust_third_place_match_for_loser(
-            match_with_tournament_and_competitors=match_with_tournament_and_competitors,
-            loser=loser,
-            tournament_id=tournament_id,
-            competitor_key=competitor_key,
+    tournament_version = (
+        update(Tournament)
+        .where(Tournament.id == tournament.id, is_decided)
+        .values(
+            version=Tournament.version + 1,
+            **bracket.standings_values(bracket.changed_indices),
         )
+        .returning(Tournament.id)
+        .cte("tournament_version")
+    )
+    competitor_versions = (
+        update(Competitor)
+        .where(Competitor.id.in_(list(propagation.next_match_indices)), is_decided)
+        .values(version=Competitor.version + 1)
+        .returning(Competitor.id)
+        .cte("competitor_versions")
+    )
 
-    session.execute(update_loser_tournamentcompetitor_next_match)
-    if update_loser_next_match_competitor is not None:
-        session.execute(update_loser_next_match_competitor)
+    row = session.execute(
+        select(
+            decided_match,
+            *(
+                select(next_match.c.uuid)
+                .scalar_subquery()
+                .label(f"next_match_{index}_uuid")
+                for index, next_match in map_index_to_next_match.items()
+            ),
+        )
+        # Not otherwise referenced, but still run by the statement
+        .add_cte(next_tournament_competitors, tournament_version, competitor_versions)
+    ).one_or_none()
 
+    if row is None:
+        return None
 
-def adjust_next_matches(
-    *,
-    match_with_tournament_and_competitors: Match,
-    winner: Competitor,
-    loser: Competitor,
-    session: Session,
-):
-    update_winner_next_match_data(
+    map_index_to_match_uuid = {match_index: row.uuid} | {
+        index: row._mapping[f"next_match_{index}_uuid"]
+        for index in map_index_to_next_match
+    }
+    publish_match_result_events(
         match_with_tournament_and_competitors=match_with_tournament_and_competitors,
         winner=winner,
-        session=session,
-    )
-
-    update_loser_next_match_data(
-        match_with_tournament_and_competitors=match_with_tournament_and_competitors,
         loser=loser,
+        bracket=bracket,
+        match_index=match_index,
+        propagation=propagation,
+        map_index_to_match_uuid=map_index_to_match_uuid,
         session=session,
     )
 
+    return row
+
 
 def register_match_result(
     *,
@@ -312,17 +399,48 @@ def register_match_result(
     winner, loser = validate_match_to_register_result(
         match_with_tournament_and_competitors=match_with_tournament_and_competitors,
         winner_uuid=winner_uuid,
-        session=session,
     )
+    result_registration = datetime.utcnow()
 
-    adjust_next_matches(
-        match_with_tournament_and_competitors=match_with_tournament_and_competitors,
-        winner=winner,
-        loser=loser,
+    if settings.MATCH_RESULT_STRATEGY == "cte" and is_postgresql(session):
+        decided_match_row = register_match_result_with_writable_cte(
+            match_with_tournament_and_competitors=match_with_tournament_and_competitors,
+            winner=winner,
+            loser=loser,
+            result_registration=result_registration,
+            session=session,
+        )
+    else:
+        decided_match_row = session.execute(
+            decide_match_statement(
+                match_with_tournament_and_competitors=match_with_tournament_and_competitors,
+                winner=winner,
+                loser=loser,
+                result_registration=result_registration,
+            ).execution_options(synchronize_session=False)
+        ).one_or_none()
+        if decided_match_row is not None:
+            adjust_next_matches(
+                match_with_tournament_and_competitors=match_with_tournament_and_competitors,
+                winner=winner,
+                loser=loser,
+                result_registration=result_registration,
+                session=session,
+            )
+
+    if decided_match_row is None:
+        # Another registration decided the Match after it was loaded
+        session.rollback()
+        raise MatchAlreadyRegisteredResult()
+
+    invalidate_tournament_on_commit(
+        tournament_uuid=match_with_tournament_and_competitors.tournament.uuid,
         session=session,
     )
-
     session.commit()
-    session.refresh(match_with_tournament_and_competitors)
+    populate_decided_match(
+        match_with_tournament_and_competitors=match_with_tournament_and_competitors,
+        decided_match_row=decided_match_row,
+    )
 
     return match_with_tournament_and_competitors
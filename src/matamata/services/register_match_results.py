@@ -0,0 +1,263 @@
+from datetime import datetime
+from typing import NamedTuple
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from matamata.cache import invalidate_tournament_on_commit
+from matamata.events import publish_tournament_events_on_commit
+from matamata.models import Competitor, Match, Tournament, TournamentCompetitor
+
+from .bracket_engine import MATCH_STATE_COLUMNS, BracketEngine
+from .bulk_updates import (
+    bump_competitor_versions,
+    bump_tournament_version,
+    update_match_rows,
+    update_tournament_competitor_next_matches,
+)
+from .exceptions import (
+    MatamataServiceException,
+    MatchAlreadyRegisteredResult,
+    MatchIsNotTournamentMatch,
+)
+from .result_events import match_result_events
+
+# Batches conflicting with concurrent registrations are registered again from scratch
+MAX_BATCH_ATTEMPTS = 3
+
+
+class MatchResultOutcome(NamedTuple):
+    match_uuid: UUID
+    winner_uuid: UUID
+    error: MatamataServiceException | None
+    match: dict | None
+
+
+class BracketSnapshot:
+    """Every Match and Competitor of a started Tournament, loaded at once.
+
+    Results are validated and propagated by the BracketEngine
+    holding the Matches, which keeps track of what changed to be written afterwards.
+    """
+
+    def __init__(self, *, tournament: Tournament, session: Session):
+        self.tournament = tournament
+
+        match_rows = (
+            session.execute(
+                select(
+                    Match.id,
+                    Match.uuid,
+                    Match.round,
+                    Match.position,
+                    *(getattr(Match, column) for column in MATCH_STATE_COLUMNS),
+                ).where(Match.tournament_id == tournament.id)
+            )
+            .mappings()
+            .all()
+        )
+        self.bracket = BracketEngine.from_match_rows(
+            number_competitors=tournament.number_competitors,
+            match_rows=match_rows,
+        )
+        self.map_index_to_match_uuid: dict[int, UUID] = {}
+        self.map_match_uuid_to_index: dict[UUID, int] = {}
+        for row in match_rows:
+            index = self.bracket.index(row["round"], row["position"])
+            self.map_index_to_match_uuid[index] = row["uuid"]
+            self.map_match_uuid_to_index[row["uuid"]] = index
+
+        self.map_id_to_competitor: dict[int, dict] = {}
+        self.map_uuid_to_competitor_id: dict[UUID, int] = {}
+        for row in session.execute(
+            select(Competitor.id, Competitor.uuid, Competitor.label)
+            .select_from(TournamentCompetitor)
+            .join(TournamentCompetitor.competitor)
+            .where(TournamentCompetitor.tournament_id == tournament.id)
+        ).mappings():
+            self.map_id_to_competitor[row["id"]] = {
+                "uuid": row["uuid"],
+                "label": row["label"],
+            }
+            self.map_uuid_to_competitor_id[row["uuid"]] = row["id"]
+
+        self.tournament_events: list[dict] = []
+
+    def register(self, *, match_uuid: UUID, winner_uuid: UUID) -> int:
+        index = self.map_match_uuid_to_index.get(match_uuid)
+        if index is None:
+            raise MatchIsNotTournamentMatch()
+
+        winner_id = self.map_uuid_to_competitor_id.get(winner_uuid)
+        loser_id = self.bracket.register_result(index, winner_id=winner_id)
+
+        # The propagation is a pure plan, so it is computed again to describe it
+        self.tournament_events.extend(
+            match_result_events(
+                bracket=self.bracket,
+                index=index,
+                winner_id=winner_id,
+                loser_id=loser_id,
+                propagation=self.bracket.propagation(
+                    index,
+                    winner_id=winner_id,
+                    loser_id=loser_id,
+                    result_registration=self.bracket.columns["result_registration"][
+                        index
+                    ],
+                ),
+                match_uuid_of=self.map_index_to_match_uuid.__getitem__,
+                competitor_uuid_of=self.competitor_uuid,
+            )
+        )
+
+        return index
+
+    def competitor_uuid(self, competitor_id: int) -> UUID:
+        return self.map_id_to_competitor[competitor_id]["uuid"]
+
+    def competitor_data(self, competitor_id: int | None) -> dict | None:
+        if competitor_id is None:
+            return None
+        return self.map_id_to_competitor[competitor_id]
+
+    def match_data(self, index: int) -> dict:
+        round_, position = self.bracket.round_position(index)
+        values = self.bracket.match_values(index)
+        return {
+            "uuid": self.map_index_to_match_uuid[index],
+            "round": round_,
+            "position": position,
+            "competitor_a": self.competitor_data(values["competitor_a_id"]),
+            "competitor_b": self.competitor_data(values["competitor_b_id"]),
+            "winner": self.competitor_data(values["winner_id"]),
+            "loser": self.competitor_data(values["loser_id"]),
+        }
+
+    def write_changes(self, *, session: Session) -> bool:
+        """Write every change, unless a changed Match was decided after the snapshot.
+
+        Returns whether the changes were written, otherwise the transaction
+        must be rolled back, as some of them might have been.
+        """
+
+        updated = datetime.utcnow()
+        # Only the columns changed by the registered results are written,
+        # over Matches which are still undecided
+        match_rows = [
+            {"id": self.bracket.match_ids[index], "updated": updated}
+            | self.bracket.changed_match_values(index)
+            for index in self.bracket.changed_indices
+        ]
+        if update_match_rows(match_rows=match_rows, session=session) < len(match_rows):
+            return False
+
+        update_tournament_competitor_next_matches(
+            tournament_id=self.tournament.id,
+            map_competitor_id_to_next_match_id={
+                competitor_id: (
+                    None
+                    if next_match_index is None
+                    else self.bracket.match_ids[next_match_index]
+                )
+                for competitor_id, next_match_index in self.bracket.next_match_indices.items()
+            },
+            session=session,
+        )
+        bump_tournament_version(
+            tournament_id=self.tournament.id,
+            values=self.bracket.standings_values(self.bracket.changed_indices),
+            session=session,
+        )
+        bump_competitor_versions(
+            tournament_id=self.tournament.id,
+            competitor_ids=self.bracket.next_match_indices,
+            session=session,
+        )
+
+        return True
+
+
+def register_results_in_snapshot(
+    *,
+    snapshot: BracketSnapshot,
+    results: list[tuple[UUID, UUID]],
+) -> tuple[dict[int, int], dict[int, MatamataServiceException]]:
+    def bracket_order(index: int) -> int:
+        # Earlier rounds have lower bracket indices
+        return snapshot.map_match_uuid_to_index.get(results[index][0], 0)
+
+    registered_matches: dict[int, int] = {}
+    errors: dict[int, MatamataServiceException] = {}
+    for index in sorted(range(len(results)), key=bracket_order):
+        match_uuid, winner_uuid = results[index]
+        try:
+            registered_matches[index] = snapshot.register(
+                match_uuid=match_uuid,
+                winner_uuid=winner_uuid,
+            )
+        except MatamataServiceException as exc:
+            errors[index] = exc
+
+    return registered_matches, errors
+
+
+def register_match_results(
+    *,
+    tournament: Tournament,
+    results: list[tuple[UUID, UUID]],
+    session: Session,
+) -> list[MatchResultOutcome]:
+    """Register many (Match UUID, winner UUID) results of a started Tournament.
+
+    Results are applied in bracket order, so a batch might include a Match
+    and the Match its winner advances to. Invalid results are reported in their
+    outcome and skipped, and every valid one is written in a single transaction.
+    When a Match is decided by another transaction after the Matches were read,
+    the batch is rolled back and registered again over a fresh read,
+    up to MAX_BATCH_ATTEMPTS times before its results are reported as conflicting.
+    """
+
+    for _ in range(MAX_BATCH_ATTEMPTS):
+        snapshot = BracketSnapshot(tournament=tournament, session=session)
+        registered_matches, errors = register_results_in_snapshot(
+            snapshot=snapshot,
+            results=results,
+        )
+        if not registered_matches:
+            break
+
+        if snapshot.write_changes(session=session):
+            invalidate_tournament_on_commit(
+                tournament_uuid=tournament.uuid,
+                session=session,
+            )
+            publish_tournament_events_on_commit(
+                tournament_uuid=tournament.uuid,
+                tournament_events=snapshot.tournament_events,
+                session=session,
+            )
+            session.commit()
+            break
+
+        session.rollback()
+    else:
+        errors |= {
+            index: MatchAlreadyRegisteredResult() for index in registered_matches
+        }
+        registered_matches = {}
+
+    return [
+        MatchResultOutcome(
+            match_uuid=match_uuid,
+            winner_uuid=winner_uuid,
+            error=errors.get(index),
+            match=(
+                snapshot.match_data(registered_matches[index])
+                if index in registered_matches
+                else None
+            ),
+        )
+        for index, (match_uuid, winner_uuid) in enumerate(results)
+    ]
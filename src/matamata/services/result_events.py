@@ -0,0 +1,86 @@
+from collections.abc import Callable
+from uuid import UUID
+
+from .bracket_engine import BracketEngine, Propagation
+
+# Side of the next Match in events, named as in the API responses
+MAP_COLUMN_TO_SIDE = {
+    "competitor_a_id": "competitorA",
+    "competitor_b_id": "competitorB",
+}
+
+
+def match_decided_event(
+    *,
+    bracket: BracketEngine,
+    index: int,
+    match_uuid: UUID,
+    winner_uuid: UUID,
+    loser_uuid: UUID | None,
+) -> dict:
+    round_, position = bracket.round_position(index)
+    return {
+        "event": "matchDecided",
+        "match": str(match_uuid),
+        "round": round_,
+        "position": position,
+        "winner": str(winner_uuid),
+        "loser": None if loser_uuid is None else str(loser_uuid),
+    }
+
+
+def match_result_events(
+    *,
+    bracket: BracketEngine,
+    index: int,
+    winner_id: int,
+    loser_id: int,
+    propagation: Propagation,
+    match_uuid_of: Callable[[int], UUID],
+    competitor_uuid_of: Callable[[int], UUID],
+) -> list[dict]:
+    """Compact deltas of a Match result: the decided Match and where its Competitors go."""
+
+    tournament_events = [
+        match_decided_event(
+            bracket=bracket,
+            index=index,
+            match_uuid=match_uuid_of(index),
+            winner_uuid=competitor_uuid_of(winner_id),
+            loser_uuid=competitor_uuid_of(loser_id),
+        )
+    ]
+
+    for next_index, values in propagation.match_changes:
+        next_round, next_position = bracket.round_position(next_index)
+        for column, side in MAP_COLUMN_TO_SIDE.items():
+            if values.get(column) is None:
+                continue
+            tournament_events.append(
+                {
+                    "event": (
+                        "thirdPlaceFilled"
+                        if next_index == bracket.third_place_index
+                        else "competitorAdvanced"
+                    ),
+                    "competitor": str(competitor_uuid_of(values[column])),
+                    "match": str(match_uuid_of(next_index)),
+                    "round": next_round,
+                    "position": next_position,
+                    "side": side,
+                }
+            )
+
+        if values.get("winner_id") is not None:
+            # Automatic winning of the third place match
+            tournament_events.append(
+                match_decided_event(
+                    bracket=bracket,
+                    index=next_index,
+                    match_uuid=match_uuid_of(next_index),
+                    winner_uuid=competitor_uuid_of(values["winner_id"]),
+                    loser_uuid=None,
+                )
+            )
+
+    return tournament_events
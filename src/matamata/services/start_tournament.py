@@ -1,239 +1,258 @@
 import random
-from collections.abc import Iterable, Sized
+from collections.abc import Iterable, Sequence
 from datetime import datetime
-from math import floor, log2
+from itertools import repeat
+from uuid import UUID
 
 from fastapi import Depends
+from sqlalchemy import ARRAY, DateTime, Integer, bindparam, func, insert, select
 from sqlalchemy.orm import Session
 
+from matamata.cache import invalidate_tournament_on_commit
 from matamata.database import get_session
 from matamata.models import Competitor, Match, Tournament, TournamentCompetitor
 
+from .bracket_engine import BracketEngine
+from .bulk_updates import (
+    MATCH_UPDATE_COLUMNS,
+    bump_competitor_versions,
+    bump_tournament_version,
+    is_postgresql,
+    update_tournament_competitor_next_matches,
+)
+from .exceptions import TournamentSeedingIsNotTournamentCompetitors
 
-def calculate_tournament_parameters(competitors: Sized) -> tuple[int, int, int]:
-    # We calculate again to avoid wrong parametrization
-    number_of_competitors = len(competitors)
-    if number_of_competitors == 1:
-        starting_round = 0
-        number_of_entry_matches = 1
-    else:
-        starting_round = int(floor(log2(number_of_competitors - 1)))
-        number_of_entry_matches = 2**starting_round
-
-    return number_of_competitors, starting_round, number_of_entry_matches
-
-
-def calculate_match_index(*, starting_round, match_round, match_position):
-    if match_round > starting_round:
-        raise ValueError("invalid round values combination")
-
-    if match_position >= 2**match_round:
-        raise ValueError("invalid round/position values combination")
 
-    offset = 0
-    for current_round in range(starting_round, match_round, -1):
-        offset += 2**current_round
-    offset += match_position
+def random_sequence_of_competitors(
+    competitors: Iterable[Competitor],
+    *,
+    seed: int | None = None,
+) -> list[Competitor]:
+    # A dedicated generator, so the same seed always draws the same bracket
+    shuffled_competitors = list(competitors)
+    random.Random(seed).shuffle(shuffled_competitors)
 
-    return offset
+    return shuffled_competitors
 
 
-def process_automatic_winning(
+def seeded_sequence_of_competitors(
+    competitors: Iterable[Competitor],
     *,
-    match_data: list[dict],
-    map_competitor_next_match_index: dict[Competitor, int | None],
-):
-    (
-        number_of_competitors,
-        starting_round,
-        number_of_entry_matches,
-    ) = calculate_tournament_parameters(map_competitor_next_match_index)
-
-    if number_of_competitors // 2 == number_of_entry_matches:
-        # No automatic winning
-        return
+    seeding: Sequence[UUID],
+    seed: int | None = None,
+) -> list[Competitor]:
+    # Seeded Competitors first, in seeding order, then the unseeded ones drawn at random
+    map_uuid_to_competitor = {competitor.uuid: competitor for competitor in competitors}
 
-    for match_index in range(number_of_entry_matches):
-        current_match = match_data[match_index]
-        if "competitor_b" in current_match:
-            continue
-        # automatic winning found
-        competitor = current_match["competitor_a"]
-        current_match |= {
-            "result_registration": datetime.utcnow(),
-            "winner": competitor,
-        }
-
-        # need to set competitor as next match competitor
-        if starting_round == 0:
-            # corner case: single competitor in the tournament
-            map_competitor_next_match_index[competitor] = None
-            continue
-
-        # calculate next match index
-        next_match_round = starting_round - 1
-        next_match_position, next_match_competitor_index = divmod(match_index, 2)
-        next_match_index_in_match_data = calculate_match_index(
-            starting_round=starting_round,
-            match_round=next_match_round,
-            match_position=next_match_position,
-        )
+    seeded_competitors = [
+        map_uuid_to_competitor.pop(competitor_uuid, None) for competitor_uuid in seeding
+    ]
+    if None in seeded_competitors:
+        raise TournamentSeedingIsNotTournamentCompetitors()
 
-        next_match_data = match_data[next_match_index_in_match_data]
-        next_match_key_name = (
-            "competitor_a" if next_match_competitor_index == 0 else "competitor_b"
-        )
-        next_match_data[next_match_key_name] = competitor
-        map_competitor_next_match_index[competitor] = next_match_index_in_match_data
+    return seeded_competitors + random_sequence_of_competitors(
+        map_uuid_to_competitor.values(),
+        seed=seed,
+    )
 
 
 def prepare_match_data_as_list_of_dict(
     *,
     tournament: Tournament,
-    starting_round: int,
-    number_of_competitors: int,
+    bracket: BracketEngine,
 ) -> list[dict]:
-    # Preparing all matches backbone
-    # We populate entry matches, then intermediate matches and final and third place matches last
-    match_data = [
-        {
-            "tournament_id": tournament.id,
-            "round": round_,
-            "position": position,
-        }
-        for round_ in range(starting_round, -1, -1)
-        for position in range(2**round_)
+    # One entry per bracket index: entry matches first,
+    # then intermediate matches and final and third place matches last.
+    # Every entry has the same keys so all matches are inserted by the same statement
+    keys = ("tournament_id", "round", "position", *bracket.columns)
+    return [
+        dict(zip(keys, values))
+        for values in zip(
+            repeat(tournament.id),
+            bracket.layout.rounds,
+            bracket.layout.positions,
+            *bracket.columns.values(),
+        )
     ]
 
-    if number_of_competitors > 2:
-        # The only match that doesn't follow the previous rule is the third place match
-        match_data.append({"round": 0, "position": 1})
-
-    return match_data
-
-
-def random_sequence_of_competitors(
-    competitors: Iterable[Competitor],
-) -> list[Competitor]:
-    shuffled_competitors = list(competitors)
-    random.shuffle(shuffled_competitors)
-
-    return shuffled_competitors
-
 
-def inline_random_pair_of_entry_match_competitors(
+def insert_match_data_as_match_instances(
     *,
-    competitors: Iterable[Competitor],
-    number_of_entry_matches: int,
-    match_data: list[dict],
-    map_competitor_next_match_index: dict[Competitor, int | None],
+    tournament: Tournament,
+    bracket: BracketEngine,
+    session: Session,
 ):
-    shuffled_competitors = random_sequence_of_competitors(
-        competitors,
-    )
+    tournament.matches_creation = datetime.utcnow()
+    tournament.number_competitors = bracket.number_competitors
+    tournament.starting_round = bracket.starting_round
+    session.add(tournament)
 
-    for index, competitor in enumerate(shuffled_competitors):
-        competitor_index, match_index = divmod(index, number_of_entry_matches)
+    if not is_postgresql(session):
+        # Fallback to a single executemany INSERT ... RETURNING for the whole bracket,
+        # keeping the returned rows in the same order as the bracket
+        new_matches = session.scalars(
+            insert(Match)
+            .returning(Match, sort_by_parameter_order=True)
+            .execution_options(render_nulls=True),
+            prepare_match_data_as_list_of_dict(tournament=tournament, bracket=bracket),
+        ).all()
+        bracket.match_ids = [match.id for match in new_matches]
+        return
 
-        key_name = "competitor_a" if competitor_index == 0 else "competitor_b"
-        match_data[match_index][key_name] = competitor
-        map_competitor_next_match_index[competitor] = match_index
+    # INSERT ... SELECT FROM unnest(...) with one array parameter per column,
+    # so the statement size doesn't depend on the number of matches
+    match_values = (
+        func.unnest(
+            bindparam("rounds", list(bracket.layout.rounds), type_=ARRAY(Integer)),
+            bindparam(
+                "positions", list(bracket.layout.positions), type_=ARRAY(Integer)
+            ),
+            *(
+                bindparam(
+                    f"{column}_values",
+                    values,
+                    type_=ARRAY(MATCH_UPDATE_COLUMNS[column]),
+                )
+                for column, values in bracket.columns.items()
+            ),
+        )
+        .table_valued("round", "position", *bracket.columns)
+        .render_derived(name="match_values")
+    )
+    creation = datetime.utcnow()
+    new_match_rows = session.execute(
+        insert(Match)
+        .from_select(
+            ["tournament_id", "uuid", "created", "updated", *match_values.c.keys()],
+            select(
+                bindparam("tournament_id", tournament.id, type_=Integer),
+                func.gen_random_uuid(),
+                bindparam("created", creation, type_=DateTime),
+                bindparam("updated", creation, type_=DateTime),
+                *match_values.c,
+            ),
+        )
+        .returning(Match.id, Match.round, Match.position)
+    )
 
+    for match_id, round_, position in new_match_rows:
+        bracket.match_ids[bracket.index(round_, position)] = match_id
 
-def insert_and_refresh_match_data_as_match_instances(
+
+def adjust_next_match_references(
     *,
     tournament: Tournament,
-    match_data: list[dict],
-    number_of_competitors: int,
-    starting_round: int,
+    bracket: BracketEngine,
     session: Session,
-) -> list[Match]:
-    new_matches = [Match(**current_match_data) for current_match_data in match_data]
-    tournament.matches.extend(new_matches)
-    tournament.matches_creation = datetime.utcnow()
-    tournament.number_competitors = number_of_competitors
-    tournament.starting_round = starting_round
-    session.add(tournament)
-    session.commit()
-    for match_ in new_matches:
-        session.refresh(match_)
-    return new_matches
+):
+    # Before the start, every association has no next match,
+    # so only the competitors with a next match need to be updated
+    update_tournament_competitor_next_matches(
+        tournament_id=tournament.id,
+        map_competitor_id_to_next_match_id={
+            competitor_id: bracket.match_ids[next_match_index]
+            for competitor_id, next_match_index in bracket.next_match_indices.items()
+            if next_match_index is not None
+        },
+        session=session,
+    )
 
 
-def adjust_next_match_references(
+def reload_started_tournament_data(
     *,
-    map_competitor_association: dict[Competitor, TournamentCompetitor],
-    map_competitor_next_match_index: dict[Competitor, int | None],
-    new_matches: list[Match],
+    tournament_id: int,
     session: Session,
-):
-    for competitor, next_match_index in map_competitor_next_match_index.items():
-        association = map_competitor_association[competitor]
-        if next_match_index is None:
-            association.next_match_id = None
-        else:
-            association.next_match_id = new_matches[next_match_index].id
-        session.add(association)
+) -> list[Match]:
+    # After the commit, every instance is expired.
+    # Reload them using a fixed number of queries instead of a refresh per instance
+    session.scalars(
+        select(Competitor)
+        .select_from(TournamentCompetitor)
+        .join(TournamentCompetitor.competitor)
+        .where(TournamentCompetitor.tournament_id == tournament_id)
+    ).all()
+
+    matches = session.scalars(
+        select(Match)
+        .where(Match.tournament_id == tournament_id)
+        .order_by(
+            Match.round.desc(),
+            Match.position.asc(),
+        )
+    ).all()
 
-    session.commit()
+    return matches
 
 
 def start_tournament(
     *,
     tournament: Tournament,
     competitor_associations: list[TournamentCompetitor],
+    seed: int | None = None,
+    seeding: Sequence[UUID] | None = None,
     session: Session = Depends(get_session),
 ):
+    """Create every Match of a Tournament.
+
+    The same seed always draws the same bracket for the same Competitors.
+    With a seeding, a sequence of distinct Competitor UUIDs from the top seed,
+    Competitors are placed with standard seeding and unseeded ones are drawn below them.
+    """
+
     if not competitor_associations:
         raise ValueError("No competitors to start tournament")
 
-    map_competitor_association = {
-        association.competitor: association for association in competitor_associations
-    }
-    map_competitor_next_match_index: dict[Competitor, int | None] = {}
-
-    (
-        number_of_competitors,
-        starting_round,
-        number_of_entry_matches,
-    ) = calculate_tournament_parameters(
-        competitor_associations,
+    # Associations are sorted to draw independently of their loading order
+    competitors = sorted(
+        (association.competitor for association in competitor_associations),
+        key=lambda competitor: competitor.id,
     )
+    bracket = BracketEngine(number_competitors=len(competitors))
 
-    match_data = prepare_match_data_as_list_of_dict(
-        tournament=tournament,
-        starting_round=starting_round,
-        number_of_competitors=number_of_competitors,
-    )
-
-    inline_random_pair_of_entry_match_competitors(
-        competitors=map_competitor_association,
-        number_of_entry_matches=number_of_entry_matches,
-        match_data=match_data,
-        map_competitor_next_match_index=map_competitor_next_match_index,
-    )
+    if seeding is None:
+        competitor_sequence = random_sequence_of_competitors(competitors, seed=seed)
+    else:
+        competitor_sequence = seeded_sequence_of_competitors(
+            competitors,
+            seeding=seeding,
+            seed=seed,
+        )
 
-    # We need to process automatic winning before the bulk insert
-    process_automatic_winning(
-        match_data=match_data,
-        map_competitor_next_match_index=map_competitor_next_match_index,
+    # Pairs of entry match competitors, with automatic winnings
+    # already propagated before the bulk insert
+    bracket.seat_entry_competitors(
+        [competitor.id for competitor in competitor_sequence],
+        seeded=seeding is not None,
     )
 
     # Batch insert Match instances
-    new_matches = insert_and_refresh_match_data_as_match_instances(
+    insert_match_data_as_match_instances(
         tournament=tournament,
-        match_data=match_data,
-        number_of_competitors=number_of_competitors,
-        starting_round=starting_round,
+        bracket=bracket,
         session=session,
     )
 
     # Adjust next matches
     adjust_next_match_references(
-        map_competitor_association=map_competitor_association,
-        map_competitor_next_match_index=map_competitor_next_match_index,
-        new_matches=new_matches,
+        tournament=tournament,
+        bracket=bracket,
+        session=session,
+    )
+
+    # Every Competitor now has its Tournament started,
+    # which a single Competitor wins right away
+    bump_tournament_version(
+        tournament_id=tournament.id,
+        values=bracket.standings_values(bracket.changed_indices),
         session=session,
     )
+    bump_competitor_versions(tournament_id=tournament.id, session=session)
 
-    return new_matches
+    tournament_id = tournament.id
+    invalidate_tournament_on_commit(tournament_uuid=tournament.uuid, session=session)
+    session.commit()
+
+    return reload_started_tournament_data(
+        tournament_id=tournament_id,
+        session=session,
+    )
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -5,6 +7,23 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
     DATABASE_URL: str
+    DATABASE_ASYNC_MODE: bool = False
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: float = 30.0
+    DATABASE_POOL_RECYCLE: int = -1
+    DATABASE_POOL_PRE_PING: bool = False
+    DATABASE_POOL_CHECKOUT_WARNING: float = 1.0
+    DATABASE_NATIVE_POOL: bool = False
+    DATABASE_STATEMENT_TIMEOUT: int | None = None
+    INSTRUMENTATION_ENABLED: bool = False
+    RESPONSE_CACHE_MAXSIZE: int = 1024
+    RESPONSE_CACHE_TTL: float = 60.0
+    RESPONSE_CACHE_URL: str | None = None
+    EVENTS_BACKEND: Literal["memory", "postgresql"] = "memory"
+    FAST_JSON_RESPONSES: bool = False
+    MATCH_RESULT_STRATEGY: Literal["statements", "cte"] = "statements"
+    BULK_COMPETITORS_MAX_BYTES: int = 8 * 1024 * 1024
 
 
 settings = Settings()
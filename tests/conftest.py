@@ -1,10 +1,11 @@
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import NullPool, create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
-from matamata.database import get_session
-from matamata.main import app
+from matamata.database import get_async_session, get_session
+from matamata.main import app, create_app
 from matamata.models import Base
 from matamata.settings import settings
 from tests.models.factories import CompetitorFactory, TournamentFactory
@@ -33,6 +34,30 @@ def client(session):
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def async_session_factory(session):
+    # NullPool avoids sharing connections between event loops
+    async_engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+
+    def async_session_factory():
+        return AsyncSession(async_engine)
+
+    return async_session_factory
+
+
+@pytest.fixture
+def async_client(async_session_factory):
+    async_app = create_app(async_mode=True)
+
+    async def get_async_session_override():
+        async with async_session_factory() as async_session:
+            yield async_session
+
+    async_app.dependency_overrides[get_async_session] = get_async_session_override
+    with TestClient(async_app) as async_client:
+        yield async_client
+
+
 @pytest.fixture
 def competitor(session):
     competitor = CompetitorFactory()
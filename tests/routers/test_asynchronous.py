@@ -0,0 +1,174 @@
+import asyncio
+
+from fastapi.routing import APIRoute
+
+from matamata.main import create_app
+from matamata.routers import asynchronous
+
+
+def test_asynchronous_routes_mirror_synchronous_routes():
+    def describe_routes(app):
+        return sorted(
+            (route.path, tuple(sorted(route.methods)), route.status_code)
+            for route in app.routes
+            if isinstance(route, APIRoute)
+        )
+
+    sync_app = create_app(async_mode=False)
+    async_app = create_app(async_mode=True)
+
+    assert describe_routes(async_app) == describe_routes(sync_app)
+    assert async_app.openapi()["paths"] == sync_app.openapi()["paths"]
+
+
+def test_create_competitors_in_bulk_in_async_mode(async_client):
+    response = async_client.post("/competitor/bulk", json=["Ann", "Bob"])
+
+    assert response.status_code == 201
+    assert [competitor["label"] for competitor in response.json()["competitors"]] == [
+        "Ann",
+        "Bob",
+    ]
+
+
+def test_tournament_lifecycle_in_async_mode(async_client):
+    tournament = async_client.post("/tournament/", json={"label": "Async Cup"})
+    assert tournament.status_code == 201
+    tournament_uuid = tournament.json()["uuid"]
+
+    competitor_uuids = []
+    for label in ["Ann", "Bob", "Cid"]:
+        competitor = async_client.post("/competitor/", json={"label": label})
+        assert competitor.status_code == 201
+        competitor_uuids.append(competitor.json()["uuid"])
+
+        registration = async_client.post(
+            f"/tournament/{tournament_uuid}/competitor",
+            json={"competitor_uuid": competitor_uuids[-1]},
+        )
+        assert registration.status_code == 201
+
+    duplicate_registration = async_client.post(
+        f"/tournament/{tournament_uuid}/competitor",
+        json={"competitor_uuid": competitor_uuids[0]},
+    )
+    assert duplicate_registration.status_code == 409
+    assert duplicate_registration.json() == {
+        "detail": "Target Competitor is already registered in target Tournament",
+    }
+
+    start = async_client.post(f"/tournament/{tournament_uuid}/start")
+    assert start.status_code == 201
+    start_json = start.json()
+    assert start_json["tournament"]["startingRound"] == 1
+    assert start_json["tournament"]["numberCompetitors"] == 3
+    assert len(start_json["matches"]) == 4
+
+    semifinal = start_json["matches"][0]
+    winner_uuid = semifinal["competitorA"]["uuid"]
+    result = async_client.post(
+        f"/match/{semifinal['uuid']}",
+        json={"winner_uuid": winner_uuid},
+    )
+    assert result.status_code == 200
+    assert result.json()["winner"]["uuid"] == winner_uuid
+    assert result.json()["loser"] == semifinal["competitorB"]
+
+    matches = async_client.get(f"/tournament/{tournament_uuid}/match")
+    assert matches.status_code == 200
+    upcoming = matches.json()["upcoming"]
+    assert len(upcoming) == 1
+    assert upcoming[0]["round"] == 0
+    assert upcoming[0]["position"] == 0
+    assert winner_uuid in {
+        upcoming[0]["competitorA"]["uuid"],
+        upcoming[0]["competitorB"]["uuid"],
+    }
+
+    streamed_matches = async_client.get(
+        f"/tournament/{tournament_uuid}/match",
+        params={"stream": True},
+    )
+    assert streamed_matches.status_code == 200
+    assert streamed_matches.content == matches.content
+
+    competitor_detail = async_client.get(f"/competitor/{winner_uuid}")
+    assert competitor_detail.status_code == 200
+    assert competitor_detail.json()["tournaments"]["ongoing"] == [
+        {"uuid": tournament_uuid, "label": "Async Cup"},
+    ]
+
+    missing = async_client.get("/match/01234567-89ab-cdef-0123-456789abcdef")
+    assert missing.status_code == 404
+    assert missing.json() == {"detail": "Target Match does not exist"}
+
+
+def test_entity_tags_in_async_mode(async_client):
+    competitor = async_client.post("/competitor/", json={"label": "Ann"})
+    competitor_uuid = competitor.json()["uuid"]
+
+    response = async_client.get(f"/competitor/{competitor_uuid}")
+    assert response.status_code == 200
+    assert response.headers["ETag"] == f'"{competitor_uuid}.0"'
+
+    response = async_client.get(
+        f"/competitor/{competitor_uuid}",
+        headers={"If-None-Match": response.headers["ETag"]},
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+
+
+def test_404_for_missing_tournament_during_watch_tournament_events_in_async_mode(
+    async_client,
+):
+    response = async_client.get(
+        "/tournament/01234567-89ab-cdef-0123-456789abcdef/events"
+    )
+
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Target Tournament does not exist"}
+
+
+def test_responses_are_rendered_outside_of_the_event_loop_in_async_mode(
+    async_client,
+    monkeypatch,
+):
+    # Whether an event loop runs in the thread of each rendered response
+    rendered_in_event_loop = []
+    run_in_threadpool = asynchronous.run_in_threadpool
+
+    async def recording_run_in_threadpool(function, *args):
+        def run():
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                rendered_in_event_loop.append(False)
+            else:
+                rendered_in_event_loop.append(True)
+            return function(*args)
+
+        return await run_in_threadpool(run)
+
+    monkeypatch.setattr(asynchronous, "run_in_threadpool", recording_run_in_threadpool)
+
+    tournament = async_client.post("/tournament/", json={"label": "Async Cup"})
+    tournament_uuid = tournament.json()["uuid"]
+    competitor = async_client.post("/competitor/", json={"label": "Ann"})
+    competitor_uuid = competitor.json()["uuid"]
+    assert rendered_in_event_loop == [False, False]
+
+    # Relationships not loaded by the endpoint are lazy loaded within the session
+    registration = async_client.post(
+        f"/tournament/{tournament_uuid}/competitor",
+        json={"competitor_uuid": competitor_uuid},
+    )
+    assert registration.status_code == 201
+    assert registration.json()["competitor"]["uuid"] == competitor_uuid
+
+    listing = async_client.get(f"/tournament/{tournament_uuid}/competitor")
+    assert listing.status_code == 200
+    assert listing.headers["ETag"] == f'"{tournament_uuid}.1"'
+    assert [competitor_["uuid"] for competitor_ in listing.json()["competitors"]] == [
+        competitor_uuid
+    ]
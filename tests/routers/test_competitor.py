@@ -1,4 +1,9 @@
-from tests.utils import start_tournament_util
+import orjson
+
+from matamata.routers.pagination import encode_cursor
+from matamata.settings import settings
+from tests.models.factories import CompetitorFactory, TournamentFactory
+from tests.utils import count_queries, start_tournament_util
 
 BASE_URL = "/competitor"
 
@@ -23,6 +28,95 @@ def test_create_competitor(client):
     }
 
 
+def test_create_competitors_in_bulk(client):
+    response = client.post(
+        BASE_URL + "/bulk",
+        json=["\tBrazil ", "Germany", "Brazil"],
+    )
+
+    assert response.status_code == 201
+    competitors = response.json()["competitors"]
+    assert [competitor_["label"] for competitor_ in competitors] == [
+        "Brazil",
+        "Germany",
+        "Brazil",
+    ]
+    assert len({competitor_["uuid"] for competitor_ in competitors}) == 3
+
+    # Created Competitors are listed as usual
+    assert client.get(BASE_URL).json()["competitors"] == competitors
+
+
+def test_create_competitors_in_bulk_from_ndjson(client):
+    labels = [f"Competitor {index}" for index in range(2500)]
+
+    response = client.post(
+        BASE_URL + "/bulk",
+        content="".join(f'"{label}"\n' for label in labels),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 201
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = response.text.splitlines()
+    assert [orjson.loads(line)["label"] for line in lines] == labels
+
+    listed = client.get(BASE_URL, params={"limit": 1000}).json()["competitors"]
+    assert listed == [orjson.loads(line) for line in lines[:1000]]
+
+
+def test_422_for_invalid_labels_during_create_competitors_in_bulk(client):
+    response = client.post(BASE_URL + "/bulk", json=["Brazil", " \t"])
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", 1]
+    assert response.json()["detail"][0]["msg"] == (
+        "Value error, must not be empty or contain only whitespace characters"
+    )
+
+    for invalid_payload in [[], {"label": "Brazil"}]:
+        response = client.post(BASE_URL + "/bulk", json=invalid_payload)
+        assert response.status_code == 422
+
+    response = client.post(
+        BASE_URL + "/bulk",
+        content='"Brazil"\n"Germany',
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["type"] == "json_invalid"
+
+    # Nothing is created by rejected payloads
+    assert client.get(BASE_URL).json()["competitors"] == []
+
+
+def test_413_for_payload_too_large_during_create_competitors_in_bulk(
+    client,
+    monkeypatch,
+):
+    monkeypatch.setattr(settings, "BULK_COMPETITORS_MAX_BYTES", 32)
+    expected = {"detail": "Payload must not exceed 32 bytes"}
+
+    response = client.post(BASE_URL + "/bulk", json=["Brazil"] * 8)
+    assert response.status_code == 413
+    assert response.json() == expected
+
+    # Chunked bodies have no Content-Length, so they are capped while read
+    response = client.post(
+        BASE_URL + "/bulk",
+        content=iter([b'"Brazil"\n'] * 8),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 413
+    assert response.json() == expected
+
+    response = client.post(BASE_URL + "/bulk", json=["Brazil", "Germany"])
+    assert response.status_code == 201
+
+    # Nothing is created by rejected payloads
+    assert len(client.get(BASE_URL).json()["competitors"]) == 2
+
+
 def test_list_competitors(
     client, competitor1, competitor2, competitor3, competitor4, competitor5
 ):
@@ -40,6 +134,7 @@ def test_list_competitors(
                 competitor5,
             ]
         ],
+        "nextCursor": None,
     }
 
     response = client.get(
@@ -50,6 +145,65 @@ def test_list_competitors(
     assert response.json() == expected_data
 
 
+def test_list_competitors_by_pages(
+    client, competitor1, competitor2, competitor3, competitor4, competitor5
+):
+    competitors = [competitor1, competitor2, competitor3, competitor4, competitor5]
+    received_uuids = []
+    cursor = None
+
+    for expected_page_size in [2, 2, 1]:
+        params = {"limit": 2}
+        if cursor is not None:
+            params["cursor"] = cursor
+        response = client.get(BASE_URL, params=params)
+
+        assert response.status_code == 200
+        response_json = response.json()
+        assert len(response_json["competitors"]) == expected_page_size
+        received_uuids.extend(
+            competitor_["uuid"] for competitor_ in response_json["competitors"]
+        )
+        cursor = response_json["nextCursor"]
+
+    assert cursor is None
+    assert received_uuids == [str(competitor_.uuid) for competitor_ in competitors]
+
+
+def test_list_competitors_by_label_prefix(session, client):
+    for label in ["Brazil", "Bra%il", "Bulgaria", "Argentina"]:
+        session.add(CompetitorFactory(label=label))
+    session.commit()
+
+    response = client.get(BASE_URL, params={"label_prefix": "Bra"})
+    assert response.status_code == 200
+    assert [competitor_["label"] for competitor_ in response.json()["competitors"]] == [
+        "Brazil",
+        "Bra%il",
+    ]
+
+    # LIKE wildcards are matched literally
+    response = client.get(BASE_URL, params={"label_prefix": "Bra%"})
+    assert response.status_code == 200
+    assert [competitor_["label"] for competitor_ in response.json()["competitors"]] == [
+        "Bra%il"
+    ]
+
+
+def test_422_for_invalid_cursor_during_list_competitors(client):
+    response = client.get(BASE_URL, params={"cursor": "not a cursor"})
+
+    assert response.status_code == 422
+    assert response.json() == {
+        "detail": "Invalid pagination cursor",
+    }
+
+
+def test_422_for_out_of_range_limit_during_list_competitors(client):
+    assert client.get(BASE_URL, params={"limit": 0}).status_code == 422
+    assert client.get(BASE_URL, params={"limit": 1001}).status_code == 422
+
+
 GET_COMPETITOR_DETAIL_URL_TEMPLATE = BASE_URL + "/{competitor_uuid}"
 
 
@@ -122,6 +276,11 @@ def test_200_get_competitor_detail_for_competitor_in_past_ongoing_upcoming_tourn
                 },
             ],
         },
+        "nextCursors": {
+            "past": None,
+            "ongoing": None,
+            "upcoming": None,
+        },
     }
 
 
@@ -141,6 +300,11 @@ def test_200_get_competitor_detail_for_competitor_in_no_tournament(client, compe
             "ongoing": [],
             "upcoming": [],
         },
+        "nextCursors": {
+            "past": None,
+            "ongoing": None,
+            "upcoming": None,
+        },
     }
 
 
@@ -177,6 +341,11 @@ def test_200_get_competitor_detail_for_competitor_in_a_past_tournament(
             "ongoing": [],
             "upcoming": [],
         },
+        "nextCursors": {
+            "past": None,
+            "ongoing": None,
+            "upcoming": None,
+        },
     }
 
 
@@ -216,6 +385,11 @@ def test_200_get_competitor_detail_for_competitor_in_an_ongoing_tournament(
             ],
             "upcoming": [],
         },
+        "nextCursors": {
+            "past": None,
+            "ongoing": None,
+            "upcoming": None,
+        },
     }
 
 
@@ -247,6 +421,11 @@ def test_200_get_competitor_detail_for_competitor_in_an_unstarted_tournament(
                 },
             ],
         },
+        "nextCursors": {
+            "past": None,
+            "ongoing": None,
+            "upcoming": None,
+        },
     }
 
 
@@ -261,3 +440,109 @@ def test_404_for_missing_competitor_during_get_competitor_detail(client):
     assert response.json() == {
         "detail": "Target Competitor does not exist",
     }
+
+
+def test_entity_tag_of_competitor_detail_changes_with_its_tournaments(
+    session,
+    client,
+    competitor,
+    tournament,
+):
+    url = GET_COMPETITOR_DETAIL_URL_TEMPLATE.format(competitor_uuid=competitor.uuid)
+
+    response = client.get(url)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    response = client.post(
+        f"/tournament/{tournament.uuid}/competitor",
+        json={"competitor_uuid": str(competitor.uuid)},
+    )
+    assert response.status_code == 201
+
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()["tournaments"]["upcoming"]) == 1
+    assert response.headers["ETag"] != etag
+
+    etag = response.headers["ETag"]
+    start_tournament_util(tournament_uuid=tournament.uuid, session=session)
+
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()["tournaments"]["past"]) == 1
+    assert response.headers["ETag"] != etag
+
+
+def test_200_get_competitor_detail_by_pages_of_each_status(session, client, competitor):
+    tournaments = TournamentFactory.create_batch(5)
+    for tournament in tournaments:
+        competitor.tournaments.append(tournament)
+    session.add(competitor)
+    session.commit()
+    for tournament in tournaments[:2]:
+        start_tournament_util(tournament_uuid=tournament.uuid, session=session)
+    session.refresh(competitor)
+
+    url = GET_COMPETITOR_DETAIL_URL_TEMPLATE.format(competitor_uuid=competitor.uuid)
+    past_uuids = [str(tournament.uuid) for tournament in tournaments[:2]]
+    upcoming_uuids = [str(tournament.uuid) for tournament in tournaments[2:]]
+
+    session.expunge_all()
+    with count_queries(session) as statements:
+        response = client.get(url, params={"limit": 2})
+    # competitor and every tournament status at once
+    assert len(statements) == 2
+
+    response_json = response.json()
+    assert response.status_code == 200
+    assert [
+        tournament["uuid"] for tournament in response_json["tournaments"]["past"]
+    ] == past_uuids
+    assert [
+        tournament["uuid"] for tournament in response_json["tournaments"]["upcoming"]
+    ] == upcoming_uuids[:2]
+    assert response_json["nextCursors"]["past"] is None
+    assert response_json["nextCursors"]["ongoing"] is None
+    assert response_json["nextCursors"]["upcoming"] is not None
+
+    response = client.get(
+        url,
+        params={
+            "limit": 2,
+            "upcoming_cursor": response_json["nextCursors"]["upcoming"],
+        },
+    )
+    response_json = response.json()
+    assert response.status_code == 200
+    # Only the upcoming status moves to its next page
+    assert [
+        tournament["uuid"] for tournament in response_json["tournaments"]["past"]
+    ] == past_uuids
+    assert [
+        tournament["uuid"] for tournament in response_json["tournaments"]["upcoming"]
+    ] == upcoming_uuids[2:]
+    assert response_json["nextCursors"]["upcoming"] is None
+
+
+def test_422_for_invalid_cursor_during_get_competitor_detail(client, competitor):
+    response = client.get(
+        GET_COMPETITOR_DETAIL_URL_TEMPLATE.format(competitor_uuid=competitor.uuid),
+        params={"past_cursor": "not a cursor"},
+    )
+
+    assert response.status_code == 422
+    assert response.json() == {"detail": "Invalid pagination cursor"}
+
+    # Ids beyond the INTEGER range are rejected before reaching the database
+    for param in ["past_cursor", "ongoing_cursor", "upcoming_cursor"]:
+        for last_id in [2**31, -1, 10**20]:
+            response = client.get(
+                GET_COMPETITOR_DETAIL_URL_TEMPLATE.format(
+                    competitor_uuid=competitor.uuid
+                ),
+                params={param: encode_cursor(last_id)},
+            )
+            assert response.status_code == 422
+            assert response.json() == {"detail": "Invalid pagination cursor"}
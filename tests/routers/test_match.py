@@ -1,7 +1,12 @@
 from datetime import datetime
 
 from matamata.models import Match
-from tests.utils import retrieve_tournament_competitor, start_tournament_util
+from tests.utils import (
+    count_queries,
+    register_match_result_util,
+    retrieve_tournament_competitor,
+    start_tournament_util,
+)
 
 BASE_URL = "/match"
 
@@ -691,3 +696,110 @@ def test_409_for_competitor_not_match_competitor_during_register_match_result(
     assert response.json() == {
         "detail": "Target Competitor is not a target Match competitor",
     }
+
+
+def test_get_match_detail_issues_a_single_query(
+    session,
+    client,
+    tournament,
+    competitor1,
+    competitor2,
+):
+    for competitor_ in [competitor1, competitor2]:
+        tournament.competitors.append(competitor_)
+    session.add(tournament)
+    session.commit()
+
+    tournament, matches = start_tournament_util(
+        tournament_uuid=tournament.uuid,
+        session=session,
+    )
+    register_match_result_util(
+        match_uuid=matches[0].uuid,
+        winner_uuid=competitor1.uuid,
+        session=session,
+    )
+    final_uuid = matches[0].uuid
+    winner_uuid = competitor1.uuid
+    loser_uuid = competitor2.uuid
+
+    # An empty identity map makes every lazy load reach the database
+    session.expunge_all()
+    with count_queries(session) as statements:
+        response = client.get(
+            GET_MATCH_DETAIL_URL_TEMPLATE.format(match_uuid=final_uuid),
+        )
+
+    assert response.status_code == 200
+    assert response.json()["winner"]["uuid"] == str(winner_uuid)
+    assert response.json()["loser"]["uuid"] == str(loser_uuid)
+    assert len(statements) == 1
+
+
+def test_304_for_get_match_detail_with_matching_entity_tag(
+    session,
+    client,
+    tournament,
+    competitor1,
+    competitor2,
+    competitor3,
+):
+    for competitor_ in [competitor1, competitor2, competitor3]:
+        tournament.competitors.append(competitor_)
+    session.add(tournament)
+    session.commit()
+    tournament, matches = start_tournament_util(
+        tournament_uuid=tournament.uuid,
+        session=session,
+    )
+    semifinal, _, final, _ = matches
+    semifinal_uuid = semifinal.uuid
+    final_uuid = final.uuid
+    winner_uuid = semifinal.competitor_a.uuid
+
+    response = client.get(GET_MATCH_DETAIL_URL_TEMPLATE.format(match_uuid=final_uuid))
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert etag == f'"{final_uuid}.{tournament.version}"'
+
+    session.expunge_all()
+    with count_queries(session) as statements:
+        response = client.get(
+            GET_MATCH_DETAIL_URL_TEMPLATE.format(match_uuid=final_uuid),
+            headers={"If-None-Match": f'W/"other", W/{etag}'},
+        )
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+    # only the Match row lookup, which includes the Tournament version
+    assert len(statements) == 1
+
+    # A result of another Match of the Tournament changes the final competitors
+    register_match_result_util(
+        match_uuid=semifinal_uuid,
+        winner_uuid=winner_uuid,
+        session=session,
+    )
+
+    session.expunge_all()
+    with count_queries(session) as statements:
+        response = client.get(
+            GET_MATCH_DETAIL_URL_TEMPLATE.format(match_uuid=final_uuid),
+            headers={"If-None-Match": etag},
+        )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    # A stale entity tag is checked against the same Match row lookup
+    assert len(statements) == 1
+    assert response.json()["competitorA"]["uuid"] == str(winner_uuid)
+
+
+def test_404_for_missing_match_with_entity_tag_during_get_match_detail(client):
+    response = client.get(
+        GET_MATCH_DETAIL_URL_TEMPLATE.format(
+            match_uuid="01234567-89ab-cdef-0123-456789abcdef"
+        ),
+        headers={"If-None-Match": "*"},
+    )
+
+    assert response.status_code == 404
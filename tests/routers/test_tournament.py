@@ -1,6 +1,16 @@
 from datetime import datetime
+from uuid import UUID
 
-from tests.utils import register_match_result_util, start_tournament_util
+import orjson
+from sqlalchemy import select
+
+from matamata.cache import response_cache
+from matamata.models import Competitor, Tournament
+from matamata.routers.conditional import entity_tag
+from matamata.routers.pagination import encode_cursor
+from matamata.routers.streaming import StreamedArray, stream_json_object
+from tests.models.factories import CompetitorFactory, TournamentFactory
+from tests.utils import count_queries, register_match_result_util, start_tournament_util
 
 BASE_URL = "/tournament"
 
@@ -34,6 +44,7 @@ def test_list_tournaments(client, tournament1, tournament2, tournament3):
             }
             for tournament_ in [tournament1, tournament2, tournament3]
         ],
+        "nextCursor": None,
     }
 
     response = client.get(
@@ -44,6 +55,64 @@ def test_list_tournaments(client, tournament1, tournament2, tournament3):
     assert response.json() == expected_data
 
 
+def test_list_tournaments_by_pages(client, tournament1, tournament2, tournament3):
+    first_page = client.get(BASE_URL, params={"limit": 2})
+
+    assert first_page.status_code == 200
+    first_page_json = first_page.json()
+    assert first_page_json["tournaments"] == [
+        {
+            "uuid": str(tournament_.uuid),
+            "label": tournament_.label,
+        }
+        for tournament_ in [tournament1, tournament2]
+    ]
+    assert first_page_json["nextCursor"] is not None
+
+    second_page = client.get(
+        BASE_URL,
+        params={"limit": 2, "cursor": first_page_json["nextCursor"]},
+    )
+
+    assert second_page.status_code == 200
+    assert second_page.json() == {
+        "tournaments": [
+            {
+                "uuid": str(tournament3.uuid),
+                "label": tournament3.label,
+            },
+        ],
+        "nextCursor": None,
+    }
+
+
+def test_422_for_out_of_range_cursor_during_list_tournaments(client):
+    # A valid integer, but beyond the range of Tournament ids
+    for last_id in [2**31, -1, 99999999999999999999]:
+        response = client.get(BASE_URL, params={"cursor": encode_cursor(last_id)})
+
+        assert response.status_code == 422
+        assert response.json() == {"detail": "Invalid pagination cursor"}
+
+    response = client.get(BASE_URL, params={"cursor": encode_cursor(2**31 - 1)})
+    assert response.status_code == 200
+    assert response.json() == {"tournaments": [], "nextCursor": None}
+
+
+def test_list_tournaments_by_label_prefix(session, client):
+    for label in ["World Cup 2002", "World Cup 2014", "Copa America"]:
+        session.add(TournamentFactory(label=label))
+    session.commit()
+
+    response = client.get(BASE_URL, params={"label_prefix": "World"})
+
+    assert response.status_code == 200
+    assert [tournament_["label"] for tournament_ in response.json()["tournaments"]] == [
+        "World Cup 2002",
+        "World Cup 2014",
+    ]
+
+
 REGISTER_COMPETITOR_IN_TOURNAMENT_URL_TEMPLATE = (
     BASE_URL + "/{tournament_uuid}/competitor"
 )
@@ -158,6 +227,123 @@ def test_409_for_already_registered_competitor_during_register_competitor_in_tou
     }
 
 
+REGISTER_COMPETITORS_IN_TOURNAMENT_URL_TEMPLATE = (
+    BASE_URL + "/{tournament_uuid}/competitors"
+)
+
+
+def test_200_for_register_competitors_in_tournament(
+    client, session, tournament, competitor1, competitor2, competitor3
+):
+    tournament.competitors.append(competitor1)
+    session.add(tournament)
+    session.commit()
+    missing_uuid = "01234567-89ab-cdef-0123-456789abcdef"
+
+    response = client.post(
+        REGISTER_COMPETITORS_IN_TOURNAMENT_URL_TEMPLATE.format(
+            tournament_uuid=tournament.uuid
+        ),
+        json={
+            "competitor_uuids": [
+                str(competitor2.uuid),
+                str(competitor1.uuid),
+                missing_uuid,
+                str(competitor3.uuid),
+                str(competitor2.uuid),
+            ],
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "tournament": {
+            "uuid": str(tournament.uuid),
+            "label": tournament.label,
+        },
+        "registered": [
+            {
+                "uuid": str(competitor_.uuid),
+                "label": competitor_.label,
+            }
+            for competitor_ in [competitor2, competitor3]
+        ],
+        "alreadyRegistered": [str(competitor1.uuid)],
+        "missing": [missing_uuid],
+    }
+
+    listed = client.get(
+        LIST_COMPETITORS_IN_TOURNAMENT_URL_TEMPLATE.format(
+            tournament_uuid=tournament.uuid
+        )
+    ).json()["competitors"]
+    assert {competitor_["uuid"] for competitor_ in listed} == {
+        str(competitor_.uuid) for competitor_ in [competitor1, competitor2, competitor3]
+    }
+
+
+def test_register_competitors_in_tournament_issues_a_constant_number_of_queries(
+    client, session, tournament1, tournament2
+):
+    competitors = CompetitorFactory.create_batch(size=40)
+    session.add_all(competitors)
+    session.commit()
+    competitor_uuids = [str(competitor_.uuid) for competitor_ in competitors]
+
+    statement_counts = []
+    for tournament_uuid, number_of_competitors in [
+        (tournament1.uuid, 4),
+        (tournament2.uuid, 40),
+    ]:
+        session.expunge_all()
+        with count_queries(session) as statements:
+            response = client.post(
+                REGISTER_COMPETITORS_IN_TOURNAMENT_URL_TEMPLATE.format(
+                    tournament_uuid=tournament_uuid
+                ),
+                json={"competitor_uuids": competitor_uuids[:number_of_competitors]},
+            )
+        assert response.status_code == 200
+        assert len(response.json()["registered"]) == number_of_competitors
+        statement_counts.append(len(statements))
+
+    assert statement_counts[0] == statement_counts[1]
+
+
+def test_errors_for_register_competitors_in_tournament(client, session, tournament):
+    url = REGISTER_COMPETITORS_IN_TOURNAMENT_URL_TEMPLATE.format(
+        tournament_uuid=tournament.uuid
+    )
+    competitor_uuids = ["01234567-89ab-cdef-0123-456789abcdef"]
+
+    response = client.post(url, json={"competitor_uuids": []})
+    assert response.status_code == 422
+
+    response = client.post(
+        REGISTER_COMPETITORS_IN_TOURNAMENT_URL_TEMPLATE.format(
+            tournament_uuid="01234567-89ab-cdef-0123-456789abcdef",
+        ),
+        json={"competitor_uuids": competitor_uuids},
+    )
+    assert response.status_code == 404
+    assert response.json() == {
+        "detail": "Target Tournament does not exist",
+    }
+
+    # Already started tournament
+    tournament.matches_creation = datetime(year=2024, month=1, day=1)
+    tournament.number_competitors = 1
+    tournament.starting_round = 0
+    session.add(tournament)
+    session.commit()
+
+    response = client.post(url, json={"competitor_uuids": competitor_uuids})
+    assert response.status_code == 409
+    assert response.json() == {
+        "detail": "Target Tournament has already created its matches and does not allow new Competitors registration",
+    }
+
+
 def test_list_competitors_in_tournament(
     session,
     client,
@@ -645,6 +831,47 @@ def test_422_for_missing_competitor_during_start_tournament(client, tournament):
     }
 
 
+def test_start_tournament_with_seed_and_seeding(
+    client, session, tournament, competitor1, competitor2, competitor3
+):
+    for competitor_ in [competitor1, competitor2, competitor3]:
+        tournament.competitors.append(competitor_)
+    session.add(tournament)
+    session.commit()
+
+    response = client.post(
+        START_TOURNAMENT_URL_TEMPLATE.format(tournament_uuid=tournament.uuid),
+        json={"seed": 7, "seeding": [str(competitor2.uuid)]},
+    )
+
+    assert response.status_code == 201
+    semifinals = [
+        match_ for match_ in response.json()["matches"] if match_["round"] == 1
+    ]
+    # The top seed gets the automatic winning
+    assert semifinals[0]["competitorA"]["uuid"] == str(competitor2.uuid)
+    assert semifinals[0]["competitorB"] is None
+    assert semifinals[0]["winner"]["uuid"] == str(competitor2.uuid)
+
+
+def test_422_for_invalid_seeding_during_start_tournament(
+    client, session, tournament, competitor1, competitor2
+):
+    tournament.competitors.append(competitor1)
+    session.add(tournament)
+    session.commit()
+
+    response = client.post(
+        START_TOURNAMENT_URL_TEMPLATE.format(tournament_uuid=tournament.uuid),
+        json={"seeding": [str(competitor2.uuid)]},
+    )
+
+    assert response.status_code == 422
+    assert response.json() == {
+        "detail": "Target seeding must only list distinct Competitors registered in target Tournament",
+    }
+
+
 LIST_TOURNAMENT_MATCHES_URL_TEMPLATE = BASE_URL + "/{tournament_uuid}/match"
 
 
@@ -1314,3 +1541,807 @@ def test_422_for_final_not_played_during_get_tournament_for_three_competitors(
     assert response.json() == {
         "detail": "Target Tournament is not ready to display the top 4 competitors",
     }
+
+
+def test_get_tournament_top4_is_a_single_query_over_stored_standings(
+    session,
+    client,
+    tournament,
+    competitor1,
+    competitor2,
+):
+    map_uuid_to_competitor_id = {}
+    for competitor_ in [competitor1, competitor2]:
+        tournament.competitors.append(competitor_)
+        map_uuid_to_competitor_id[str(competitor_.uuid)] = competitor_.id
+    session.add(tournament)
+    session.commit()
+
+    json_final = client.post(
+        START_TOURNAMENT_URL_TEMPLATE.format(tournament_uuid=tournament.uuid),
+    ).json()["matches"][0]
+    client.post(
+        REGISTER_MATCH_RESULT_URL_TEMPLATE.format(match_uuid=json_final["uuid"]),
+        json={"winner_uuid": json_final["competitorA"]["uuid"]},
+    )
+
+    # Standings were stored along with the final result
+    session.expire_all()
+    assert (
+        tournament.first_place_id
+        == map_uuid_to_competitor_id[json_final["competitorA"]["uuid"]]
+    )
+    assert (
+        tournament.second_place_id
+        == map_uuid_to_competitor_id[json_final["competitorB"]["uuid"]]
+    )
+
+    with count_queries(session) as statements:
+        response = client.get(
+            GET_TOURNAMENT_TOP4_URL_TEMPLATE.format(tournament_uuid=tournament.uuid),
+        )
+
+    assert response.status_code == 200
+    assert response.json()["top4"] == [
+        json_final["competitorA"],
+        json_final["competitorB"],
+        None,
+        None,
+    ]
+    assert len(statements) == 1
+
+
+LIST_FINISHED_TOURNAMENTS_URL = BASE_URL + "/finished"
+
+
+def test_200_for_list_finished_tournaments(
+    session,
+    client,
+    tournament1,
+    tournament2,
+    competitor1,
+    competitor2,
+    competitor3,
+    competitor4,
+):
+    tournament1.competitors.extend([competitor1, competitor2])
+    tournament2.competitors.extend([competitor3, competitor4])
+    session.add_all([tournament1, tournament2])
+    session.commit()
+
+    response = client.get(LIST_FINISHED_TOURNAMENTS_URL)
+    assert response.status_code == 200
+    assert response.json() == {"tournaments": [], "nextCursor": None}
+
+    for tournament_ in [tournament1, tournament2]:
+        json_final = client.post(
+            START_TOURNAMENT_URL_TEMPLATE.format(tournament_uuid=tournament_.uuid),
+        ).json()["matches"][0]
+
+    # Only the final of the second Tournament is played
+    client.post(
+        REGISTER_MATCH_RESULT_URL_TEMPLATE.format(match_uuid=json_final["uuid"]),
+        json={"winner_uuid": json_final["competitorB"]["uuid"]},
+    )
+
+    response = client.get(LIST_FINISHED_TOURNAMENTS_URL)
+    assert response.status_code == 200
+    assert response.json() == {
+        "tournaments": [
+            {
+                "uuid": str(tournament2.uuid),
+                "label": tournament2.label,
+                "champion": json_final["competitorB"],
+            },
+        ],
+        "nextCursor": None,
+    }
+
+
+def test_stream_tournament_matches(
+    session, client, tournament, competitor1, competitor2, competitor3, competitor4
+):
+    for competitor_ in [competitor1, competitor2, competitor3, competitor4]:
+        tournament.competitors.append(competitor_)
+    session.add(tournament)
+    session.commit()
+
+    tournament, matches = start_tournament_util(
+        tournament_uuid=tournament.uuid,
+        session=session,
+    )
+    register_match_result_util(
+        match_uuid=matches[0].uuid,
+        winner_uuid=matches[0].competitor_b.uuid,
+        session=session,
+    )
+
+    url = LIST_TOURNAMENT_MATCHES_URL_TEMPLATE.format(tournament_uuid=tournament.uuid)
+    response = client.get(url)
+    streamed_response = client.get(url, params={"stream": True})
+
+    assert streamed_response.status_code == 200
+    assert streamed_response.headers["content-type"] == "application/json"
+    assert len(response.json()["past"]) == 1
+    assert len(response.json()["upcoming"]) == 3
+    assert streamed_response.content == response.content
+
+
+def test_stream_tournament_matches_is_not_available_before_start(client, tournament):
+    response = client.get(
+        LIST_TOURNAMENT_MATCHES_URL_TEMPLATE.format(tournament_uuid=tournament.uuid),
+        params={"stream": True},
+    )
+
+    assert response.status_code == 422
+    assert response.json() == {
+        "detail": "Target Tournament has not created its matches yet",
+    }
+
+
+def test_stream_competitors_in_tournament(
+    session, client, tournament, competitor1, competitor2, competitor3
+):
+    url = LIST_COMPETITORS_IN_TOURNAMENT_URL_TEMPLATE.format(
+        tournament_uuid=tournament.uuid,
+    )
+
+    empty_streamed_response = client.get(url, params={"stream": True})
+    assert empty_streamed_response.status_code == 200
+    assert empty_streamed_response.content == client.get(url).content
+
+    for competitor_ in [competitor1, competitor2, competitor3]:
+        tournament.competitors.append(competitor_)
+    session.add(tournament)
+    session.commit()
+
+    response = client.get(url)
+    streamed_response = client.get(url, params={"stream": True})
+
+    assert streamed_response.status_code == 200
+    assert len(response.json()["competitors"]) == 3
+    assert streamed_response.content == response.content
+
+
+def test_streamed_arrays_are_read_from_the_same_snapshot(session, competitor1):
+    competitor_labels = StreamedArray(
+        select(Competitor.label).order_by(Competitor.id),
+        lambda row: row.label,
+    )
+    chunks = stream_json_object(
+        fields=[("before", competitor_labels), ("after", competitor_labels)],
+        session=session,
+    )
+
+    body = b""
+    while not body.endswith(b"],"):
+        body += next(chunks)
+    # Committed while the first array is already streamed
+    session.add(CompetitorFactory())
+    session.commit()
+    body += b"".join(chunks)
+
+    assert orjson.loads(body) == {
+        "before": [competitor1.label],
+        "after": [competitor1.label],
+    }
+
+
+def test_listing_matches_issues_a_constant_number_of_queries(
+    session, client, tournament, competitor1, competitor2, competitor3, competitor4
+):
+    for competitor_ in [competitor1, competitor2, competitor3, competitor4]:
+        tournament.competitors.append(competitor_)
+    session.add(tournament)
+    session.commit()
+
+    tournament, matches = start_tournament_util(
+        tournament_uuid=tournament.uuid,
+        session=session,
+    )
+    for semifinal in matches[:2]:
+        register_match_result_util(
+            match_uuid=semifinal.uuid,
+            winner_uuid=semifinal.competitor_a.uuid,
+            session=session,
+        )
+    tournament_uuid = tournament.uuid
+    competitor_uuid = competitor1.uuid
+
+    # An empty identity map makes every lazy load reach the database
+    session.expunge_all()
+    with count_queries(session) as statements:
+        response = client.get(
+            LIST_TOURNAMENT_MATCHES_URL_TEMPLATE.format(tournament_uuid=tournament_uuid)
+        )
+    assert response.status_code == 200
+    # tournament and matches
+    assert len(statements) == 2
+
+    session.expunge_all()
+    with count_queries(session) as statements:
+        response = client.get(
+            LIST_MATCHES_FOR_COMPETITOR_IN_TOURNAMENT_URL_TEMPLATE.format(
+                tournament_uuid=tournament_uuid,
+                competitor_uuid=competitor_uuid,
+            )
+        )
+    assert response.status_code == 200
+    # tournament, competitor, association and matches
+    assert len(statements) == 4
+
+
+REGISTER_MATCH_RESULTS_URL_TEMPLATE = BASE_URL + "/{tournament_uuid}/results"
+
+
+def test_200_for_register_match_results(
+    session, client, tournament, competitor1, competitor2, competitor3, competitor4
+):
+    for competitor_ in [competitor1, competitor2, competitor3, competitor4]:
+        tournament.competitors.append(competitor_)
+    session.add(tournament)
+    session.commit()
+
+    tournament, matches = start_tournament_util(
+        tournament_uuid=tournament.uuid,
+        session=session,
+    )
+    semifinal, other_semifinal, final, _ = matches
+
+    response = client.post(
+        REGISTER_MATCH_RESULTS_URL_TEMPLATE.format(tournament_uuid=tournament.uuid),
+        json={
+            "results": [
+                {
+                    "match_uuid": str(semifinal.uuid),
+                    "winner_uuid": str(semifinal.competitor_b.uuid),
+                },
+                {
+                    "match_uuid": str(final.uuid),
+                    "winner_uuid": str(semifinal.competitor_b.uuid),
+                },
+                {
+                    "match_uuid": str(other_semifinal.uuid),
+                    "winner_uuid": str(semifinal.competitor_a.uuid),
+                },
+            ],
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "tournament": {
+            "uuid": str(tournament.uuid),
+            "label": tournament.label,
+            "startingRound": 1,
+            "numberCompetitors": 4,
+        },
+        "results": [
+            {
+                "matchUuid": str(semifinal.uuid),
+                "winnerUuid": str(semifinal.competitor_b.uuid),
+                "statusCode": 200,
+                "detail": None,
+                "match": {
+                    "uuid": str(semifinal.uuid),
+                    "round": 1,
+                    "position": 0,
+                    "competitorA": {
+                        "uuid": str(semifinal.competitor_a.uuid),
+                        "label": semifinal.competitor_a.label,
+                    },
+                    "competitorB": {
+                        "uuid": str(semifinal.competitor_b.uuid),
+                        "label": semifinal.competitor_b.label,
+                    },
+                    "winner": {
+                        "uuid": str(semifinal.competitor_b.uuid),
+                        "label": semifinal.competitor_b.label,
+                    },
+                    "loser": {
+                        "uuid": str(semifinal.competitor_a.uuid),
+                        "label": semifinal.competitor_a.label,
+                    },
+                },
+            },
+            {
+                "matchUuid": str(final.uuid),
+                "winnerUuid": str(semifinal.competitor_b.uuid),
+                "statusCode": 422,
+                "detail": (
+                    "Target Match is not ready to register a result due to"
+                    " registered previous Matches but missing Competitor"
+                ),
+                "match": None,
+            },
+            {
+                "matchUuid": str(other_semifinal.uuid),
+                "winnerUuid": str(semifinal.competitor_a.uuid),
+                "statusCode": 409,
+                "detail": "Target Competitor is not a target Match competitor",
+                "match": None,
+            },
+        ],
+    }
+
+    session.refresh(final)
+    assert final.competitor_a_id == semifinal.competitor_b_id
+    assert final.competitor_b_id is None
+
+
+def test_404_for_missing_tournament_during_register_match_results(client):
+    response = client.post(
+        REGISTER_MATCH_RESULTS_URL_TEMPLATE.format(
+            tournament_uuid="00000000-0000-0000-0000-000000000000"
+        ),
+        json={
+            "results": [
+                {
+                    "match_uuid": "00000000-0000-0000-0000-000000000000",
+                    "winner_uuid": "00000000-0000-0000-0000-000000000000",
+                },
+            ],
+        },
+    )
+
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Target Tournament does not exist"}
+
+
+def test_422_for_unstarted_tournament_during_register_match_results(client, tournament):
+    response = client.post(
+        REGISTER_MATCH_RESULTS_URL_TEMPLATE.format(tournament_uuid=tournament.uuid),
+        json={
+            "results": [
+                {
+                    "match_uuid": "00000000-0000-0000-0000-000000000000",
+                    "winner_uuid": "00000000-0000-0000-0000-000000000000",
+                },
+            ],
+        },
+    )
+
+    assert response.status_code == 422
+    assert response.json() == {
+        "detail": "Target Tournament has not created its matches yet",
+    }
+
+
+def test_422_for_empty_results_during_register_match_results(client, tournament):
+    response = client.post(
+        REGISTER_MATCH_RESULTS_URL_TEMPLATE.format(tournament_uuid=tournament.uuid),
+        json={"results": []},
+    )
+
+    assert response.status_code == 422
+
+
+def test_register_match_results_issues_a_constant_number_of_queries(
+    session, client, tournament1, tournament2
+):
+    for tournament_, number_of_competitors in [(tournament1, 4), (tournament2, 16)]:
+        for _ in range(number_of_competitors):
+            tournament_.competitors.append(CompetitorFactory())
+        session.add(tournament_)
+    session.commit()
+
+    counts = []
+    for tournament_uuid in [tournament1.uuid, tournament2.uuid]:
+        tournament_, matches = start_tournament_util(
+            tournament_uuid=tournament_uuid,
+            session=session,
+        )
+        entry_matches = [
+            match_ for match_ in matches if match_.round == tournament_.starting_round
+        ]
+        payload = {
+            "results": [
+                {
+                    "match_uuid": str(match_.uuid),
+                    "winner_uuid": str(match_.competitor_a.uuid),
+                }
+                for match_ in entry_matches
+            ],
+        }
+
+        session.expunge_all()
+        with count_queries(session) as statements:
+            response = client.post(
+                REGISTER_MATCH_RESULTS_URL_TEMPLATE.format(
+                    tournament_uuid=tournament_uuid
+                ),
+                json=payload,
+            )
+        assert response.status_code == 200
+        assert all(result["statusCode"] == 200 for result in response.json()["results"])
+        counts.append(len(statements))
+
+    # tournament, matches, competitors, match and association updates,
+    # tournament and competitor version bumps and the tournament reload after the commit
+    assert counts == [8, 8]
+
+
+def test_cached_tournament_responses_are_invalidated_by_match_results(
+    session,
+    client,
+    tournament,
+    competitor1,
+    competitor2,
+):
+    for competitor_ in [competitor1, competitor2]:
+        tournament.competitors.append(competitor_)
+    session.add(tournament)
+    session.commit()
+    tournament, (final,) = start_tournament_util(
+        tournament_uuid=tournament.uuid,
+        session=session,
+    )
+    tournament_uuid = tournament.uuid
+    final_uuid = final.uuid
+    winner_uuid = final.competitor_a.uuid
+
+    response = client.get(
+        LIST_TOURNAMENT_MATCHES_URL_TEMPLATE.format(tournament_uuid=tournament_uuid)
+    )
+    assert response.status_code == 200
+    assert len(response.json()["upcoming"]) == 1
+
+    # Hot reads only look up the Tournament and its version
+    session.expunge_all()
+    with count_queries(session) as statements:
+        cached_response = client.get(
+            LIST_TOURNAMENT_MATCHES_URL_TEMPLATE.format(tournament_uuid=tournament_uuid)
+        )
+    assert cached_response.json() == response.json()
+    assert cached_response.headers["ETag"] == response.headers["ETag"]
+    assert len(statements) == 1
+
+    response = client.post(
+        REGISTER_MATCH_RESULT_URL_TEMPLATE.format(match_uuid=final_uuid),
+        json={"winner_uuid": str(winner_uuid)},
+    )
+    assert response.status_code == 200
+
+    response = client.get(
+        LIST_TOURNAMENT_MATCHES_URL_TEMPLATE.format(tournament_uuid=tournament_uuid)
+    )
+    assert response.status_code == 200
+    assert len(response.json()["past"]) == 1
+    assert response.json()["upcoming"] == []
+
+    assert response.headers["ETag"] != cached_response.headers["ETag"]
+
+
+def test_stale_cached_tournament_responses_are_not_served(
+    session,
+    client,
+    tournament,
+    competitor1,
+    competitor2,
+):
+    for competitor_ in [competitor1, competitor2]:
+        tournament.competitors.append(competitor_)
+    session.add(tournament)
+    session.commit()
+    tournament, (final,) = start_tournament_util(
+        tournament_uuid=tournament.uuid,
+        session=session,
+    )
+    tournament_uuid = tournament.uuid
+    stale_version = tournament.version
+    url = LIST_TOURNAMENT_MATCHES_URL_TEMPLATE.format(tournament_uuid=tournament_uuid)
+
+    register_match_result_util(
+        match_uuid=final.uuid,
+        winner_uuid=final.competitor_a.uuid,
+        session=session,
+    )
+    # A reader which queried before the result commit stores its content afterwards
+    response_cache.set(
+        tournament_uuid=tournament_uuid,
+        name="match",
+        version=stale_version,
+        content={"stale": True},
+    )
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert len(response.json()["past"]) == 1
+    assert response.headers["ETag"] != entity_tag(tournament_uuid, stale_version)
+
+
+def test_304_for_tournament_routes_with_matching_entity_tag(
+    session,
+    client,
+    tournament,
+    competitor1,
+    competitor2,
+):
+    competitors_url = LIST_COMPETITORS_IN_TOURNAMENT_URL_TEMPLATE.format(
+        tournament_uuid=tournament.uuid
+    )
+    response = client.get(competitors_url)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    client.post(
+        REGISTER_COMPETITOR_IN_TOURNAMENT_URL_TEMPLATE.format(
+            tournament_uuid=tournament.uuid
+        ),
+        json={"competitor_uuid": str(competitor1.uuid)},
+    )
+    client.post(
+        REGISTER_COMPETITOR_IN_TOURNAMENT_URL_TEMPLATE.format(
+            tournament_uuid=tournament.uuid
+        ),
+        json={"competitor_uuid": str(competitor2.uuid)},
+    )
+
+    response = client.get(competitors_url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()["competitors"]) == 2
+    assert response.headers["ETag"] != etag
+
+    tournament, (final,) = start_tournament_util(
+        tournament_uuid=tournament.uuid,
+        session=session,
+    )
+    tournament_uuid = tournament.uuid
+    # Along with the number of lookups validating each request before answering 304
+    urls_and_lookups = [
+        (
+            LIST_TOURNAMENT_MATCHES_URL_TEMPLATE.format(
+                tournament_uuid=tournament_uuid
+            ),
+            1,
+        ),
+        # Tournament, Competitor and their registration
+        (
+            LIST_MATCHES_FOR_COMPETITOR_IN_TOURNAMENT_URL_TEMPLATE.format(
+                tournament_uuid=tournament_uuid,
+                competitor_uuid=competitor1.uuid,
+            ),
+            3,
+        ),
+    ]
+    register_match_result_util(
+        match_uuid=final.uuid,
+        winner_uuid=final.competitor_a.uuid,
+        session=session,
+    )
+    urls_and_lookups.append(
+        (GET_TOURNAMENT_TOP4_URL_TEMPLATE.format(tournament_uuid=tournament_uuid), 1)
+    )
+
+    for url, lookups in urls_and_lookups:
+        response = client.get(url)
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+
+        # Without cached responses, only the validations are looked up
+        response_cache.clear()
+        session.expunge_all()
+        with count_queries(session) as statements:
+            response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+        assert len(statements) == lookups
+
+        # A stale entity tag costs no query on top of the usual response
+        statement_counts = []
+        for headers in [{}, {"If-None-Match": '"stale"'}]:
+            response_cache.clear()
+            session.expunge_all()
+            with count_queries(session) as statements:
+                response = client.get(url, headers=headers)
+            assert response.status_code == 200
+            assert response.headers["ETag"] == etag
+            statement_counts.append(len(statements))
+        assert statement_counts[0] == statement_counts[1]
+
+    # Streamed rows are read after the headers, so they can't be tagged
+    streamed_response = client.get(urls_and_lookups[0][0], params={"stream": True})
+    assert streamed_response.status_code == 200
+    assert "ETag" not in streamed_response.headers
+
+
+def test_no_304_for_invalid_tournament_route_requests(
+    session,
+    client,
+    tournament,
+    competitor1,
+    competitor2,
+    competitor3,
+):
+    headers = {"If-None-Match": "*"}
+    tournament.competitors.append(competitor1)
+    session.add(tournament)
+    session.commit()
+
+    # Unstarted Tournament
+    for url in [
+        LIST_TOURNAMENT_MATCHES_URL_TEMPLATE.format(tournament_uuid=tournament.uuid),
+        GET_TOURNAMENT_TOP4_URL_TEMPLATE.format(tournament_uuid=tournament.uuid),
+        LIST_MATCHES_FOR_COMPETITOR_IN_TOURNAMENT_URL_TEMPLATE.format(
+            tournament_uuid=tournament.uuid,
+            competitor_uuid=competitor1.uuid,
+        ),
+    ]:
+        response = client.get(url, headers=headers)
+        assert response.status_code == 422
+        assert response.json() == {
+            "detail": "Target Tournament has not created its matches yet"
+        }
+
+    tournament.competitors.append(competitor2)
+    session.add(tournament)
+    session.commit()
+    start_tournament_util(tournament_uuid=tournament.uuid, session=session)
+
+    response = client.get(
+        LIST_MATCHES_FOR_COMPETITOR_IN_TOURNAMENT_URL_TEMPLATE.format(
+            tournament_uuid=tournament.uuid,
+            competitor_uuid="01234567-89ab-cdef-0123-456789abcdef",
+        ),
+        headers=headers,
+    )
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Target Competitor does not exist"}
+
+    response = client.get(
+        LIST_MATCHES_FOR_COMPETITOR_IN_TOURNAMENT_URL_TEMPLATE.format(
+            tournament_uuid=tournament.uuid,
+            competitor_uuid=competitor3.uuid,
+        ),
+        headers=headers,
+    )
+    assert response.status_code == 409
+
+    # No standings until the final and the third place match are decided
+    response = client.get(
+        GET_TOURNAMENT_TOP4_URL_TEMPLATE.format(tournament_uuid=tournament.uuid),
+        headers=headers,
+    )
+    assert response.status_code == 422
+
+
+def test_404_for_missing_tournament_during_watch_tournament_events(client):
+    response = client.get(
+        BASE_URL
+        + "/{tournament_uuid}/events".format(
+            tournament_uuid="01234567-89ab-cdef-0123-456789abcdef"
+        )
+    )
+
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Target Tournament does not exist"}
+
+
+def test_fast_json_responses_are_byte_compatible(
+    monkeypatch,
+    session,
+    client,
+    tournament,
+    competitor1,
+    competitor2,
+    competitor3,
+    competitor4,
+    competitor5,
+):
+    for competitor_ in [competitor1, competitor2, competitor3, competitor4]:
+        tournament.competitors.append(competitor_)
+    session.add(tournament)
+    session.commit()
+
+    monkeypatch.setattr(
+        "matamata.routers.tournament.settings.FAST_JSON_RESPONSES", True
+    )
+    response = client.post(
+        START_TOURNAMENT_URL_TEMPLATE.format(tournament_uuid=tournament.uuid)
+    )
+    assert response.status_code == 201
+    start_content = response.json()
+
+    # Bracket seats are random, so the fast start is checked against the listings
+    monkeypatch.setattr(
+        "matamata.routers.tournament.settings.FAST_JSON_RESPONSES", False
+    )
+    matches_content = client.get(
+        LIST_TOURNAMENT_MATCHES_URL_TEMPLATE.format(tournament_uuid=tournament.uuid)
+    ).json()
+    competitors_content = client.get(
+        LIST_COMPETITORS_IN_TOURNAMENT_URL_TEMPLATE.format(
+            tournament_uuid=tournament.uuid
+        )
+    ).json()
+    assert start_content["tournament"] == matches_content["tournament"]
+    assert sorted(
+        start_content["competitors"], key=lambda item: item["uuid"]
+    ) == sorted(competitors_content["competitors"], key=lambda item: item["uuid"])
+    assert start_content["matches"] == sorted(
+        matches_content["past"] + matches_content["upcoming"],
+        key=lambda item: (-item["round"], item["position"]),
+    )
+
+    match_uuid = UUID(start_content["matches"][0]["uuid"])
+    winner_uuid = UUID(start_content["matches"][0]["competitorA"]["uuid"])
+    register_match_result_util(
+        match_uuid=match_uuid,
+        winner_uuid=winner_uuid,
+        session=session,
+    )
+
+    urls = [
+        LIST_COMPETITORS_IN_TOURNAMENT_URL_TEMPLATE.format(
+            tournament_uuid=tournament.uuid
+        ),
+        LIST_MATCHES_FOR_COMPETITOR_IN_TOURNAMENT_URL_TEMPLATE.format(
+            tournament_uuid=tournament.uuid,
+            competitor_uuid=winner_uuid,
+        ),
+        LIST_TOURNAMENT_MATCHES_URL_TEMPLATE.format(tournament_uuid=tournament.uuid),
+    ]
+    for url in urls:
+        response_cache.clear()
+        monkeypatch.setattr(
+            "matamata.routers.tournament.settings.FAST_JSON_RESPONSES", True
+        )
+        fast_response = client.get(url)
+
+        response_cache.clear()
+        monkeypatch.setattr(
+            "matamata.routers.tournament.settings.FAST_JSON_RESPONSES", False
+        )
+        response = client.get(url)
+
+        assert fast_response.status_code == response.status_code == 200
+        assert fast_response.headers["ETag"] == response.headers["ETag"]
+        assert fast_response.content == response.content
+
+
+def test_read_endpoints_do_not_load_match_nor_competitor_instances(
+    session, client, tournament, competitor1, competitor2, competitor3
+):
+    for competitor_ in [competitor1, competitor2, competitor3]:
+        tournament.competitors.append(competitor_)
+    session.add(tournament)
+    session.commit()
+
+    tournament, matches = start_tournament_util(
+        tournament_uuid=tournament.uuid,
+        session=session,
+    )
+    semifinal, _, final, _ = matches
+    register_match_result_util(
+        match_uuid=semifinal.uuid,
+        winner_uuid=semifinal.competitor_a.uuid,
+        session=session,
+    )
+    session.refresh(final)
+    register_match_result_util(
+        match_uuid=final.uuid,
+        winner_uuid=final.competitor_a.uuid,
+        session=session,
+    )
+
+    for url in [
+        LIST_COMPETITORS_IN_TOURNAMENT_URL_TEMPLATE.format(
+            tournament_uuid=tournament.uuid
+        ),
+        LIST_TOURNAMENT_MATCHES_URL_TEMPLATE.format(tournament_uuid=tournament.uuid),
+        GET_TOURNAMENT_TOP4_URL_TEMPLATE.format(tournament_uuid=tournament.uuid),
+        REGISTER_MATCH_RESULT_URL_TEMPLATE.format(match_uuid=final.uuid),
+        BASE_URL,
+    ]:
+        response_cache.clear()
+        session.expunge_all()
+
+        response = client.get(url)
+
+        assert response.status_code == 200
+        # Only the requested Tournament might be loaded as an entity
+        assert not [
+            instance
+            for instance in session.identity_map.values()
+            if not isinstance(instance, Tournament)
+        ]
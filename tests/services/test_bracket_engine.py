@@ -0,0 +1,311 @@
+import pytest
+
+from matamata.services.bracket_engine import (
+    BracketEngine,
+    calculate_match_index,
+    standard_seeding_order,
+)
+from matamata.services.exceptions import (
+    MatchAlreadyRegisteredResult,
+    MatchMissingCompetitorFromPreviousMatch,
+    MatchShouldHaveAutomaticWinner,
+    MatchTargetCompetitorIsNotMatchCompetitor,
+)
+
+
+@pytest.mark.parametrize(
+    "number_competitors, starting_round, size, third_place_index",
+    [
+        (1, 0, 1, None),
+        (2, 0, 1, None),
+        (3, 1, 4, 3),
+        (4, 1, 4, 3),
+        (5, 2, 8, 7),
+        (8, 2, 8, 7),
+        (9, 3, 16, 15),
+        (2**16, 15, 2**16, 2**16 - 1),
+    ],
+)
+def test_bracket_layout(number_competitors, starting_round, size, third_place_index):
+    bracket = BracketEngine(number_competitors=number_competitors)
+
+    assert bracket.starting_round == starting_round
+    assert bracket.size == size
+    assert bracket.third_place_index == third_place_index
+    assert bracket.round_position(bracket.final_index) == (0, 0)
+
+
+@pytest.mark.parametrize("number_competitors", [1, 2, 3, 4, 5, 8, 9, 33])
+def test_bracket_index_and_round_position_are_inverse(number_competitors):
+    bracket = BracketEngine(number_competitors=number_competitors)
+
+    round_positions = [bracket.round_position(index) for index in range(bracket.size)]
+
+    # Entry matches come first and the final and third place matches last
+    assert round_positions == sorted(
+        round_positions, key=lambda item: (-item[0], item[1])
+    )
+    assert len(set(round_positions)) == bracket.size
+    for index, (round_, position) in enumerate(round_positions):
+        assert bracket.index(round_, position) == index
+
+
+@pytest.mark.parametrize("number_competitors", [3, 4, 5, 8, 9, 33])
+def test_bracket_next_and_feeder_matches(number_competitors):
+    bracket = BracketEngine(number_competitors=number_competitors)
+
+    for index in range(bracket.size):
+        feeder_indices = bracket.feeder_indices(index)
+        round_, _ = bracket.round_position(index)
+        if round_ == bracket.starting_round:
+            assert feeder_indices is None
+        elif index == bracket.third_place_index:
+            assert [
+                bracket.loser_next_match_index(feeder_index)
+                for feeder_index in feeder_indices
+            ] == [index, index]
+        else:
+            assert [
+                bracket.next_match_index(feeder_index)
+                for feeder_index in feeder_indices
+            ] == [index, index]
+
+    assert bracket.next_match_index(bracket.final_index) is None
+    assert bracket.next_match_index(bracket.third_place_index) is None
+
+
+@pytest.mark.parametrize("starting_round", [0, 1, 2, 5])
+def test_calculate_match_index_matches_round_by_round_count(starting_round):
+    index = 0
+    for match_round in range(starting_round, -1, -1):
+        for match_position in range(2**match_round):
+            assert (
+                calculate_match_index(
+                    starting_round=starting_round,
+                    match_round=match_round,
+                    match_position=match_position,
+                )
+                == index
+            )
+            index += 1
+
+    with pytest.raises(ValueError):
+        calculate_match_index(
+            starting_round=starting_round,
+            match_round=starting_round + 1,
+            match_position=0,
+        )
+    with pytest.raises(ValueError):
+        calculate_match_index(
+            starting_round=starting_round,
+            match_round=0,
+            match_position=1,
+        )
+
+
+@pytest.mark.parametrize("number_competitors", [1, 2, 3, 4, 5, 8, 9, 33])
+def test_bracket_layout_arrays_agree_with_topology(number_competitors):
+    bracket = BracketEngine(number_competitors=number_competitors)
+    layout = bracket.layout
+
+    assert len(layout.rounds) == bracket.size
+    for index in range(bracket.size):
+        assert (layout.rounds[index], layout.positions[index]) == (
+            bracket.round_position(index)
+        )
+
+        next_match_index = bracket.next_match_index(index)
+        assert layout.next_indices[index] == (
+            -1 if next_match_index is None else next_match_index
+        )
+
+        feeder_indices = bracket.feeder_indices(index)
+        if feeder_indices is None:
+            assert layout.first_feeder_indices[index] == -1
+        else:
+            first_feeder_index = layout.first_feeder_indices[index]
+            assert feeder_indices == (first_feeder_index, first_feeder_index + 1)
+
+
+def test_seat_entry_competitors_with_automatic_winnings():
+    bracket = BracketEngine(number_competitors=5)
+
+    bracket.seat_entry_competitors([10, 20, 30, 40, 50])
+
+    assert [
+        (
+            bracket.columns["competitor_a_id"][index],
+            bracket.columns["competitor_b_id"][index],
+            bracket.columns["winner_id"][index],
+        )
+        for index in range(bracket.size)
+    ] == [
+        (10, 50, None),
+        (20, None, 20),
+        (30, None, 30),
+        (40, None, 40),
+        (None, 20, None),
+        (30, 40, None),
+        (None, None, None),
+        (None, None, None),
+    ]
+    assert bracket.next_match_indices == {10: 0, 50: 0, 20: 4, 30: 5, 40: 5}
+
+
+@pytest.mark.parametrize(
+    "number_of_slots, expected_order",
+    [
+        (1, [0]),
+        (2, [0, 1]),
+        (4, [0, 3, 1, 2]),
+        (8, [0, 7, 3, 4, 1, 6, 2, 5]),
+    ],
+)
+def test_standard_seeding_order(number_of_slots, expected_order):
+    assert list(standard_seeding_order(number_of_slots)) == expected_order
+
+
+@pytest.mark.parametrize("number_of_slots", [0, 3, 6])
+def test_standard_seeding_order_for_invalid_number_of_slots(number_of_slots):
+    with pytest.raises(ValueError, match="number of slots must be a power of 2"):
+        standard_seeding_order(number_of_slots)
+
+
+def test_standard_seeding_order_keeps_top_seeds_apart():
+    order = standard_seeding_order(2**10)
+
+    assert sorted(order) == list(range(2**10))
+    # Each block of 2 ** k slots feeds a single match of a later round,
+    # so it must hold exactly one of the top len(order) / 2 ** k seeds
+    for block_size in [2**k for k in range(1, 11)]:
+        number_of_blocks = len(order) // block_size
+        for start in range(0, len(order), block_size):
+            block = order[start : start + block_size]
+            assert sum(seed < number_of_blocks for seed in block) == 1
+
+
+def test_seat_seeded_entry_competitors_with_automatic_winnings():
+    bracket = BracketEngine(number_competitors=5)
+
+    # Seeds from the top one
+    bracket.seat_entry_competitors([10, 20, 30, 40, 50], seeded=True)
+
+    assert [
+        (
+            bracket.columns["competitor_a_id"][index],
+            bracket.columns["competitor_b_id"][index],
+            bracket.columns["winner_id"][index],
+        )
+        for index in range(bracket.size)
+    ] == [
+        (10, None, 10),
+        (40, 50, None),
+        (20, None, 20),
+        (30, None, 30),
+        (10, None, None),
+        (20, 30, None),
+        (None, None, None),
+        (None, None, None),
+    ]
+    assert bracket.next_match_indices == {10: 4, 40: 1, 50: 1, 20: 5, 30: 5}
+
+
+def test_seat_single_competitor():
+    bracket = BracketEngine(number_competitors=1)
+
+    bracket.seat_entry_competitors([10])
+
+    assert bracket.columns["winner_id"] == [10]
+    assert bracket.next_match_indices == {10: None}
+
+
+def test_register_result_routes_semifinal_losers_to_third_place_match():
+    bracket = BracketEngine(number_competitors=4)
+    bracket.seat_entry_competitors([10, 20, 30, 40])
+    bracket.changed_indices.clear()
+    bracket.next_match_indices.clear()
+
+    assert bracket.register_result(0, winner_id=30) == 10
+    assert bracket.register_result(1, winner_id=20) == 40
+
+    assert bracket.match_values(2)["competitor_a_id"] == 30
+    assert bracket.match_values(2)["competitor_b_id"] == 20
+    assert bracket.match_values(3)["competitor_a_id"] == 10
+    assert bracket.match_values(3)["competitor_b_id"] == 40
+    assert bracket.match_values(3)["result_registration"] is None
+    assert list(bracket.changed_indices) == [0, 2, 3, 1]
+    assert bracket.next_match_indices == {10: 3, 30: 2, 40: 3, 20: 2}
+
+    bracket.register_result(3, winner_id=40)
+    bracket.register_result(2, winner_id=20)
+
+    assert bracket.next_match_indices == {10: None, 30: None, 40: None, 20: None}
+
+
+def test_register_result_for_three_competitors_gives_third_place_to_loser():
+    bracket = BracketEngine(number_competitors=3)
+    bracket.seat_entry_competitors([10, 20, 30])
+
+    bracket.register_result(0, winner_id=10)
+
+    third_place = bracket.match_values(bracket.third_place_index)
+    assert third_place["competitor_a_id"] == 30
+    assert third_place["winner_id"] == 30
+    assert third_place["result_registration"] is not None
+    assert bracket.next_match_indices[30] is None
+    assert bracket.next_match_indices[10] == bracket.final_index
+
+
+def test_register_result_errors():
+    bracket = BracketEngine(number_competitors=5)
+    bracket.seat_entry_competitors([10, 20, 30, 40, 50])
+
+    with pytest.raises(MatchAlreadyRegisteredResult):
+        bracket.register_result(1, winner_id=20)
+    with pytest.raises(MatchMissingCompetitorFromPreviousMatch):
+        bracket.register_result(4, winner_id=20)
+    with pytest.raises(MatchTargetCompetitorIsNotMatchCompetitor):
+        bracket.register_result(0, winner_id=20)
+
+    bracket.columns["winner_id"][1] = None
+    bracket.columns["result_registration"][1] = None
+    with pytest.raises(MatchShouldHaveAutomaticWinner):
+        bracket.register_result(1, winner_id=20)
+
+
+def test_standings_values_of_decided_round_0_matches():
+    bracket = BracketEngine(number_competitors=4)
+    bracket.seat_entry_competitors([10, 20, 30, 40])
+    bracket.register_result(0, winner_id=10)
+    bracket.register_result(1, winner_id=20)
+
+    assert bracket.standings_values(bracket.changed_indices) == {}
+
+    bracket.register_result(bracket.third_place_index, winner_id=40)
+    assert bracket.standings_values(bracket.changed_indices) == {
+        "third_place_id": 40,
+        "fourth_place_id": 30,
+    }
+
+    bracket.register_result(bracket.final_index, winner_id=20)
+    assert bracket.standings_values([bracket.final_index]) == {
+        "first_place_id": 20,
+        "second_place_id": 10,
+    }
+
+
+def test_standings_values_for_one_and_three_competitors():
+    bracket = BracketEngine(number_competitors=1)
+    bracket.seat_entry_competitors([10])
+    assert bracket.standings_values(bracket.changed_indices) == {
+        "first_place_id": 10,
+        "second_place_id": None,
+    }
+
+    bracket = BracketEngine(number_competitors=3)
+    bracket.seat_entry_competitors([10, 20, 30])
+    bracket.register_result(0, winner_id=10)
+    assert bracket.standings_values(bracket.changed_indices) == {
+        "third_place_id": 30,
+        "fourth_place_id": None,
+    }
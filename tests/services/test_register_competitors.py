@@ -0,0 +1,86 @@
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import select
+
+from matamata.models import Competitor, Tournament, TournamentCompetitor
+from matamata.services import register_competitors_in_tournament
+
+
+@pytest.mark.parametrize("postgresql_statements", [True, False])
+def test_register_competitors_in_tournament(
+    monkeypatch,
+    session,
+    tournament,
+    competitor1,
+    competitor2,
+    competitor3,
+    postgresql_statements,
+):
+    if not postgresql_statements:
+        # The fallback statements also run on PostgreSQL
+        monkeypatch.setattr(
+            "matamata.services.register_competitors.is_postgresql",
+            lambda session: False,
+        )
+    tournament.competitors.append(competitor1)
+    session.add(tournament)
+    session.commit()
+    missing_uuid = uuid4()
+
+    registration = register_competitors_in_tournament(
+        tournament=tournament,
+        competitor_uuids=[
+            competitor3.uuid,
+            missing_uuid,
+            competitor1.uuid,
+            competitor2.uuid,
+            competitor3.uuid,
+        ],
+        session=session,
+    )
+
+    assert registration.registered == [
+        (competitor3.uuid, competitor3.label),
+        (competitor2.uuid, competitor2.label),
+    ]
+    assert registration.already_registered == [competitor1.uuid]
+    assert registration.missing == [missing_uuid]
+
+    assert set(
+        session.scalars(
+            select(TournamentCompetitor.competitor_id).where(
+                TournamentCompetitor.tournament_id == tournament.id
+            )
+        )
+    ) == {competitor1.id, competitor2.id, competitor3.id}
+    versions = dict(
+        session.execute(
+            select(Competitor.id, Competitor.version).where(
+                Competitor.id.in_([competitor1.id, competitor2.id, competitor3.id])
+            )
+        ).all()
+    )
+    assert versions == {competitor1.id: 0, competitor2.id: 1, competitor3.id: 1}
+
+
+def test_register_competitors_in_tournament_without_new_registrations(
+    session, tournament, competitor
+):
+    tournament.competitors.append(competitor)
+    session.add(tournament)
+    session.commit()
+
+    registration = register_competitors_in_tournament(
+        tournament=tournament,
+        competitor_uuids=[competitor.uuid],
+        session=session,
+    )
+
+    assert registration.registered == []
+    assert registration.already_registered == [competitor.uuid]
+    # Nothing changed, so the Tournament version is kept
+    assert (
+        session.scalar(select(Tournament.version).where(Tournament.id == tournament.id))
+        == 0
+    )
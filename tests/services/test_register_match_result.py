@@ -1,22 +1,38 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
 
-from matamata.models import Match
-from matamata.services import register_match_result
+from matamata.models import Competitor, Match, Tournament, TournamentCompetitor
+from matamata.services import register_match_result, register_match_results
 from matamata.services.exceptions import (
     MatchAlreadyRegisteredResult,
     MatchMissingCompetitorFromPreviousMatch,
     MatchShouldHaveAutomaticWinner,
     MatchTargetCompetitorIsNotMatchCompetitor,
 )
+from matamata.settings import settings
 from tests.utils import (
+    count_queries,
     retrieve_match_with_tournament_and_competitors,
     retrieve_tournament_competitor,
     start_tournament_util,
 )
 
 
+@pytest.fixture(autouse=True, params=["statements", "cte"])
+def match_result_strategy(request, monkeypatch):
+    monkeypatch.setattr(
+        settings,
+        "MATCH_RESULT_STRATEGY",
+        request.param,
+    )
+    return request.param
+
+
 def test_register_match_result_for_final_match(
     session,
     client,
@@ -466,3 +482,281 @@ def test_competitor_not_match_competitor_during_register_match_result(
             winner_uuid=competitor3.uuid,
             session=session,
         )
+
+
+def test_cte_strategy_registers_match_result_with_a_single_statement(
+    session,
+    tournament,
+    competitor1,
+    competitor2,
+    competitor3,
+    competitor4,
+    match_result_strategy,
+):
+    if match_result_strategy != "cte":
+        pytest.skip("Only the cte strategy is a single statement")
+
+    for competitor_ in [competitor1, competitor2, competitor3, competitor4]:
+        tournament.competitors.append(competitor_)
+    session.add(tournament)
+    session.commit()
+
+    tournament, matches = start_tournament_util(
+        tournament_uuid=tournament.uuid,
+        session=session,
+    )
+    semifinal = matches[0]
+    match = retrieve_match_with_tournament_and_competitors(
+        match_uuid=semifinal.uuid,
+        session=session,
+    )
+    winner_uuid = match.competitor_a.uuid
+
+    with count_queries(session) as statements:
+        match = register_match_result(
+            match_with_tournament_and_competitors=match,
+            winner_uuid=winner_uuid,
+            session=session,
+        )
+        # Populated from the statement itself, so no refresh is issued
+        assert match.winner_id == match.competitor_a_id
+        assert match.loser_id == match.competitor_b_id
+        assert match.result_registration is not None
+
+    assert len(statements) == 1
+    assert statements[0].lstrip().startswith("WITH")
+
+    session.expire_all()
+    final, third_place = session.scalars(
+        select(Match)
+        .where(Match.tournament_id == tournament.id, Match.round == 0)
+        .order_by(Match.position)
+    ).all()
+    assert final.competitor_a_id == match.winner_id
+    assert third_place.competitor_a_id == match.loser_id
+    assert (
+        retrieve_tournament_competitor(
+            tournament_id=tournament.id,
+            competitor_id=match.winner_id,
+            session=session,
+        ).next_match_id
+        == final.id
+    )
+    assert (
+        retrieve_tournament_competitor(
+            tournament_id=tournament.id,
+            competitor_id=match.loser_id,
+            session=session,
+        ).next_match_id
+        == third_place.id
+    )
+    assert tournament.version == 2
+
+
+def start_tournament_of_8_competitors(*, session, tournament) -> dict:
+    for index in range(8):
+        tournament.competitors.append(Competitor(label=f"Competitor {index}"))
+    session.add(tournament)
+    session.commit()
+
+    tournament, matches = start_tournament_util(
+        tournament_uuid=tournament.uuid,
+        session=session,
+    )
+    session.refresh(tournament)
+    started = {
+        "tournament_version": tournament.version,
+        "competitor_versions": {
+            competitor.id: competitor.version for competitor in tournament.competitors
+        },
+        "entry_matches": [
+            (match.uuid, match.competitor_a.uuid, match.competitor_b.uuid)
+            for match in matches
+            if match.round == tournament.starting_round
+        ],
+    }
+    session.commit()
+
+    return started
+
+
+def assert_entry_matches_propagated_once(*, session, tournament, started: dict):
+    # Each Competitor played a single entry Match, decided once
+    session.expire_all()
+    for competitor in tournament.competitors:
+        assert competitor.version == started["competitor_versions"][competitor.id] + 1
+
+    map_id_to_match = {
+        match.id: match
+        for match in session.scalars(
+            select(Match).where(Match.tournament_id == tournament.id)
+        )
+    }
+    map_competitor_id_to_next_match_id = dict(
+        session.execute(
+            select(
+                TournamentCompetitor.competitor_id,
+                TournamentCompetitor.next_match_id,
+            ).where(TournamentCompetitor.tournament_id == tournament.id)
+        ).all()
+    )
+    for match in map_id_to_match.values():
+        if match.round != tournament.starting_round:
+            continue
+        assert match.winner_id in (match.competitor_a_id, match.competitor_b_id)
+        assert match.loser_id in (match.competitor_a_id, match.competitor_b_id)
+        assert map_competitor_id_to_next_match_id[match.loser_id] is None
+
+        next_match = map_id_to_match[
+            map_competitor_id_to_next_match_id[match.winner_id]
+        ]
+        assert next_match.round == match.round - 1
+        assert next_match.position == match.position // 2
+        assert (
+            next_match.competitor_a_id
+            if match.position % 2 == 0
+            else next_match.competitor_b_id
+        ) == match.winner_id
+
+
+def test_concurrent_registrations_of_the_same_matches(
+    session,
+    tournament,
+):
+    number_of_threads = 8
+    started = start_tournament_of_8_competitors(session=session, tournament=tournament)
+
+    ThreadSession = sessionmaker(bind=session.get_bind())
+    barrier = threading.Barrier(number_of_threads)
+
+    def register_entry_matches(thread_number: int) -> list[bool]:
+        registrations = []
+        with ThreadSession() as thread_session:
+            for match_uuid, *competitor_uuids in started["entry_matches"]:
+                # Every thread loads the undecided Match before any of them writes
+                match = retrieve_match_with_tournament_and_competitors(
+                    match_uuid=match_uuid,
+                    session=thread_session,
+                )
+                thread_session.commit()
+                barrier.wait()
+                try:
+                    register_match_result(
+                        match_with_tournament_and_competitors=match,
+                        winner_uuid=competitor_uuids[thread_number % 2],
+                        session=thread_session,
+                    )
+                except MatchAlreadyRegisteredResult:
+                    registrations.append(False)
+                else:
+                    registrations.append(True)
+        return registrations
+
+    with ThreadPoolExecutor(max_workers=number_of_threads) as executor:
+        registrations_per_thread = list(
+            executor.map(register_entry_matches, range(number_of_threads))
+        )
+
+    # A single registration of each Match got through
+    for registrations in zip(*registrations_per_thread):
+        assert sum(registrations) == 1
+
+    # and it was propagated exactly once
+    session.expire_all()
+    assert tournament.version == started["tournament_version"] + len(
+        started["entry_matches"]
+    )
+    assert_entry_matches_propagated_once(
+        session=session, tournament=tournament, started=started
+    )
+
+
+def test_concurrent_batch_and_single_registrations_of_the_same_matches(
+    session,
+    tournament,
+):
+    number_of_single_threads = 4
+    started = start_tournament_of_8_competitors(session=session, tournament=tournament)
+    tournament_uuid = tournament.uuid
+
+    ThreadSession = sessionmaker(bind=session.get_bind())
+    barrier = threading.Barrier(number_of_single_threads + 1)
+
+    def register_batch() -> list[bool]:
+        with ThreadSession() as thread_session:
+            thread_tournament = thread_session.scalar(
+                select(Tournament).where(Tournament.uuid == tournament_uuid)
+            )
+            barrier.wait()
+            # The batch always elects the first side of each Match
+            outcomes = register_match_results(
+                tournament=thread_tournament,
+                results=[
+                    (match_uuid, competitor_a_uuid)
+                    for match_uuid, competitor_a_uuid, _ in started["entry_matches"]
+                ],
+                session=thread_session,
+            )
+        for outcome in outcomes:
+            assert outcome.error is None or isinstance(
+                outcome.error, MatchAlreadyRegisteredResult
+            )
+        return [outcome.error is None for outcome in outcomes]
+
+    def register_singles(_) -> list[bool]:
+        registrations = []
+        with ThreadSession() as thread_session:
+            barrier.wait()
+            # while single registrations elect the second one
+            for match_uuid, _, competitor_b_uuid in started["entry_matches"]:
+                try:
+                    register_match_result(
+                        match_with_tournament_and_competitors=retrieve_match_with_tournament_and_competitors(
+                            match_uuid=match_uuid,
+                            session=thread_session,
+                        ),
+                        winner_uuid=competitor_b_uuid,
+                        session=thread_session,
+                    )
+                except MatchAlreadyRegisteredResult:
+                    registrations.append(False)
+                else:
+                    registrations.append(True)
+                thread_session.rollback()
+        return registrations
+
+    with ThreadPoolExecutor(max_workers=number_of_single_threads + 1) as executor:
+        batch_future = executor.submit(register_batch)
+        singles_futures = [
+            executor.submit(register_singles, thread_number)
+            for thread_number in range(number_of_single_threads)
+        ]
+        batch_registrations = batch_future.result()
+        singles_registrations = [future.result() for future in singles_futures]
+
+    # A single registration of each Match got through, either from the batch or not
+    map_match_uuid_to_winner_uuid = {}
+    for (
+        (match_uuid, competitor_a_uuid, competitor_b_uuid),
+        registered_by_batch,
+        *registered_by_singles,
+    ) in zip(started["entry_matches"], batch_registrations, *singles_registrations):
+        assert registered_by_batch + sum(registered_by_singles) == 1
+        map_match_uuid_to_winner_uuid[match_uuid] = (
+            competitor_a_uuid if registered_by_batch else competitor_b_uuid
+        )
+
+    session.expire_all()
+    assert tournament.version == started["tournament_version"] + sum(
+        [any(batch_registrations)]
+        + [sum(registrations) for registrations in singles_registrations]
+    )
+    for match_uuid, winner_uuid in map_match_uuid_to_winner_uuid.items():
+        match = retrieve_match_with_tournament_and_competitors(
+            match_uuid=match_uuid,
+            session=session,
+        )
+        assert match.winner.uuid == winner_uuid
+    assert_entry_matches_propagated_once(
+        session=session, tournament=tournament, started=started
+    )
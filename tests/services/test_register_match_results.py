@@ -0,0 +1,422 @@
+import pytest
+from sqlalchemy import select
+
+from matamata.models import Competitor, Match, Tournament, TournamentCompetitor
+from matamata.services import (
+    register_match_result,
+    register_match_results,
+    start_tournament,
+)
+from matamata.services.exceptions import (
+    MatchAlreadyRegisteredResult,
+    MatchIsNotTournamentMatch,
+    MatchMissingCompetitorFromPreviousMatch,
+    MatchShouldHaveAutomaticWinner,
+    MatchTargetCompetitorIsNotMatchCompetitor,
+)
+from matamata.services.register_match_results import BracketSnapshot
+from matamata.settings import settings
+from tests.utils import (
+    retrieve_match_with_tournament_and_competitors,
+    start_tournament_util,
+)
+
+
+def create_started_tournament(*, number_of_competitors: int, session) -> Tournament:
+    tournament = Tournament(label=f"Tournament of {number_of_competitors}")
+    for index in range(number_of_competitors):
+        tournament.competitors.append(Competitor(label=f"Competitor {index}"))
+    session.add(tournament)
+    session.commit()
+
+    # Same draw for every tournament with the same number of competitors
+    start_tournament(
+        tournament=tournament,
+        competitor_associations=tournament.competitor_associations,
+        seed=number_of_competitors,
+        session=session,
+    )
+
+    return tournament
+
+
+def pending_matches_of_round(*, tournament: Tournament, round_: int, session):
+    return session.scalars(
+        select(Match)
+        .where(
+            Match.tournament_id == tournament.id,
+            Match.round == round_,
+            Match.result_registration.is_(None),
+        )
+        .order_by(Match.position)
+    ).all()
+
+
+def bracket_state(*, tournament: Tournament, session) -> dict:
+    session.expire_all()
+    matches = session.scalars(
+        select(Match).where(Match.tournament_id == tournament.id)
+    ).all()
+
+    def label(competitor):
+        return competitor.label if competitor else None
+
+    map_id_to_round_position = {
+        match.id: (match.round, match.position) for match in matches
+    }
+
+    return {
+        "matches": {
+            (match.round, match.position): (
+                label(match.competitor_a),
+                label(match.competitor_b),
+                label(match.winner),
+                label(match.loser),
+                match.result_registration is not None,
+            )
+            for match in matches
+        },
+        "standings": tuple(
+            label(session.get(Competitor, competitor_id) if competitor_id else None)
+            for competitor_id in (
+                tournament.first_place_id,
+                tournament.second_place_id,
+                tournament.third_place_id,
+                tournament.fourth_place_id,
+            )
+        ),
+        "next_matches": {
+            association.competitor.label: map_id_to_round_position.get(
+                association.next_match_id
+            )
+            for association in session.scalars(
+                select(TournamentCompetitor).where(
+                    TournamentCompetitor.tournament_id == tournament.id
+                )
+            )
+        },
+    }
+
+
+@pytest.mark.parametrize("number_of_competitors", [2, 3, 4, 5, 6, 7, 8, 9, 13, 16])
+def test_register_match_results_round_by_round_matches_single_registration(
+    session,
+    number_of_competitors,
+):
+    single = create_started_tournament(
+        number_of_competitors=number_of_competitors,
+        session=session,
+    )
+    batch = create_started_tournament(
+        number_of_competitors=number_of_competitors,
+        session=session,
+    )
+    assert bracket_state(tournament=single, session=session) == bracket_state(
+        tournament=batch, session=session
+    )
+
+    for round_ in range(single.starting_round, -1, -1):
+        for match in pending_matches_of_round(
+            tournament=single, round_=round_, session=session
+        ):
+            register_match_result(
+                match_with_tournament_and_competitors=retrieve_match_with_tournament_and_competitors(
+                    match_uuid=match.uuid,
+                    session=session,
+                ),
+                winner_uuid=match.competitor_b.uuid,
+                session=session,
+            )
+
+        outcomes = register_match_results(
+            tournament=batch,
+            results=[
+                (match.uuid, match.competitor_b.uuid)
+                for match in pending_matches_of_round(
+                    tournament=batch, round_=round_, session=session
+                )
+            ],
+            session=session,
+        )
+        assert all(outcome.error is None for outcome in outcomes)
+
+        assert bracket_state(tournament=single, session=session) == bracket_state(
+            tournament=batch, session=session
+        )
+
+    assert all(
+        registered
+        for *_, registered in bracket_state(tournament=batch, session=session)[
+            "matches"
+        ].values()
+    )
+
+
+def test_register_match_results_applies_dependent_results_in_bracket_order(
+    session,
+):
+    tournament = create_started_tournament(number_of_competitors=4, session=session)
+    semifinals = pending_matches_of_round(
+        tournament=tournament, round_=1, session=session
+    )
+    semifinal_winners = [semifinal.competitor_a for semifinal in semifinals]
+    final, third_place = pending_matches_of_round(
+        tournament=tournament, round_=0, session=session
+    )
+
+    # The final comes first, but it can only be decided after the semifinals
+    outcomes = register_match_results(
+        tournament=tournament,
+        results=[
+            (final.uuid, semifinal_winners[1].uuid),
+            (semifinals[1].uuid, semifinal_winners[1].uuid),
+            (semifinals[0].uuid, semifinal_winners[0].uuid),
+        ],
+        session=session,
+    )
+
+    assert [outcome.error for outcome in outcomes] == [None, None, None]
+    assert outcomes[0].match["winner"]["uuid"] == semifinal_winners[1].uuid
+    assert outcomes[0].match["loser"]["uuid"] == semifinal_winners[0].uuid
+
+    session.refresh(final)
+    session.refresh(third_place)
+    assert final.winner_id == semifinal_winners[1].id
+    assert final.loser_id == semifinal_winners[0].id
+    assert third_place.competitor_a_id == semifinals[0].competitor_b_id
+    assert third_place.competitor_b_id == semifinals[1].competitor_b_id
+    assert third_place.result_registration is None
+
+
+def test_register_match_results_reports_each_invalid_result(
+    session,
+    tournament1,
+    competitor1,
+    competitor2,
+    competitor3,
+    competitor4,
+    competitor5,
+):
+    for competitor_ in [competitor1, competitor2, competitor3, competitor4]:
+        tournament1.competitors.append(competitor_)
+    session.add(tournament1)
+    session.commit()
+    other_tournament = create_started_tournament(
+        number_of_competitors=2,
+        session=session,
+    )
+    other_final = pending_matches_of_round(
+        tournament=other_tournament, round_=0, session=session
+    )[0]
+
+    tournament1, matches = start_tournament_util(
+        tournament_uuid=tournament1.uuid,
+        session=session,
+    )
+    semifinal, other_semifinal, final, _ = matches
+
+    outcomes = register_match_results(
+        tournament=tournament1,
+        results=[
+            (other_final.uuid, other_final.competitor_a.uuid),
+            (final.uuid, competitor5.uuid),
+            (semifinal.uuid, competitor5.uuid),
+            (semifinal.uuid, semifinal.competitor_a.uuid),
+            (semifinal.uuid, semifinal.competitor_a.uuid),
+        ],
+        session=session,
+    )
+
+    assert [type(outcome.error) for outcome in outcomes] == [
+        MatchIsNotTournamentMatch,
+        MatchMissingCompetitorFromPreviousMatch,
+        MatchTargetCompetitorIsNotMatchCompetitor,
+        type(None),
+        MatchAlreadyRegisteredResult,
+    ]
+    assert [outcome.match is None for outcome in outcomes] == [
+        True,
+        True,
+        True,
+        False,
+        True,
+    ]
+
+    session.refresh(final)
+    session.refresh(other_semifinal)
+    assert final.competitor_a_id == semifinal.competitor_a_id
+    assert final.competitor_b_id is None
+    assert other_semifinal.result_registration is None
+
+
+def test_register_match_results_for_automatic_winner(
+    session,
+    tournament1,
+    competitor1,
+    competitor2,
+    competitor3,
+):
+    for competitor_ in [competitor1, competitor2, competitor3]:
+        tournament1.competitors.append(competitor_)
+    session.add(tournament1)
+    session.commit()
+
+    tournament1, matches = start_tournament_util(
+        tournament_uuid=tournament1.uuid,
+        session=session,
+    )
+    automatic_winning_match = matches[1]
+
+    (outcome,) = register_match_results(
+        tournament=tournament1,
+        results=[
+            (
+                automatic_winning_match.uuid,
+                automatic_winning_match.competitor_a.uuid,
+            )
+        ],
+        session=session,
+    )
+
+    assert isinstance(outcome.error, MatchAlreadyRegisteredResult)
+
+
+def test_register_match_results_for_match_without_automatic_winner(
+    session,
+    tournament1,
+    competitor1,
+    competitor2,
+    competitor3,
+):
+    for competitor_ in [competitor1, competitor2, competitor3]:
+        tournament1.competitors.append(competitor_)
+    session.add(tournament1)
+    session.commit()
+
+    tournament1, matches = start_tournament_util(
+        tournament_uuid=tournament1.uuid,
+        session=session,
+    )
+    automatic_winning_match = matches[1]
+    session.execute(
+        Match.__table__.update()
+        .where(Match.id == automatic_winning_match.id)
+        .values(result_registration=None, winner_id=None)
+    )
+    session.commit()
+
+    (outcome,) = register_match_results(
+        tournament=tournament1,
+        results=[
+            (
+                automatic_winning_match.uuid,
+                automatic_winning_match.competitor_a.uuid,
+            )
+        ],
+        session=session,
+    )
+
+    assert isinstance(outcome.error, MatchShouldHaveAutomaticWinner)
+
+
+@pytest.mark.parametrize("number_of_competitors", [2, 3, 4, 5, 8, 13])
+def test_cte_strategy_matches_statements_strategy(
+    monkeypatch,
+    session,
+    number_of_competitors,
+):
+    map_strategy_to_tournament = {
+        strategy: create_started_tournament(
+            number_of_competitors=number_of_competitors,
+            session=session,
+        )
+        for strategy in ["statements", "cte"]
+    }
+
+    for round_ in range(
+        map_strategy_to_tournament["statements"].starting_round, -1, -1
+    ):
+        for strategy, tournament in map_strategy_to_tournament.items():
+            monkeypatch.setattr(
+                settings,
+                "MATCH_RESULT_STRATEGY",
+                strategy,
+            )
+            for match in pending_matches_of_round(
+                tournament=tournament, round_=round_, session=session
+            ):
+                register_match_result(
+                    match_with_tournament_and_competitors=retrieve_match_with_tournament_and_competitors(
+                        match_uuid=match.uuid,
+                        session=session,
+                    ),
+                    winner_uuid=match.competitor_a.uuid,
+                    session=session,
+                )
+
+        assert bracket_state(
+            tournament=map_strategy_to_tournament["statements"], session=session
+        ) == bracket_state(
+            tournament=map_strategy_to_tournament["cte"], session=session
+        )
+
+    # Standings were written along with the round 0 Matches
+    state = bracket_state(tournament=map_strategy_to_tournament["cte"], session=session)
+    assert state["standings"][:2] == state["matches"][(0, 0)][2:4]
+    if number_of_competitors > 2:
+        assert state["standings"][2:] == state["matches"][(0, 1)][2:4]
+
+
+@pytest.mark.parametrize("postgresql_statements", [True, False])
+def test_register_match_results_keeps_next_match_sides_filled_after_its_snapshot(
+    monkeypatch,
+    session,
+    postgresql_statements,
+):
+    if not postgresql_statements:
+        # The fallback statements also run on PostgreSQL
+        monkeypatch.setattr(
+            "matamata.services.bulk_updates.is_postgresql",
+            lambda session: False,
+        )
+    tournament = create_started_tournament(number_of_competitors=4, session=session)
+    first_semifinal, second_semifinal = pending_matches_of_round(
+        tournament=tournament, round_=1, session=session
+    )
+    first_semifinal_labels = (
+        first_semifinal.competitor_a.label,
+        first_semifinal.competitor_b.label,
+    )
+    second_semifinal_labels = (
+        second_semifinal.competitor_a.label,
+        second_semifinal.competitor_b.label,
+    )
+
+    snapshot = BracketSnapshot(tournament=tournament, session=session)
+    snapshot.register(
+        match_uuid=first_semifinal.uuid,
+        winner_uuid=first_semifinal.competitor_a.uuid,
+    )
+
+    # The sibling semifinal is registered after the snapshot was read
+    register_match_result(
+        match_with_tournament_and_competitors=retrieve_match_with_tournament_and_competitors(
+            match_uuid=second_semifinal.uuid,
+            session=session,
+        ),
+        winner_uuid=second_semifinal.competitor_b.uuid,
+        session=session,
+    )
+
+    snapshot.write_changes(session=session)
+    session.commit()
+
+    state = bracket_state(tournament=tournament, session=session)
+    assert state["matches"][(0, 0)][:2] == (
+        first_semifinal_labels[0],
+        second_semifinal_labels[1],
+    )
+    assert state["matches"][(0, 1)][:2] == (
+        first_semifinal_labels[1],
+        second_semifinal_labels[0],
+    )
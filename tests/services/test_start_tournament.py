@@ -4,6 +4,9 @@ import pytest
 
 from matamata.models import TournamentCompetitor
 from matamata.services import start_tournament
+from matamata.services.exceptions import TournamentSeedingIsNotTournamentCompetitors
+from tests.models.factories import CompetitorFactory, TournamentFactory
+from tests.utils import count_queries
 
 
 def test_start_tournament_for_no_competitor(session, tournament):
@@ -426,3 +429,149 @@ def test_start_tournament_for_five_competitors(
     assert matches[7].result_registration is None
     assert matches[7].winner_id is None
     assert matches[7].loser_id is None
+
+
+@pytest.mark.parametrize("number_of_competitors", [3, 5, 64, 100])
+def test_start_tournament_issues_a_constant_number_of_queries(
+    session, number_of_competitors
+):
+    tournament = TournamentFactory()
+    tournament_competitors = [
+        TournamentCompetitor(
+            tournament=tournament,
+            competitor=CompetitorFactory(),
+        )
+        for _ in range(number_of_competitors)
+    ]
+    session.add_all(tournament_competitors)
+    session.commit()
+    session.refresh(tournament)
+    for tournament_competitor in tournament_competitors:
+        session.refresh(tournament_competitor.competitor)
+
+    with count_queries(session) as statements:
+        matches = start_tournament(
+            tournament=tournament,
+            competitor_associations=tournament_competitors,
+            session=session,
+        )
+
+    # matches insert, next matches update, tournament update,
+    # tournament and competitor version bumps, competitors reload and matches reload
+    assert len(statements) == 7
+    assert len(matches) == 2 ** (number_of_competitors - 1).bit_length()
+    assert {
+        tournament_competitor.next_match_id
+        for tournament_competitor in tournament_competitors
+    }.issubset({match_.id for match_ in matches})
+
+
+def create_tournament_competitors(*, number_of_competitors, session):
+    tournament = TournamentFactory()
+    tournament_competitors = [
+        TournamentCompetitor(
+            tournament=tournament,
+            competitor=CompetitorFactory(),
+        )
+        for _ in range(number_of_competitors)
+    ]
+    session.add_all(tournament_competitors)
+    session.commit()
+
+    return tournament, tournament_competitors
+
+
+def entry_pairs(matches):
+    return [
+        (match_.competitor_a_id, match_.competitor_b_id)
+        for match_ in matches
+        if match_.round == max(match_.round for match_ in matches)
+    ]
+
+
+def test_start_tournament_with_the_same_seed_draws_the_same_bracket(session):
+    brackets = []
+    for associations_order in [1, -1]:
+        tournament, tournament_competitors = create_tournament_competitors(
+            number_of_competitors=11,
+            session=session,
+        )
+        matches = start_tournament(
+            tournament=tournament,
+            # The loading order of the associations doesn't change the draw
+            competitor_associations=tournament_competitors[::associations_order],
+            seed=2024,
+            session=session,
+        )
+        first_competitor_id = min(
+            tournament_competitor.competitor_id
+            for tournament_competitor in tournament_competitors
+        )
+        brackets.append(
+            [
+                tuple(
+                    None
+                    if competitor_id is None
+                    else competitor_id - first_competitor_id
+                    for competitor_id in pair
+                )
+                for pair in entry_pairs(matches)
+            ]
+        )
+
+    assert brackets[0] == brackets[1]
+
+
+def test_start_tournament_with_seeding(session):
+    tournament, tournament_competitors = create_tournament_competitors(
+        number_of_competitors=6,
+        session=session,
+    )
+    competitors = [
+        tournament_competitor.competitor
+        for tournament_competitor in tournament_competitors
+    ]
+    top_seeds = [competitors[3], competitors[0], competitors[5]]
+
+    matches = start_tournament(
+        tournament=tournament,
+        competitor_associations=tournament_competitors,
+        seed=0,
+        seeding=[competitor_.uuid for competitor_ in top_seeds],
+        session=session,
+    )
+
+    pairs = entry_pairs(matches)
+    # The top 2 seeds get automatic winnings in opposite halves of the bracket,
+    # and the third seed plays against one of the unseeded Competitors
+    assert pairs[0] == (top_seeds[0].id, None)
+    assert pairs[2] == (top_seeds[1].id, None)
+    assert pairs[3][0] == top_seeds[2].id
+    assert pairs[3][1] not in {competitor_.id for competitor_ in top_seeds}
+
+
+@pytest.mark.parametrize("invalid_seeding", ["unregistered", "repeated"])
+def test_start_tournament_with_invalid_seeding(
+    session, tournament, competitor1, competitor2, competitor3, invalid_seeding
+):
+    tournament_competitors = [
+        TournamentCompetitor(tournament=tournament, competitor=competitor_)
+        for competitor_ in [competitor1, competitor2]
+    ]
+    session.add_all(tournament_competitors)
+    session.commit()
+
+    seeding = {
+        "unregistered": [competitor1.uuid, competitor3.uuid],
+        "repeated": [competitor1.uuid, competitor1.uuid],
+    }[invalid_seeding]
+    with pytest.raises(TournamentSeedingIsNotTournamentCompetitors):
+        start_tournament(
+            tournament=tournament,
+            competitor_associations=tournament_competitors,
+            seeding=seeding,
+            session=session,
+        )
+
+    session.refresh(tournament)
+    assert tournament.matches_creation is None
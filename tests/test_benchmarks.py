@@ -0,0 +1,107 @@
+from benchmarks.bracket import find_regressions, run_benchmarks
+
+
+def test_run_benchmarks_reports_every_scenario_and_size(session):
+    reported = []
+
+    results = run_benchmarks(
+        engine=session.get_bind(),
+        sizes=[2, 5],
+        scenarios=["start_tournament", "register_every_match"],
+        repeat=1,
+        seed=0,
+        trace_memory=True,
+        report=lambda scenario, size, measurement: reported.append((scenario, size)),
+    )
+
+    assert reported == [
+        ("start_tournament", 2),
+        ("start_tournament", 5),
+        ("register_every_match", 2),
+        ("register_every_match", 5),
+    ]
+    for sizes in results.values():
+        assert set(sizes) == {"2", "5"}
+        for measurement in sizes.values():
+            assert measurement["wall_time"] > 0
+            assert measurement["queries"] > 0
+            assert measurement["peak_memory"] > 0
+
+
+def test_run_benchmarks_query_count_is_reproducible(session):
+    def run():
+        return run_benchmarks(
+            engine=session.get_bind(),
+            sizes=[6],
+            scenarios=["register_every_match"],
+            repeat=1,
+            seed=0,
+            trace_memory=False,
+            report=lambda *args: None,
+        )
+
+    assert (
+        run()["register_every_match"]["6"]["queries"]
+        == run()["register_every_match"]["6"]["queries"]
+    )
+
+
+def test_find_regressions():
+    baseline = {
+        "start_tournament": {
+            "1024": {"wall_time": 1.0, "queries": 8, "peak_memory": 1000},
+        },
+    }
+
+    assert (
+        find_regressions(
+            results={
+                "start_tournament": {
+                    "1024": {"wall_time": 1.2, "queries": 8, "peak_memory": 1050},
+                    "2048": {"wall_time": 9.0, "queries": 9, "peak_memory": 9000},
+                },
+            },
+            baseline=baseline,
+            time_tolerance=0.25,
+            memory_tolerance=0.1,
+            min_time_delta=0.01,
+        )
+        == []
+    )
+
+    assert find_regressions(
+        results={
+            "start_tournament": {
+                "1024": {"wall_time": 1.5, "queries": 9, "peak_memory": 1200},
+            },
+        },
+        baseline=baseline,
+        time_tolerance=0.25,
+        memory_tolerance=0.1,
+        min_time_delta=0.01,
+    ) == [
+        "start_tournament[1024]: queries 8 -> 9",
+        "start_tournament[1024]: wall time 1.0000s -> 1.5000s",
+        "start_tournament[1024]: peak memory 1000B -> 1200B",
+    ]
+
+
+def test_find_regressions_ignores_small_wall_time_increases():
+    assert (
+        find_regressions(
+            results={
+                "start_tournament": {
+                    "2": {"wall_time": 0.004, "queries": 7, "peak_memory": None},
+                },
+            },
+            baseline={
+                "start_tournament": {
+                    "2": {"wall_time": 0.002, "queries": 7, "peak_memory": 100},
+                },
+            },
+            time_tolerance=0.25,
+            memory_tolerance=0.1,
+            min_time_delta=0.01,
+        )
+        == []
+    )
@@ -0,0 +1,97 @@
+from uuid import uuid4
+
+import pytest
+
+from matamata.cache import (
+    LRUCacheBackend,
+    TournamentResponseCache,
+    invalidate_tournament_on_commit,
+    response_cache,
+)
+
+
+def test_lru_cache_backend_evicts_least_recently_used_entry():
+    backend = LRUCacheBackend(maxsize=2, ttl=60)
+
+    backend.set("a", {"value": 1})
+    backend.set("b", {"value": 2})
+    assert backend.get("a") == {"value": 1}
+    backend.set("c", {"value": 3})
+
+    assert backend.get("a") == {"value": 1}
+    assert backend.get("b") is None
+    assert backend.get("c") == {"value": 3}
+
+
+def test_lru_cache_backend_expires_entries(monkeypatch):
+    now = 100.0
+    monkeypatch.setattr("matamata.cache.monotonic", lambda: now)
+    backend = LRUCacheBackend(maxsize=2, ttl=5)
+
+    backend.set("a", {"value": 1})
+    now = 104.0
+    assert backend.get("a") == {"value": 1}
+    now = 105.0
+    assert backend.get("a") is None
+
+
+def test_tournament_response_cache_invalidates_every_response_of_tournament(
+    monkeypatch,
+):
+    monkeypatch.setattr("matamata.cache.CACHED_TOURNAMENT_RESPONSES", ("a", "b"))
+    cache = TournamentResponseCache(LRUCacheBackend(maxsize=8, ttl=60))
+    tournament_uuid = uuid4()
+    other_tournament_uuid = uuid4()
+
+    for name in ("a", "b"):
+        for uuid in (tournament_uuid, other_tournament_uuid):
+            cache.set(
+                tournament_uuid=uuid, name=name, version=1, content={"name": name}
+            )
+
+    cache.invalidate(tournament_uuid)
+
+    assert cache.get(tournament_uuid=tournament_uuid, name="a", version=1) is None
+    assert cache.get(tournament_uuid=tournament_uuid, name="b", version=1) is None
+    assert cache.get(tournament_uuid=other_tournament_uuid, name="a", version=1) == {
+        "name": "a"
+    }
+
+
+def test_tournament_response_cache_only_serves_the_version_it_was_stored_with():
+    cache = TournamentResponseCache(LRUCacheBackend(maxsize=8, ttl=60))
+    tournament_uuid = uuid4()
+
+    # A reader which queried version 1 stores its content after version 2 is committed
+    cache.set(tournament_uuid=tournament_uuid, name="match", version=1, content={})
+
+    assert cache.get(tournament_uuid=tournament_uuid, name="match", version=2) is None
+    assert cache.get(tournament_uuid=tournament_uuid, name="match", version=1) == {}
+
+
+def test_disabled_tournament_response_cache():
+    cache = TournamentResponseCache(None)
+    tournament_uuid = uuid4()
+
+    cache.set(tournament_uuid=tournament_uuid, name="match", version=1, content={})
+
+    assert cache.get(tournament_uuid=tournament_uuid, name="match", version=1) is None
+
+
+@pytest.mark.parametrize("committed", [True, False])
+def test_invalidate_tournament_on_commit(session, tournament, committed):
+    cached = dict(tournament_uuid=tournament.uuid, name="match", version=1)
+    response_cache.set(**cached, content={})
+
+    invalidate_tournament_on_commit(tournament_uuid=tournament.uuid, session=session)
+    # Nothing changes until the transaction ends
+    assert response_cache.get(**cached) == {}
+
+    if committed:
+        session.commit()
+        assert response_cache.get(**cached) is None
+    else:
+        session.rollback()
+        assert response_cache.get(**cached) == {}
+        session.commit()
+        assert response_cache.get(**cached) == {}
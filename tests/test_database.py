@@ -0,0 +1,110 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from matamata import database
+from matamata.database import (
+    PoolCheckoutStatistics,
+    PsycopgNativePool,
+    TimedQueuePool,
+    create_native_pool,
+    engine_options,
+)
+from matamata.settings import settings
+
+
+def test_pool_checkout_statistics():
+    statistics = PoolCheckoutStatistics()
+    statistics.record(0.25)
+    statistics.record(0.5)
+
+    assert statistics.snapshot() == {
+        "checkouts": 2,
+        "total_wait": 0.75,
+        "max_wait": 0.5,
+    }
+
+
+def test_pool_checkout_statistics_warns_about_slow_checkouts(caplog, monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_POOL_CHECKOUT_WARNING", 0.1)
+    statistics = PoolCheckoutStatistics()
+
+    statistics.record(0.01)
+    assert caplog.records == []
+
+    statistics.record(0.2)
+    assert [record.levelname for record in caplog.records] == ["WARNING"]
+
+
+def test_timed_queue_pool_records_checkouts(monkeypatch):
+    statistics = PoolCheckoutStatistics()
+    monkeypatch.setattr(database, "pool_checkout_statistics", statistics)
+    engine = create_engine(settings.DATABASE_URL, poolclass=TimedQueuePool)
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    engine.dispose()
+
+    assert statistics.snapshot()["checkouts"] == 2
+
+
+def test_engine_options_are_read_from_settings(monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_POOL_SIZE", 20)
+    monkeypatch.setattr(settings, "DATABASE_MAX_OVERFLOW", 0)
+    monkeypatch.setattr(settings, "DATABASE_POOL_PRE_PING", True)
+    monkeypatch.setattr(settings, "DATABASE_STATEMENT_TIMEOUT", 1500)
+    engine = create_engine(
+        settings.DATABASE_URL,
+        **engine_options(poolclass=TimedQueuePool),
+    )
+
+    assert engine.pool.size() == 20
+    assert engine.pool._max_overflow == 0
+    assert engine.pool._pre_ping
+    with engine.connect() as connection:
+        assert connection.scalar(text("SHOW statement_timeout")) == "1500ms"
+    engine.dispose()
+
+
+def test_statement_timeout_cancels_long_statements(monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_STATEMENT_TIMEOUT", 10)
+    engine = create_engine(
+        settings.DATABASE_URL,
+        **engine_options(poolclass=TimedQueuePool),
+    )
+
+    with pytest.raises(OperationalError, match="statement timeout"):
+        with engine.connect() as connection:
+            connection.execute(text("SELECT pg_sleep(1)"))
+    engine.dispose()
+
+
+def test_psycopg_native_pool_lends_and_takes_back_connections(monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_POOL_SIZE", 1)
+    monkeypatch.setattr(settings, "DATABASE_MAX_OVERFLOW", 1)
+    native_pool = create_native_pool()
+    engine = create_engine(settings.DATABASE_URL, pool=PsycopgNativePool(native_pool))
+
+    for _ in range(3):
+        with engine.connect() as connection:
+            assert connection.scalar(text("SELECT 1")) == 1
+
+    native_pool_statistics = native_pool.get_stats()
+    assert native_pool_statistics["pool_max"] == 2
+    assert native_pool_statistics["requests_num"] == 3
+    # every lent connection was given back instead of being closed
+    assert native_pool_statistics["pool_available"] == (
+        native_pool_statistics["pool_size"]
+    )
+    engine.dispose()
+    assert native_pool.closed
+
+    # The engine keeps working with a new native pool
+    recreated_native_pool = engine.pool.native_pool
+    assert recreated_native_pool is not native_pool
+    with engine.connect() as connection:
+        assert connection.scalar(text("SELECT 1")) == 1
+    engine.dispose()
+    assert recreated_native_pool.closed
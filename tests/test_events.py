@@ -0,0 +1,244 @@
+import asyncio
+import threading
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import func, select
+
+from matamata.database import psycopg_conninfo
+from matamata.events import (
+    EVENTS_CHANNEL,
+    PostgresEventListener,
+    TournamentEventBroadcaster,
+    publish_tournament_events_on_commit,
+    stream_tournament_events,
+)
+from matamata.services import register_match_results
+from tests.utils import register_match_result_util, start_tournament_util
+
+
+def test_broadcaster_delivers_events_published_from_other_threads():
+    broadcaster = TournamentEventBroadcaster()
+    tournament_uuid = uuid4()
+
+    async def watch():
+        with broadcaster.subscribe(tournament_uuid) as subscription:
+            publisher = threading.Thread(
+                target=broadcaster.publish,
+                args=(tournament_uuid, {"event": "matchDecided"}),
+            )
+            publisher.start()
+            publisher.join()
+            broadcaster.publish(uuid4(), {"event": "otherTournament"})
+            return await asyncio.wait_for(subscription.get(), timeout=5)
+
+    assert asyncio.run(watch()) == {"event": "matchDecided"}
+
+
+def test_broadcaster_ends_subscription_of_slow_watchers():
+    broadcaster = TournamentEventBroadcaster(maxsize=2)
+    tournament_uuid = uuid4()
+
+    async def watch():
+        with broadcaster.subscribe(tournament_uuid) as subscription:
+            for position in range(3):
+                broadcaster.publish(tournament_uuid, {"position": position})
+            # Let the event loop run the deliveries
+            await asyncio.sleep(0)
+            return [await subscription.get(), await subscription.get()]
+
+    assert asyncio.run(watch()) == [{"position": 1}, None]
+
+
+def start_tournament_with_competitors(*, session, tournament, competitors):
+    for competitor_ in competitors:
+        tournament.competitors.append(competitor_)
+    session.add(tournament)
+    session.commit()
+
+    return start_tournament_util(tournament_uuid=tournament.uuid, session=session)
+
+
+def test_stream_tournament_events_after_match_result_commit(
+    session,
+    tournament,
+    competitor1,
+    competitor2,
+    competitor3,
+    competitor4,
+):
+    tournament, matches = start_tournament_with_competitors(
+        session=session,
+        tournament=tournament,
+        competitors=[competitor1, competitor2, competitor3, competitor4],
+    )
+    semifinal, _, final, third_place = matches
+    winner, loser = semifinal.competitor_a, semifinal.competitor_b
+
+    async def watch():
+        stream = stream_tournament_events(tournament.uuid, keepalive_interval=0.05)
+        assert await anext(stream) == ": connected\n\n"
+
+        await asyncio.to_thread(
+            register_match_result_util,
+            match_uuid=semifinal.uuid,
+            winner_uuid=winner.uuid,
+            session=session,
+        )
+        chunks = [await anext(stream) for _ in range(3)]
+        # Nothing else happens, so the stream is kept alive
+        chunks.append(await anext(stream))
+        await stream.aclose()
+        return chunks
+
+    chunks = asyncio.run(watch())
+
+    assert chunks[0] == (
+        "event: matchDecided\n"
+        f'data: {{"event":"matchDecided","match":"{semifinal.uuid}","round":1,'
+        f'"position":0,"winner":"{winner.uuid}","loser":"{loser.uuid}"}}\n\n'
+    )
+    assert chunks[1] == (
+        "event: competitorAdvanced\n"
+        f'data: {{"event":"competitorAdvanced","competitor":"{winner.uuid}",'
+        f'"match":"{final.uuid}","round":0,"position":0,"side":"competitorA"}}\n\n'
+    )
+    assert chunks[2] == (
+        "event: thirdPlaceFilled\n"
+        f'data: {{"event":"thirdPlaceFilled","competitor":"{loser.uuid}",'
+        f'"match":"{third_place.uuid}","round":0,"position":1,"side":"competitorA"}}\n\n'
+    )
+    assert chunks[3] == ": keepalive\n\n"
+
+
+def test_stream_tournament_events_after_match_results_commit(
+    session,
+    tournament,
+    competitor1,
+    competitor2,
+    competitor3,
+):
+    tournament, matches = start_tournament_with_competitors(
+        session=session,
+        tournament=tournament,
+        competitors=[competitor1, competitor2, competitor3],
+    )
+    semifinal, _, _, third_place = matches
+    winner, loser = semifinal.competitor_a, semifinal.competitor_b
+
+    def register():
+        return register_match_results(
+            tournament=tournament,
+            results=[(semifinal.uuid, winner.uuid)],
+            session=session,
+        )
+
+    async def watch():
+        stream = stream_tournament_events(tournament.uuid)
+        await anext(stream)
+        await asyncio.to_thread(register)
+        chunks = [await anext(stream) for _ in range(4)]
+        await stream.aclose()
+        return chunks
+
+    event_names = [chunk.split("\n")[0] for chunk in asyncio.run(watch())]
+
+    # The loser of the only semifinal of three competitors wins the third place
+    assert event_names == [
+        "event: matchDecided",
+        "event: competitorAdvanced",
+        "event: thirdPlaceFilled",
+        "event: matchDecided",
+    ]
+    session.refresh(third_place)
+    assert third_place.winner_id == loser.id
+
+
+def test_tournament_events_are_discarded_on_rollback(session, tournament):
+    async def watch():
+        stream = stream_tournament_events(tournament.uuid, keepalive_interval=0.05)
+        await anext(stream)
+
+        publish_tournament_events_on_commit(
+            tournament_uuid=tournament.uuid,
+            tournament_events=[{"event": "matchDecided"}],
+            session=session,
+        )
+        session.rollback()
+        session.commit()
+
+        chunk = await anext(stream)
+        await stream.aclose()
+        return chunk
+
+    assert asyncio.run(watch()) == ": keepalive\n\n"
+
+
+def test_postgres_event_listener_relays_notifications(
+    monkeypatch,
+    session,
+    tournament,
+):
+    if session.get_bind().dialect.name != "postgresql":
+        pytest.skip("LISTEN/NOTIFY requires PostgreSQL")
+
+    monkeypatch.setattr("matamata.events.settings.EVENTS_BACKEND", "postgresql")
+    broadcaster = TournamentEventBroadcaster()
+    listener = PostgresEventListener(
+        conninfo=psycopg_conninfo(),
+        broadcaster=broadcaster,
+    )
+    listener.ensure_started()
+    assert listener.ready.wait(5)
+
+    async def watch():
+        with broadcaster.subscribe(tournament.uuid) as subscription:
+            publish_tournament_events_on_commit(
+                tournament_uuid=tournament.uuid,
+                tournament_events=[{"event": "matchDecided"}, {"event": "other"}],
+                session=session,
+            )
+            # Delivered only on commit
+            await asyncio.sleep(0.1)
+            assert subscription.queue.empty()
+            await asyncio.to_thread(session.commit)
+
+            return [
+                await asyncio.wait_for(subscription.get(), timeout=5),
+                await asyncio.wait_for(subscription.get(), timeout=5),
+            ]
+
+    assert asyncio.run(watch()) == [{"event": "matchDecided"}, {"event": "other"}]
+
+
+def test_postgres_event_listener_skips_notifications_it_cannot_relay(
+    monkeypatch,
+    session,
+    tournament,
+):
+    if session.get_bind().dialect.name != "postgresql":
+        pytest.skip("LISTEN/NOTIFY requires PostgreSQL")
+
+    monkeypatch.setattr("matamata.events.settings.EVENTS_BACKEND", "postgresql")
+    broadcaster = TournamentEventBroadcaster()
+    listener = PostgresEventListener(
+        conninfo=psycopg_conninfo(),
+        broadcaster=broadcaster,
+    )
+    listener.ensure_started()
+    assert listener.ready.wait(5)
+
+    async def watch():
+        with broadcaster.subscribe(tournament.uuid) as subscription:
+            session.execute(select(func.pg_notify(EVENTS_CHANNEL, "not JSON")))
+            publish_tournament_events_on_commit(
+                tournament_uuid=tournament.uuid,
+                tournament_events=[{"event": "matchDecided"}],
+                session=session,
+            )
+            await asyncio.to_thread(session.commit)
+
+            return await asyncio.wait_for(subscription.get(), timeout=5)
+
+    assert asyncio.run(watch()) == {"event": "matchDecided"}
+    assert listener._thread.is_alive()
@@ -0,0 +1,113 @@
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+
+from matamata.database import get_async_session, get_session
+from matamata.main import create_app
+
+
+@pytest.fixture
+def instrumented_client(session):
+    instrumented_app = create_app(instrumentation=True)
+
+    def get_session_override():
+        return session
+
+    instrumented_app.dependency_overrides[get_session] = get_session_override
+    with TestClient(instrumented_app) as instrumented_client:
+        yield instrumented_client
+
+
+def parse_server_timing(header: str) -> dict[str, dict[str, str]]:
+    metrics = {}
+    for metric in header.split(", "):
+        name, *params = metric.split(";")
+        metrics[name] = dict(param.split("=", 1) for param in params)
+    return metrics
+
+
+def test_server_timing_header_reports_query_count_and_durations(
+    instrumented_client,
+    tournament1,
+):
+    response = instrumented_client.get(f"/tournament/{tournament1.uuid}/competitor")
+
+    assert response.status_code == 200
+    server_timing = parse_server_timing(response.headers["Server-Timing"])
+    assert set(server_timing) == {"db", "app", "serialization", "total"}
+    assert server_timing["db"]["desc"] == '"2 queries"'
+    for metric in server_timing.values():
+        assert float(metric["dur"]) >= 0
+    assert float(server_timing["total"]["dur"]) >= float(server_timing["app"]["dur"])
+
+
+def test_server_timing_header_is_absent_without_instrumentation(
+    client,
+    tournament1,
+):
+    response = client.get(f"/tournament/{tournament1.uuid}/competitor")
+
+    assert response.status_code == 200
+    assert "Server-Timing" not in response.headers
+
+
+def test_metrics_endpoint_reports_per_route_totals(
+    instrumented_client,
+    tournament1,
+):
+    instrumented_client.get(f"/tournament/{tournament1.uuid}/competitor")
+    instrumented_client.get(f"/tournament/{tournament1.uuid}/competitor")
+    instrumented_client.get(
+        "/tournament/00000000-0000-0000-0000-000000000000/competitor"
+    )
+    instrumented_client.get("/does-not-exist")
+
+    response = instrumented_client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert (
+        'matamata_http_requests_total{method="GET",'
+        'route="/tournament/{tournament_uuid}/competitor",status="200"} 2'
+    ) in body
+    assert (
+        'matamata_db_queries_total{method="GET",'
+        'route="/tournament/{tournament_uuid}/competitor",status="200"} 4'
+    ) in body
+    assert (
+        'matamata_http_requests_total{method="GET",'
+        'route="/tournament/{tournament_uuid}/competitor",status="404"} 1'
+    ) in body
+    assert (
+        'matamata_http_requests_total{method="GET",route="unmatched",status="404"} 1'
+    ) in body
+    assert re.search(r"^matamata_db_pool_checkouts_total \d+$", body, re.MULTILINE)
+
+
+def test_metrics_endpoint_is_not_part_of_the_api_schema(instrumented_client):
+    response = instrumented_client.get("/openapi.json")
+
+    assert response.status_code == 200
+    assert "/metrics" not in response.json()["paths"]
+
+
+def test_async_mode_endpoint_is_timed_once(
+    async_session_factory,
+    tournament1,
+):
+    async_app = create_app(async_mode=True, instrumentation=True)
+
+    async def get_async_session_override():
+        async with async_session_factory() as async_session:
+            yield async_session
+
+    async_app.dependency_overrides[get_async_session] = get_async_session_override
+    with TestClient(async_app) as async_client:
+        response = async_client.get(f"/tournament/{tournament1.uuid}/competitor")
+
+    assert response.status_code == 200
+    server_timing = parse_server_timing(response.headers["Server-Timing"])
+    assert server_timing["db"]["desc"] == '"2 queries"'
+    assert float(server_timing["total"]["dur"]) >= float(server_timing["app"]["dur"])